@@ -1,7 +1,7 @@
 """
 Author: Vema Dondeti
 Date: 2025-05-30
-Version: 1.0
+Version: 1.9
 
 📚 Interactive Math Tutor Chatbot (Streamlit App)
 
@@ -16,17 +16,45 @@ leveraging a fine-tuned GPT-3.5 model to provide age-appropriate explanations fo
 - Defines three main tabs:
     1. **Math Tutor** – the core chatbot interface for asking math questions.
     2. **About** – explains the model, scope, and intent of the app.
-    3. **Feedback** – collects user ratings and comments (not stored, just printed).
+    3. **Feedback** – collects user ratings and comments and stores them with the question and answer.
 - Allows selection of example questions or entry of custom math questions.
 - Generates answers using the fine-tuned model; optionally compares with base GPT-3.5.
-- Feedback section demonstrates a collection mechanism (prints to console for now).
+- Reuses answers from a shared response cache (memory + SQLite, see `response_cache.py`) so a question
+  asked by any student is only sent to OpenAI once; the sidebar shows the cache hit rate.
+- Answers reworded repeats of earlier questions ("5 plus 2?" after "What is 5 + 2?") from a semantic cache
+  (hashed question vectors in a NumPy index, see `semantic_cache.py`) before calling the fine-tuned model.
+- Solves plain arithmetic and one-step equations ("What is 5 + 2?", "Solve for x: x + 3 = 7") instantly with
+  a local solver (`local_solver.py`) in the style of the training data; only other questions reach OpenAI.
+- Streams both models' answers token by token into the page (on by default, toggled in the sidebar), so
+  students see the answer start right away on slow networks; the complete text is then stored as before.
+- Fetches the base model answer in the background while the fine-tuned answer is written (see
+  `comparison_runner.py`), for students who compared their last answer and, when comparing is popular,
+  speculatively within an hourly cap; fetches for abandoned questions are cancelled.
+- Keeps each rerun cheap: the OpenAI client, caches and thread pool are created once per process in
+  `tutor_resources.py` (with `openai` and NumPy imported only when first needed), session defaults are set
+  once per session, and only the open tab and sidebar panel are drawn (`benchmark_reruns.py` measures it).
+- Feedback is saved to SQLite by a background writer thread in batches (`feedback_store.py`), linked to the
+  question, the answer, the model that wrote it and how long it took; the sidebar shows ratings per model.
+- Records latency, time to first token, tokens, estimated cost, cache hits and errors of every answer
+  (`telemetry.py`), as JSON log lines (MATH_TUTOR_TELEMETRY_LOG) and rolling per-model aggregates shown in an
+  admin sidebar panel (MATH_TUTOR_ADMIN=1).
+- Pins the answers of the example questions and the most asked questions for both models at startup
+  (`warm_cache.py`, optionally from a prebuilt `warm_answers.json`) and refreshes them in the background,
+  so popular clicks are answered instantly, even in a new session.
 - Sidebar gives users quick instructions and project context.
 
 💡 Created as a final project to demonstrate how generative AI can support early education.
 """
 import streamlit as st
 import os
-from openai import OpenAI
+import time
+import uuid
+from feedback_store import RATINGS
+from telemetry import LOCAL_SOLVER, PINNED, RESPONSE_CACHE, SEMANTIC_CACHE
+from tutor_resources import (get_answer_warmer, get_comparison_runner, get_feedback_store, get_local_solver,
+                             get_openai_client, get_response_cache, get_semantic_cache, get_telemetry)
+from tutor_settings import BASE_MODEL, EXAMPLE_QUESTIONS, FINE_TUNED_MODEL, MAX_TOKENS, TEMPERATURE
+from warm_cache import warm_targets
 
 # ----------------- Streamlit App Configuration -----------------
 # Sets up the main settings for the Streamlit web app.
@@ -55,9 +83,61 @@ st.set_page_config(
 # This allows the app to send user prompts and receive AI-generated responses.
 # We're using a **fine-tuned GPT-3.5 Turbo model** trained specifically for
 # providing age-appropriate, supportive responses to elementary-level math questions.
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-fine_tuned_model = "ft:gpt-3.5-turbo-0125:personal:math-tutor:BVPvM7jo"
+# The client is created on first use and shared by the whole process (see `tutor_resources.py`).
+# The models, generation settings and example questions live in `tutor_settings.py`, shared with the
+# warm-up, the evaluation runner and the load test.
+
+fine_tuned_model = FINE_TUNED_MODEL
+base_model = BASE_MODEL
+
+# Name recorded with feedback on answers from the built-in solver instead of a model.
+local_solver_model = "local-solver"
+
+# Generation settings shared by both models (they are also part of the cache key).
+max_tokens = MAX_TOKENS
+temperature = TEMPERATURE
+
+# While streaming, the page is redrawn at most every 50 ms (a redraw per token is wasted on slow networks).
+stream_refresh_seconds = 0.05
+
+# How the base model answer for "Compare with base model" is fetched (MATH_TUTOR_COMPARE_MODE):
+# - "sequential": only after the compare box is ticked, as two round trips.
+# - "concurrent": alongside the fine-tuned answer when the student compared their previous answer.
+# - "speculative": also for other students while the recent compare rate is high, within the cost caps
+#   (MATH_TUTOR_SPECULATIVE_PER_HOUR speculative calls per hour).
+comparison_mode = os.getenv("MATH_TUTOR_COMPARE_MODE", "concurrent")
+speculative_per_hour = int(os.getenv("MATH_TUTOR_SPECULATIVE_PER_HOUR", "100"))
+
+# The model telemetry panel is for whoever runs the app, not for students (MATH_TUTOR_ADMIN=1 shows it).
+show_admin_panel = os.getenv("MATH_TUTOR_ADMIN") == "1"
+
+# The example questions offered in the Math Tutor tab. Their answers, and those of the most asked questions,
+# are pinned at startup and refreshed in the background (MATH_TUTOR_WARM_UP=0 turns this off).
+example_questions = ["Select your own question"] + EXAMPLE_QUESTIONS
+warm_up = os.getenv("MATH_TUTOR_WARM_UP", "1") == "1"
+
+# ----------------- Shared Resources -----------------
+# One response cache, local solver and comparison runner per process, shared by every browser session
+# (st.cache_resource keeps them across reruns). The OpenAI client and the semantic cache are fetched where
+# they are used, so they are only built once a question needs them.
+# - Answers are keyed by model, normalized question, max_tokens and temperature, kept in memory and in
+#   `tutor_response_cache.sqlite3`, and expire after 7 days.
+# - The semantic cache matches reworded questions to earlier fine-tuned answers (same numbers and
+#   operators, similar wording) and holds at most 5,000 questions (about 10 MB).
+# - The local solver answers plain arithmetic and one-step equations without an API call.
+# - The comparison runner fetches base model answers in the background, with compare usage tracking,
+#   a cap on speculative calls and cancellation of fetches nobody will look at.
+# - The feedback store writes ratings to `tutor_feedback.sqlite3` from a background thread.
+# - Telemetry records every answer and error; its log file and admin panel are optional.
+# - The answer warmer holds the pinned answers of popular questions. Its thread is started by the first run
+#   of this script (later runs find it running) and fetches through get_model_answer() below.
+
+response_cache = get_response_cache()
+local_solver = get_local_solver()
+comparison_runner = get_comparison_runner(speculative_per_hour)
+feedback_store = get_feedback_store()
+telemetry = get_telemetry()
+answer_warmer = get_answer_warmer()
 
 # ----------------- Custom CSS Styling -----------------
 # Applies custom CSS to enhance the visual appearance of the Streamlit app.
@@ -103,31 +183,76 @@ st.markdown(
 # ----------------- Initialize session state -----------------
 # Sets up default values in Streamlit's session state to manage user interactions
 # and preserve data across reruns of the app:
-# - `fine_tuned_response`: stores the response from the fine-tuned model.
-# - `base_model_response`: stores the response from the base GPT-3.5 model (if comparison is enabled).
+# - `fine_tuned_response`: stores the answer text from the fine-tuned model.
+# - `base_model_response`: stores the answer text from the base GPT-3.5 model (if comparison is enabled).
 # - `compare_checked`: tracks whether the user enabled response comparison.
 # - `last_input`: keeps the last question asked by the user to avoid redundant API calls.
-# - `active_tab`: tracks the currently active tab to retain UI context between interactions.
-
-if "fine_tuned_response" not in st.session_state:
-    st.session_state["fine_tuned_response"] = None
-if "base_model_response" not in st.session_state:
-    st.session_state["base_model_response"] = None
-if "compare_checked" not in st.session_state:
-    st.session_state["compare_checked"] = False
-if "last_input" not in st.session_state:
-    st.session_state["last_input"] = ""
-if "active_tab" not in st.session_state:
-    st.session_state["active_tab"] = "Math Tutor"
+# - `stream_answers`: whether answers are shown token by token while the model writes them (sidebar toggle).
+# - `base_prefetch`: the background base model fetch for the current question, if one was started.
+# - `compare_preferred`: whether the student compared their last answer (so the next one is fetched early).
+# - `answer_model` / `answer_latency_ms`: who wrote the current answer and how long it took, for feedback.
+# - `session_id`: a random id that groups one student's feedback.
+# - `active_tab`: the open tab, kept by the tabs widget itself (see Tab Setup below).
+# The defaults are written once per session instead of being checked on every rerun.
+
+session_defaults = {
+    "fine_tuned_response": None,
+    "base_model_response": None,
+    "compare_checked": False,
+    "last_input": "",
+    "stream_answers": True,
+    "base_prefetch": None,
+    "compare_preferred": False,
+    "answer_model": None,
+    "answer_latency_ms": None,
+}
+if "session_initialized" not in st.session_state:
+    for key, value in session_defaults.items():
+        st.session_state.setdefault(key, value)
+    st.session_state["session_id"] = uuid.uuid4().hex
+    st.session_state["session_initialized"] = True
+
+# Widgets in a tab that is not drawn lose their value; writing the values back keeps a half-typed question
+# or comment when the student looks at another tab and returns.
+for key in ("selected_question", "user_question", "feedback_text_area", "feedback_rating_radio"):
+    if key in st.session_state:
+        st.session_state[key] = st.session_state[key]
 
 # ----------------- Helper functions -----------------
 # clear_responses(): Resets all session state variables related to responses and comparison flags.
 # This ensures that when the user inputs a new question or selects a different example,
-# previous answers are cleared and new API calls can be made for fresh results.
+# previous answers are cleared and new API calls can be made for fresh results. A background base model
+# fetch for the old question is cancelled.
+
+# get_pinned_answer(): The answer pinned by the warm-up for a popular question, or None. The ask is still
+# counted by the response cache, so the question stays popular.
+
+# get_model_answer(): Returns the answer text for a question from the given model. Pinned answers and the
+# shared response cache are checked first; only a miss calls the OpenAI API, and the new answer is stored
+# for everyone. `refresh=True` (used by the warm-up thread) skips both and always asks the API.
+# With `on_text`, the API call streams and on_text(text so far) is called as tokens arrive; the complete
+# text is returned and cached exactly like a non-streamed answer. Each call is tracked by telemetry: latency,
+# first token, the token usage OpenAI reports (for streams too, via `include_usage`), cache hits and errors.
+
+# stream_renderer(): Wraps a function that draws partial answer text so it runs at most every
+# `stream_refresh_seconds`, or returns None when streaming is turned off.
+
+# show_answer() / show_comparison(): Draw the answer (or both answers) into a placeholder, so the streamed
+# text and the final text use the same spot on the page.
+
+# get_fine_tuned_answer(): Answers a question in the fine-tuned model's place. The local solver goes first,
+# then the pinned answers and the semantic cache, so simple, popular and reworded questions skip the API.
+# Returns the answer, a short note on where it came from (None when the model answered) and the model
+# that wrote it.
+
+# prefetch_base_answer(): Starts the base model answer for a new question in the background, according
+# to `comparison_mode`. The fetch streams so that cancelling it stops generation at the next token.
 
 # get_base_model_response(): Fetches a response from the base GPT-3.5-turbo model to compare
 # with the fine-tuned model’s answer. This is only done if there is user input and a fine-tuned
 # response already available, providing a side-by-side comparison of answers for the same question.
+# A background fetch is used when one was started; otherwise the base answer streams into the
+# comparison placeholder when streaming is on.
 
 
 def clear_responses():
@@ -135,32 +260,160 @@ def clear_responses():
     st.session_state["base_model_response"] = None
     st.session_state["compare_checked"] = False
     st.session_state["last_input"] = ""
-
-
-def get_base_model_response():
+    comparison_runner.cancel(st.session_state["base_prefetch"])
+    st.session_state["base_prefetch"] = None
+
+
+def get_pinned_answer(model, question):
+    answer = answer_warmer.get(model, question)
+    if answer is not None:
+        response_cache.asked(model, question, max_tokens, temperature)
+    return answer
+
+
+def get_model_answer(model, question, on_text=None, refresh=False):
+    with telemetry.track(model) as call:
+        answer = None
+        if not refresh:
+            answer = get_pinned_answer(model, question)
+            if answer is not None:
+                call.source = PINNED
+            else:
+                answer = response_cache.get(model, question, max_tokens, temperature)
+                if answer is not None:
+                    call.source = RESPONSE_CACHE
+        if answer is None:
+            stream_settings = {"stream": True, "stream_options": {"include_usage": True}} if on_text else {}
+            response = get_openai_client().chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": question}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **stream_settings,
+            )
+            if on_text is None:
+                answer = response.choices[0].message.content
+                call.set_usage(response.usage)
+            else:
+                parts = []
+                try:
+                    for chunk in response:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            call.first_token()
+                            parts.append(chunk.choices[0].delta.content)
+                            on_text("".join(parts))
+                        call.set_usage(chunk.usage)
+                finally:
+                    response.close()
+                answer = "".join(parts)
+            response_cache.put(model, question, max_tokens, temperature, answer)
+    return answer
+
+
+def stream_renderer(draw):
+    if not st.session_state["stream_answers"]:
+        return None
+    last_drawn = [0.0]
+
+    def on_text(text):
+        now = time.monotonic()
+        if now - last_drawn[0] >= stream_refresh_seconds:
+            last_drawn[0] = now
+            draw(text + " ▌")
+    return on_text
+
+
+def show_answer(placeholder, answer):
+    with placeholder.container():
+        st.markdown("### Answer:")
+        st.info(f"🤖 {answer}")
+
+
+def show_comparison(placeholder, fine_tuned_answer, base_answer):
+    with placeholder.container():
+        st.markdown("### Comparison with Base Model:")
+        st.info(f"🤖 (Fine-Tuned): {fine_tuned_answer}")
+        st.info(f"🤖 (Base): {base_answer}")
+
+
+def get_fine_tuned_answer(question, on_text=None):
+    started = time.perf_counter()
+    answer = local_solver.solve(question)
+    if answer is not None:
+        telemetry.record(local_solver_model, LOCAL_SOLVER, (time.perf_counter() - started) * 1000)
+        return answer, "Solved instantly by the built-in math solver.", local_solver_model
+    answer = get_pinned_answer(fine_tuned_model, question)
+    if answer is not None:
+        telemetry.record(fine_tuned_model, PINNED, (time.perf_counter() - started) * 1000)
+        return answer, None, fine_tuned_model
+    semantic_cache = get_semantic_cache(fine_tuned_model)
+    match = semantic_cache.lookup(fine_tuned_model, question)
+    if match is not None:
+        answer, _, matched_question = match
+        telemetry.record(fine_tuned_model, SEMANTIC_CACHE, (time.perf_counter() - started) * 1000)
+        return answer, f"Answered from a similar question: \"{matched_question}\"", fine_tuned_model
+    answer = get_model_answer(fine_tuned_model, question, on_text)
+    semantic_cache.add(fine_tuned_model, question, answer)
+    return answer, None, fine_tuned_model
+
+
+def prefetch_base_answer(question):
+    comparison_runner.cancel(st.session_state["base_prefetch"])
+    st.session_state["base_prefetch"] = None
+    if comparison_mode == "sequential":
+        return
+    speculative = not st.session_state["compare_preferred"]
+    if speculative and (comparison_mode != "speculative" or not comparison_runner.should_speculate()):
+        return
+    st.session_state["base_prefetch"] = comparison_runner.submit(
+        lambda check: get_model_answer(base_model, question, check), speculative=speculative)
+
+
+def get_base_model_response(placeholder=None):
     # Only fetch base model response if fine-tuned response exists and input present
     question_text = st.session_state.get("current_question", "")
     if question_text and st.session_state["fine_tuned_response"]:
+        prefetch = st.session_state["base_prefetch"]
+        if prefetch is not None:
+            with st.spinner("Comparing with base model..."):
+                try:
+                    st.session_state["base_model_response"] = comparison_runner.result(prefetch)
+                    return
+                except Exception:
+                    # Fall through to a direct request
+                    st.session_state["base_prefetch"] = None
+
+        fine_tuned_answer = st.session_state["fine_tuned_response"]
+        on_text = stream_renderer(lambda text: show_comparison(placeholder, fine_tuned_answer, text)) \
+            if placeholder is not None else None
         with st.spinner("Comparing with base model..."):
-            st.session_state["base_model_response"] = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": question_text}],
-                max_tokens=150,
-                temperature=0.7,
-            )
+            st.session_state["base_model_response"] = get_model_answer(base_model, question_text, on_text)
+
+# ----------------- Startup Warm-Up -----------------
+# Pins answers for the example questions and the top 20 most asked questions of each model, for both models
+# (see `warm_cache.py`). The first run of the script loads `warm_answers.json` if it was built for these
+# settings and starts a background thread that fetches the missing answers through get_model_answer() (so
+# they are cached and tracked like any other) and fetches all of them again every 6 hours.
+# Later runs and sessions find the thread already running and only read the pinned answers.
+
+if warm_up:
+    answer_warmer.start(lambda model, question, refresh: get_model_answer(model, question, refresh=refresh),
+                        lambda: warm_targets(response_cache.popular),
+                        max_tokens=max_tokens, temperature=temperature)
 
 # ----------------- Tab Setup and UI Logic -----------------
 # Define three main tabs: "Math Tutor", "About", and "Feedback".
 # Each tab presents a distinct interface and functionality within the app.
 
 # Notes on Tab State
-# - Streamlit's current tabs widget does not support programmatic switching.
-# - We track the active tab in session_state for informational or logging purposes only.
+# - The tabs widget keeps the open tab in session_state["active_tab"] and reruns the app on a switch.
+# - Only the open tab's content is run and drawn (`tab.open`), so a click in one tab does not rebuild the
+#   other two.
 # - Users manually switch tabs by clicking on the tab headers.
 
 
 tab_names = ["Math Tutor", "About", "Feedback"]
-tab1, tab2, tab3 = st.tabs(tab_names)
+tab1, tab2, tab3 = st.tabs(tab_names, key="active_tab", on_change="rerun")
 
 # ----------------- Tab 1: Math Tutor -----------------
 # - Provides the core chatbot interface for students to ask elementary math questions.
@@ -171,70 +424,78 @@ tab1, tab2, tab3 = st.tabs(tab_names)
 # - If comparison is requested, fetches and displays the base model’s response side-by-side.
 # - Handles API errors gracefully and updates session state to track current inputs and responses.
 with tab1:
-    st.session_state["active_tab"] = "Math Tutor"
-    st.header("📚 Math Tutor Chatbot")
-    st.subheader("Ask elementary math questions!")
-
-    example_questions = [
-        "Select your own question",
-        "What is 5 + 2?",
-        "Solve for x: x + 3 = 7",
-        "What is half of 10?",
-        "How many sides does a triangle have?"
-    ]
-
-    selected_question = st.selectbox("Select an example (optional)",
-                                     example_questions,
-                                     key="selected_question",
-                                     on_change=clear_responses)
-
-    # Determine user question from selectbox or text input
-    if selected_question == "Select your own question":
-        user_input = st.text_input("Your question:", key="user_question")
-    else:
-        user_input = selected_question
-
-    st.session_state["current_question"] = user_input  # save current question to session
-
-    if user_input:
-        # Only fetch fine-tuned response if input changed
-        if st.session_state["fine_tuned_response"] is None or st.session_state["last_input"] != user_input:
-            with st.spinner("Thinking..."):
-                try:
-                    st.session_state["fine_tuned_response"] = client.chat.completions.create(
-                        model=fine_tuned_model,
-                        messages=[{"role": "user", "content": user_input}],
-                        max_tokens=150,
-                        temperature=0.7
-                    )
+    if tab1.open:
+        st.header("📚 Math Tutor Chatbot")
+        st.subheader("Ask elementary math questions!")
+
+        selected_question = st.selectbox("Select an example (optional)",
+                                         example_questions,
+                                         key="selected_question",
+                                         on_change=clear_responses)
+
+        # Determine user question from selectbox or text input
+        if selected_question == "Select your own question":
+            user_input = st.text_input("Your question:", key="user_question")
+        else:
+            user_input = selected_question
+
+        st.session_state["current_question"] = user_input  # save current question to session
+
+        if user_input:
+            # The answer is drawn here, first token by token while streaming and then in full
+            answer_placeholder = st.empty()
+
+            # Only fetch fine-tuned response if input changed
+            if st.session_state["fine_tuned_response"] is None or st.session_state["last_input"] != user_input:
+                with st.spinner("Thinking..."):
+                    try:
+                        st.session_state["usage_flag"] = comparison_runner.question_asked()
+                        prefetch_base_answer(user_input)
+                        on_text = stream_renderer(lambda text: show_answer(answer_placeholder, text))
+                        started = time.perf_counter()
+                        answer, answer_note, answer_model = get_fine_tuned_answer(user_input, on_text)
+                        st.session_state["answer_latency_ms"] = (time.perf_counter() - started) * 1000
+                        st.session_state["fine_tuned_response"] = answer
+                        st.session_state["answer_note"] = answer_note
+                        st.session_state["answer_model"] = answer_model
+                        st.session_state["base_model_response"] = None
+                        st.session_state["last_input"] = user_input
+                        st.session_state["compare_checked"] = False
+                    except Exception as e:
+                        telemetry.error(fine_tuned_model, e)
+                        st.error(f"An error occurred: {e}")
+
+            # Show fine-tuned answer
+            if st.session_state["fine_tuned_response"]:
+                show_answer(answer_placeholder, st.session_state["fine_tuned_response"])
+                if st.session_state.get("answer_note"):
+                    st.caption(st.session_state["answer_note"])
+
+                # Checkbox to compare with base model, triggers fetch when checked
+                compare_base = st.checkbox(
+                    "Compare with base model (gpt-3.5-turbo)",
+                    key="compare_checkbox",
+                    value=st.session_state["compare_checked"],
+                )
+                comparison_placeholder = st.empty()
+                if compare_base != st.session_state["compare_checked"]:
+                    st.session_state["compare_preferred"] = compare_base
+                    if compare_base:
+                        comparison_runner.compared(st.session_state.get("usage_flag"))
+                if compare_base and not st.session_state["base_model_response"]:
+                    try:
+                        get_base_model_response(comparison_placeholder)
+                    except Exception as e:
+                        telemetry.error(base_model, e)
+                        st.error(f"An error occurred: {e}")
+                st.session_state["compare_checked"] = compare_base
+
+                # Show both answers if compare checked and base response present
+                if compare_base and st.session_state["base_model_response"]:
+                    show_comparison(comparison_placeholder, st.session_state["fine_tuned_response"],
+                                    st.session_state["base_model_response"])
+                elif not compare_base:
                     st.session_state["base_model_response"] = None
-                    st.session_state["last_input"] = user_input
-                    st.session_state["compare_checked"] = False
-                except Exception as e:
-                    st.error(f"An error occurred: {e}")
-
-        # Show fine-tuned answer
-        if st.session_state["fine_tuned_response"]:
-            st.markdown("### Answer:")
-            st.info(f"🤖 {st.session_state['fine_tuned_response'].choices[0].message.content}")
-
-            # Checkbox to compare with base model, triggers fetch when checked
-            compare_base = st.checkbox(
-                "Compare with base model (gpt-3.5-turbo)",
-                key="compare_checkbox",
-                value=st.session_state["compare_checked"],
-            )
-            if compare_base and not st.session_state["base_model_response"]:
-                get_base_model_response()
-            st.session_state["compare_checked"] = compare_base
-
-            # Show both answers if compare checked and base response present
-            if compare_base and st.session_state["base_model_response"]:
-                st.markdown("### Comparison with Base Model:")
-                st.info(f"🤖 (Fine-Tuned): {st.session_state['fine_tuned_response'].choices[0].message.content}")
-                st.info(f"🤖 (Base): {st.session_state['base_model_response'].choices[0].message.content}")
-            elif not compare_base:
-                st.session_state["base_model_response"] = None
 
 # ----------------- Tab 2: About -----------------
 # - Explains the purpose of the app and details about the fine-tuned model.
@@ -244,69 +505,151 @@ with tab1:
 # - Serves to build trust and understanding for users and stakeholders.
 
 with tab2:
-    st.session_state["active_tab"] = "About"
-    st.header("About This Math Tutor Application")
-    st.markdown("""
-    This application is designed to be a friendly and helpful math tutor for elementary school students.
-    It uses a **fine-tuned GPT-3.5-turbo model** to answer math questions in a clear and age-appropriate way.
+    if tab2.open:
+        st.header("About This Math Tutor Application")
+        st.markdown("""
+        This application is designed to be a friendly and helpful math tutor for elementary school students.
+        It uses a **fine-tuned GPT-3.5-turbo model** to answer math questions in a clear and age-appropriate way.
 
-    ### 🔍 How It Works:
-    The AI was fine-tuned on a dataset of math problems covering:
-    - Basic arithmetic (addition, subtraction, multiplication, division)
-    - Introduction to fractions
-    - Simple geometry (shapes, sides)
-    - Word problems
+        ### 🔍 How It Works:
+        The AI was fine-tuned on a dataset of math problems covering:
+        - Basic arithmetic (addition, subtraction, multiplication, division)
+        - Introduction to fractions
+        - Simple geometry (shapes, sides)
+        - Word problems
 
-    The model is designed to be supportive and explain concepts clearly, often with encouraging language.
+        The model is designed to be supportive and explain concepts clearly, often with encouraging language.
 
-    ### 💡 Usage Tips:
-    - Ask clear and simple math questions
-    - Best used for elementary-level math
-    - Try rephrasing if a response seems unclear
+        ### 💡 Usage Tips:
+        - Ask clear and simple math questions
+        - Best used for elementary-level math
+        - Try rephrasing if a response seems unclear
 
-    ### 🤖 Model Details:
-    - **Base Model:** gpt-3.5-turbo-0125
-    - **Fine-tuned Model :** Custom fine-tuned version for elementary-level math tutoring
+        ### 🤖 Model Details:
+        - **Base Model:** gpt-3.5-turbo-0125
+        - **Fine-tuned Model :** Custom fine-tuned version for elementary-level math tutoring
 
-    """)
+        """)
 
 # ----------------- Tab 3: Feedback -----------------
 # - Provides a simple interface for users to submit comments and rate the tutor’s helpfulness.
 # - Collects feedback via a text area and a radio button rating.
-# - On submission, thanks the user and prints the feedback to the console.
-# - Feedback is not persisted in this version, but the UI demonstrates how to gather it for future extension.
+# - On submission, thanks the user and queues the feedback for the feedback store, together with the
+#   current question, the answer shown (and the base model's, if compared), the model and the answer time.
+# - The store writes in the background, so submitting never waits for the disk.
 with tab3:
-    st.session_state["active_tab"] = "Feedback"
-    st.header("Feedback")
-    st.markdown("We'd love to hear your thoughts on how to make this Math Tutor better!")
-
-    feedback_text = st.text_area("Your comments or suggestions:", key="feedback_text_area")
-
-    # Important: Do NOT change tabs automatically when radio is changed
-    rating = st.radio(
-        "How helpful was the tutor?",
-        ["Not Helpful", "Slightly Helpful", "Helpful", "Very Helpful"],
-        index=None,
-        key="feedback_rating_radio",
-        on_change=None  # no tab switch triggered here
-    )
-
-    submit_button = st.button("Submit Feedback", key="feedback_submit_button")
-
-    if submit_button:
-        feedback_data = {
-            "comment": feedback_text,
-            "rating": rating,
-        }
-        st.success("Thank you for your feedback!")
-        print("Feedback submitted:", feedback_data)
+    if tab3.open:
+        st.header("Feedback")
+        st.markdown("We'd love to hear your thoughts on how to make this Math Tutor better!")
+
+        feedback_text = st.text_area("Your comments or suggestions:", key="feedback_text_area")
+
+        # Important: Do NOT change tabs automatically when radio is changed
+        rating = st.radio(
+            "How helpful was the tutor?",
+            RATINGS,
+            index=None,
+            key="feedback_rating_radio",
+            on_change=None  # no tab switch triggered here
+        )
+
+        submit_button = st.button("Submit Feedback", key="feedback_submit_button")
+
+        if submit_button:
+            feedback_data = {
+                "session_id": st.session_state["session_id"],
+                "question": st.session_state["last_input"] or None,
+                "model": st.session_state["answer_model"],
+                "answer": st.session_state["fine_tuned_response"],
+                "latency_ms": st.session_state["answer_latency_ms"],
+                "base_answer": st.session_state["base_model_response"],
+                "comment": feedback_text,
+                "rating": rating,
+            }
+            feedback_store.submit(feedback_data)
+            st.success("Thank you for your feedback!")
 
 # ----------------- Sidebar Content -----------------
 # - Presents quick informational snippets about the app and instructions.
 # - Reinforces app purpose and navigation tips for first-time users.
+# - Shows how many answers came from the shared response cache instead of the API, and how many pinned
+#   answers of popular questions were used.
+# - Lets users turn off streaming (answers then appear all at once when complete).
+# - Shows how base model answers were fetched in the background, and how many were cancelled or capped.
+# - Shows the rating distribution and average answer time per model from the stored feedback.
+# - For admins only: model call telemetry over the last 1,000 answers per model (latency and first token
+#   percentiles, cache hit rate, errors, tokens and estimated cost).
+# - The statistics panels are only computed while they are expanded.
 
 with st.sidebar:
     st.header("Quick Info")
     st.markdown("📚 **Elementary Math Tutor**")
     st.markdown("Ask questions in the *Math Tutor* tab.")
     st.markdown("Learn more about this application in the About tab.")
+    st.toggle("Stream answers as they are written", key="stream_answers")
+
+    cache_panel = st.expander("Response cache", key="cache_panel", on_change="rerun")
+    with cache_panel:
+        if cache_panel.open:
+            cache_stats = response_cache.stats()
+            st.markdown(f"**Hit rate:** {cache_stats['hit_rate']:.0%} "
+                        f"({cache_stats['hits']} hits, {cache_stats['misses']} misses)")
+            st.markdown(f"**Cached answers:** {cache_stats['disk_size']} on disk, "
+                        f"{cache_stats['memory_size']} in memory")
+            semantic_stats = get_semantic_cache(fine_tuned_model).stats()
+            st.markdown(f"**Similar-question hits:** {semantic_stats['hits']} of "
+                        f"{semantic_stats['hits'] + semantic_stats['misses']} "
+                        f"({semantic_stats['size']} questions indexed)")
+            solver_stats = local_solver.stats()
+            st.markdown(f"**Solved locally:** {solver_stats['solved']} of "
+                        f"{solver_stats['solved'] + solver_stats['passed']} questions")
+            warmer_stats = answer_warmer.stats()
+            refreshed = time.strftime(" (refreshed %H:%M)", time.localtime(warmer_stats["last_refresh"])) \
+                if warmer_stats["last_refresh"] else ""
+            st.markdown(f"**Pinned answers:** {warmer_stats['pinned']}, used {warmer_stats['hits']} times{refreshed}")
+
+    comparison_panel = st.expander("Base model comparison", key="comparison_panel", on_change="rerun")
+    with comparison_panel:
+        if comparison_panel.open:
+            runner_stats = comparison_runner.stats()
+            st.markdown(f"**Mode:** {comparison_mode} (compare rate {runner_stats['compare_rate']:.0%})")
+            st.markdown(f"**Background fetches:** {runner_stats['concurrent']} concurrent, "
+                        f"{runner_stats['speculative']} speculative, {runner_stats['used']} used")
+            st.markdown(f"**Cancelled:** {runner_stats['cancelled']}, **over the cap:** {runner_stats['capped']}")
+
+    feedback_panel = st.expander("Feedback ratings", key="feedback_panel", on_change="rerun")
+    with feedback_panel:
+        if feedback_panel.open:
+            summary = feedback_store.model_summary()
+            if not summary:
+                st.markdown("No feedback yet.")
+            for model, counts in feedback_store.rating_distribution().items():
+                average_score = summary[model]["average_score"]
+                average_latency = summary[model]["average_latency_ms"]
+                scored = f", average {average_score:.1f} / 4" if average_score is not None else ""
+                st.markdown(f"**{model or 'No answer yet'}:** {summary[model]['count']} ratings{scored}")
+                if average_latency is not None:
+                    st.caption(f"Average answer time: {average_latency:.0f} ms")
+                st.bar_chart(counts, horizontal=True, height=150)
+
+    if show_admin_panel:
+        telemetry_panel = st.expander("Model telemetry (admin)", key="telemetry_panel", on_change="rerun")
+        with telemetry_panel:
+            if telemetry_panel.open:
+                telemetry_summary = telemetry.summary()
+                if not telemetry_summary:
+                    st.markdown("No answers yet.")
+                for model, values in telemetry_summary.items():
+                    st.markdown(f"**{model or 'Other errors'}:** {values['events']} answers, "
+                                f"{values['cache_hit_rate']:.0%} without an API call, {values['errors']} errors")
+                    if values["latency_p50_ms"] is not None:
+                        first_token = f", first token {values['ttft_p50_ms']:.0f} ms" \
+                            if values["ttft_p50_ms"] is not None else ""
+                        st.caption(f"API latency p50 {values['latency_p50_ms']:.0f} ms, "
+                                   f"p95 {values['latency_p95_ms']:.0f} ms{first_token}")
+                    if values["api_calls"]:
+                        st.caption(f"{values['completion_tokens']} completion tokens, "
+                                   f"about ${values['cost_usd']:.4f} (${values['totals']['cost_usd']:.4f} "
+                                   f"since start)")
+                    if values["last_error"]:
+                        st.caption(f"Last error: {values['last_error']}")
@@ -0,0 +1,148 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+⏱️ Rerun Benchmark for the Math Tutor Chatbot
+
+Measures how long the Streamlit app takes to start and to rerun, without a browser and without calling
+OpenAI, using Streamlit's `AppTest` runner.
+
+### Code Overview:
+- **Cold start**: a fresh Python process (Streamlit already imported, as in a running server) runs the
+  script once; repeated in several processes and reported as the median.
+- **Reruns**: in one process, every widget interaction reruns the whole script. The benchmark cycles
+  through interactions that stay off the network: picking example questions the local solver answers,
+  switching tabs, toggling streaming, and typing feedback. It reports the median and 95th percentile.
+- `AppTest` compiles the script again on every run, which a real server does only once; the rerun
+  benchmark shares one compiled copy, so the timings show the app's own work.
+- The response cache goes to a temporary database and the API key is a placeholder, so no answers are
+  requested from OpenAI.
+
+Usage:
+    python benchmark_reruns.py                 # 5 cold starts, 200 reruns
+    python benchmark_reruns.py --reruns 500 --cold-starts 10
+    python benchmark_reruns.py --app old-Math-tutor-app.py   # compare with another version of the app
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Math-tutor-app.py")
+
+# Example questions answered by the local solver, so reruns never wait on the network.
+LOCAL_QUESTIONS = ["What is 5 + 2?", "Solve for x: x + 3 = 7", "What is half of 10?"]
+
+
+# ----------------- Helpers -----------------
+# isolated_environment(): Points the response cache and the feedback store at temporary files, sets a
+# placeholder API key and turns off the startup warm-up (its API calls would run during the measurements).
+# percentile(): The value below which the given share of the timings falls.
+
+def isolated_environment():
+    environment = dict(os.environ)
+    directory = tempfile.mkdtemp()
+    environment["MATH_TUTOR_CACHE_PATH"] = os.path.join(directory, "benchmark_cache.sqlite3")
+    environment["MATH_TUTOR_FEEDBACK_PATH"] = os.path.join(directory, "benchmark_feedback.sqlite3")
+    environment.setdefault("OPENAI_API_KEY", "benchmark")
+    environment["MATH_TUTOR_WARM_UP"] = "0"
+    return environment
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+# ----------------- Cold Start -----------------
+# Each cold start runs in its own process and prints the seconds of the first script run.
+
+def cold_start_once(app_path):
+    from streamlit.testing.v1 import AppTest
+
+    started = time.perf_counter()
+    app = AppTest.from_file(app_path, default_timeout=60).run()
+    elapsed = time.perf_counter() - started
+    if app.exception:
+        raise SystemExit(f"App raised: {app.exception[0].value}")
+    print(elapsed)
+
+
+def measure_cold_starts(app_path, count):
+    timings = []
+    for _ in range(count):
+        command = [sys.executable, __file__, "--app", app_path, "--cold-start-once"]
+        output = subprocess.run(command, env=isolated_environment(), check=True, capture_output=True,
+                                text=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+# ----------------- Reruns -----------------
+# One interaction per rerun, in a fixed cycle. Tabs are switched through their session state key when
+# the app tracks the open tab; older versions of the app render every tab on every rerun anyway.
+
+def measure_reruns(app_path, count):
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest, local_script_runner
+
+    os.environ.update(isolated_environment())
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+    app = AppTest.from_file(app_path, default_timeout=60).run()
+
+    def pick_question(step):
+        app.selectbox(key="selected_question").select(LOCAL_QUESTIONS[step % len(LOCAL_QUESTIONS)])
+
+    def switch_tab(step):
+        if "active_tab" in app.session_state:
+            app.session_state["active_tab"] = ["About", "Math Tutor"][step % 2]
+
+    def toggle_streaming(step):
+        app.toggle(key="stream_answers").set_value(step % 2 == 0)
+
+    def type_feedback(step):
+        if "feedback_text_area" in app.session_state:
+            app.session_state["feedback_text_area"] = f"Comment {step}"
+
+    interactions = [pick_question, switch_tab, toggle_streaming, switch_tab, pick_question, type_feedback]
+    timings = []
+    for step in range(count):
+        interactions[step % len(interactions)](step)
+        started = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - started)
+        if app.exception:
+            raise SystemExit(f"App raised: {app.exception[0].value}")
+    return timings
+
+
+def report(name, timings):
+    print(f"{name:<12} n={len(timings):<4} median={statistics.median(timings) * 1000:8.1f} ms   "
+          f"p95={percentile(timings, 0.95) * 1000:8.1f} ms   max={max(timings) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and rerun latency of the Math Tutor app.")
+    parser.add_argument("--app", default=APP_PATH, help="App script to measure (default: Math-tutor-app.py)")
+    parser.add_argument("--reruns", type=int, default=200, help="Reruns to time (default: 200)")
+    parser.add_argument("--cold-starts", type=int, default=5, help="Fresh processes to time (default: 5)")
+    parser.add_argument("--cold-start-once", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+    if args.cold_start_once:
+        cold_start_once(args.app)
+        return
+
+    app_path = os.path.abspath(args.app)
+    report("cold start", measure_cold_starts(app_path, args.cold_starts))
+    report("rerun", measure_reruns(app_path, args.reruns))
+
+
+if __name__ == "__main__":
+    main()
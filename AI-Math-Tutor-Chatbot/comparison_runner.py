@@ -0,0 +1,167 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+⚡ Comparison Runner for the Math Tutor Chatbot
+
+Starts the base model (gpt-3.5-turbo) call while the fine-tuned answer is still being written, so
+"Compare with base model" no longer costs a second round trip after the first one.
+
+### Code Overview:
+- `ComparisonRunner` owns a small thread pool shared by every Streamlit session. `submit()` runs a base
+  model fetch in the background and returns a `Future`; the app waits on it only when the student ticks
+  the compare box.
+- Two kinds of background fetches:
+    1. **Concurrent** – the student compared the previous answer, so the next one is fetched alongside.
+    2. **Speculative** – the student has not asked, but many students compare (the compare rate over the
+       last 50 questions reaches 30%), so the answer is fetched just in case.
+- Cost caps keep speculative fetches in check: at most `speculative_per_hour` of them in any hour and at
+  most `max_pending` waiting or running at once. Over a cap, `submit()` returns None and the app falls back
+  to fetching on request.
+- `cancel()` stops a fetch that is no longer needed (the student moved on to another question): a fetch
+  that has not started is dropped, a running one is stopped at its next streamed token through
+  `PrefetchCancelled`, so the rest of the answer is never generated.
+- `stats()` reports how many fetches ran, were used, were cancelled or were skipped by a cap.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# ----------------- Comparison Settings -----------------
+# - 4 worker threads: base model calls are network-bound, and a few cover many sessions.
+# - Speculation starts when 30% of the last 50 questions were compared.
+# - At most 100 speculative calls per hour and 4 pending at a time.
+
+DEFAULT_WORKERS = 4
+DEFAULT_COMPARE_RATE = 0.3
+DEFAULT_USAGE_WINDOW = 50
+DEFAULT_SPECULATIVE_PER_HOUR = 100
+DEFAULT_MAX_PENDING = 4
+
+
+class PrefetchCancelled(Exception):
+    """Raised inside a background fetch to stop it once its answer is no longer wanted."""
+
+
+# ----------------- Prefetch -----------------
+# One background fetch: its Future, whether it was speculative, and the event that cancels it.
+# check() is given to the fetch function, which calls it between streamed tokens.
+
+class Prefetch:
+
+    def __init__(self, speculative):
+        self.speculative = speculative
+        self.cancelled = threading.Event()
+        self.future = None
+        self.used = False
+
+    def check(self, *_):
+        if self.cancelled.is_set():
+            raise PrefetchCancelled()
+
+
+# ----------------- Comparison Runner -----------------
+# - question_asked() / compared(): record compare usage, one flag per question, over a rolling window.
+# - should_speculate(): True when the recent compare rate reaches `compare_rate`.
+# - submit(fetch, speculative): runs fetch(prefetch.check) on the pool; None when a speculative cap is hit.
+# - result(prefetch, timeout): waits for the answer and marks it used.
+# - cancel(prefetch): stops a fetch that will not be used.
+# A lock keeps the counters exact across sessions.
+
+class ComparisonRunner:
+
+    def __init__(self, workers=DEFAULT_WORKERS, compare_rate=DEFAULT_COMPARE_RATE, window=DEFAULT_USAGE_WINDOW,
+                 speculative_per_hour=DEFAULT_SPECULATIVE_PER_HOUR, max_pending=DEFAULT_MAX_PENDING):
+        self.compare_rate = compare_rate
+        self.speculative_per_hour = speculative_per_hour
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="base-model")
+
+        self.usage = deque(maxlen=window)
+        self.speculative_started = deque()
+        self.pending = 0
+        self.concurrent = 0
+        self.speculative = 0
+        self.used = 0
+        self.cancelled = 0
+        self.capped = 0
+        self._lock = threading.Lock()
+
+    # Returns the usage flag of a new question; pass it to compared() if the student compares.
+    def question_asked(self):
+        flag = [False]
+        with self._lock:
+            self.usage.append(flag)
+        return flag
+
+    def compared(self, flag):
+        if flag is not None:
+            flag[0] = True
+
+    def recent_compare_rate(self):
+        with self._lock:
+            if not self.usage:
+                return 0.0
+            return sum(flag[0] for flag in self.usage) / len(self.usage)
+
+    def should_speculate(self):
+        return self.recent_compare_rate() >= self.compare_rate
+
+    def submit(self, fetch, speculative=False):
+        prefetch = Prefetch(speculative)
+        now = time.monotonic()
+        with self._lock:
+            if speculative:
+                while self.speculative_started and now - self.speculative_started[0] > 3600:
+                    self.speculative_started.popleft()
+                if len(self.speculative_started) >= self.speculative_per_hour or self.pending >= self.max_pending:
+                    self.capped += 1
+                    return None
+                self.speculative_started.append(now)
+                self.speculative += 1
+            else:
+                self.concurrent += 1
+            self.pending += 1
+
+        prefetch.future = self.executor.submit(self._run, fetch, prefetch)
+        return prefetch
+
+    def _run(self, fetch, prefetch):
+        try:
+            prefetch.check()
+            return fetch(prefetch.check)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def result(self, prefetch, timeout=None):
+        answer = prefetch.future.result(timeout)
+        with self._lock:
+            if not prefetch.used:
+                prefetch.used = True
+                self.used += 1
+        return answer
+
+    def cancel(self, prefetch):
+        if prefetch is None or prefetch.used or prefetch.cancelled.is_set():
+            return
+        prefetch.cancelled.set()
+        dropped = prefetch.future.cancel()
+        with self._lock:
+            self.cancelled += 1
+            if dropped:
+                self.pending -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "concurrent": self.concurrent,
+                "speculative": self.speculative,
+                "used": self.used,
+                "cancelled": self.cancelled,
+                "capped": self.capped,
+                "pending": self.pending,
+                "compare_rate": sum(flag[0] for flag in self.usage) / len(self.usage) if self.usage else 0.0,
+            }
@@ -0,0 +1,461 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+🧹 Dataset Tools for the Math Tutor Fine-Tuning Data
+
+Checks and prepares `math_tutor_dataset.jsonl` (or any chat fine-tuning file in the same format) before it
+is uploaded to OpenAI. Every step reads the file as a stream and writes its output as a stream, so a file
+with millions of examples needs no more memory than one with ten.
+
+### Code Overview:
+- **Validation**: every line must be a JSON object with a `messages` list of `role`/`content` messages and
+  at least one assistant message, following OpenAI's chat fine-tuning format. Problems are reported per
+  line with an error code (`invalid_json`, `missing_messages_list`, `unrecognized_role`, ...).
+- **Exact duplicates**: each example is hashed after lowercasing and collapsing whitespace (the same
+  normalization as the response cache), and repeats of an earlier example are removed.
+- **Near duplicates**: a MinHash signature (128 hashes of word 3-grams) is split into 16 bands of 8 for
+  locality-sensitive hashing, which catches examples whose Jaccard similarity is about 0.8 or more. Like the
+  semantic cache, the user question's math signature (its numbers, operators and word-problem operations)
+  is part of every band key, so "7 + 5" and "7 + 6", or "gets 2 more" and "eats 2", are never near
+  duplicates of each other.
+- **Token statistics**: tokens per example counted the way the chat format is billed (with `tiktoken`
+  if it is installed, otherwise a close word-and-symbol estimate), with min/median/p95/max, examples over the
+  16,385-token example limit, and the tokens billed for training.
+- **Train/validation split**: each example goes to one side based on a hash of its content, so the split
+  is reproducible, needs no shuffling buffer, and an example keeps its side when the file grows.
+- Lines are read in chunks and analyzed on a pool of worker processes (hashing, MinHash and token counting
+  run in parallel). At most two chunks per worker are in flight, and results are written in input order.
+  Only the hashes of kept examples stay in memory for deduplication (about 1.5 KB per example).
+
+Usage:
+    python dataset_tools.py validate math_tutor_dataset.jsonl
+    python dataset_tools.py dedup math_tutor_dataset.jsonl deduped.jsonl
+    python dataset_tools.py stats math_tutor_dataset.jsonl --epochs 3
+    python dataset_tools.py split math_tutor_dataset.jsonl train.jsonl validation.jsonl --val-fraction 0.1
+    python dataset_tools.py prepare math_tutor_dataset.jsonl prepared/    # all of the above in one pass
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import zlib
+from collections import Counter, deque
+
+import numpy as np
+
+from response_cache import normalize_prompt
+from semantic_cache import math_signature, normalize_question
+
+# ----------------- Dataset Settings -----------------
+# - Allowed roles and message keys follow OpenAI's chat fine-tuning format.
+# - 16,385 tokens is the longest example gpt-3.5-turbo fine-tuning accepts; longer ones are truncated.
+# - MinHash: 128 hashes in 16 bands of 8 rows, so examples with Jaccard similarity 0.8 collide in at
+#   least one band 95% of the time and examples at 0.5 only 6% of the time.
+# - 2,000 lines per chunk keep each worker busy for a while without holding much in memory.
+
+ROLES = {"system", "user", "assistant", "function", "tool"}
+MESSAGE_KEYS = {"role", "content", "name", "function_call", "tool_calls", "tool_call_id", "weight"}
+MAX_TOKENS_PER_EXAMPLE = 16385
+DEFAULT_EPOCHS = 3
+DEFAULT_PERMUTATIONS = 128
+DEFAULT_BANDS = 16
+SHINGLE_WORDS = 3
+DEFAULT_VAL_FRACTION = 0.1
+DEFAULT_CHUNK_LINES = 2000
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+GOLDEN_RATIO_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+# Stand-in for a tokenizer when tiktoken is missing: one token per word, number or symbol.
+APPROXIMATE_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+# ----------------- Validation -----------------
+# validate_example(): The error codes of one parsed line; an empty list means the example is usable.
+
+def validate_example(example):
+    if not isinstance(example, dict):
+        return ["data_type"]
+    messages = example.get("messages")
+    if not isinstance(messages, list) or not messages:
+        return ["missing_messages_list"]
+
+    errors = []
+    for message in messages:
+        if not isinstance(message, dict) or "role" not in message or "content" not in message:
+            errors.append("message_missing_key")
+            continue
+        if set(message) - MESSAGE_KEYS:
+            errors.append("message_unrecognized_key")
+        if message["role"] not in ROLES:
+            errors.append("unrecognized_role")
+        content = message["content"]
+        if not (isinstance(content, str) and content.strip()) and not message.get("function_call") \
+                and not message.get("tool_calls"):
+            errors.append("missing_content")
+    if not any(isinstance(message, dict) and message.get("role") == "assistant" for message in messages):
+        errors.append("example_missing_assistant_message")
+    return sorted(set(errors))
+
+
+# ----------------- Hashing -----------------
+# exact_key(): 64-bit hash of the normalized roles and contents.
+# MinHasher.bands_of(): The LSH band keys of an example, each salted with the band number and the user
+# question's math signature. Examples sharing any band key are near duplicates.
+# split_value(): A number in [0, 1) from the example hash and the seed; below the fraction means validation.
+
+def message_text(message):
+    return message.get("content") if isinstance(message.get("content"), str) else ""
+
+
+def exact_key(messages):
+    payload = json.dumps([[message.get("role"), normalize_prompt(message_text(message))] for message in messages])
+    return int.from_bytes(hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+
+    def __init__(self, permutations=DEFAULT_PERMUTATIONS, bands=DEFAULT_BANDS, seed=1):
+        if permutations % bands:
+            raise ValueError("permutations must be a multiple of bands")
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, MERSENNE_PRIME, size=permutations, dtype=np.uint64)
+        self.b = generator.randint(0, MERSENNE_PRIME, size=permutations, dtype=np.uint64)
+        self.bands = bands
+        self.rows = permutations // bands
+        self.row_multipliers = generator.randint(1, MERSENNE_PRIME, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self.band_ids = np.arange(bands, dtype=np.uint64)
+
+    def signature(self, text):
+        words = APPROXIMATE_TOKEN_PATTERN.findall(text.lower())
+        shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+        hashed = np.array([zlib.crc32(shingle.encode("utf-8")) for shingle in shingles if shingle], dtype=np.uint64)
+        if not hashed.size:
+            return None
+        # Unsigned overflow wraps around, as in the usual NumPy MinHash implementations.
+        return (((hashed[:, None] * self.a + self.b) % MERSENNE_PRIME) & MAX_HASH).min(axis=0)
+
+    # Each band's rows are mixed into one 64-bit key in a single vectorized step; the salt and band number
+    # keep equal rows of different bands or math signatures apart.
+    def bands_of(self, messages):
+        signature = self.signature(" ".join(message_text(message) for message in messages))
+        if signature is None:
+            return []
+        question = " ".join(message_text(message) for message in messages if message.get("role") == "user")
+        salt = np.uint64(zlib.crc32(repr(math_signature(normalize_question(question))).encode("utf-8")))
+        rows = signature.reshape(self.bands, self.rows)
+        keys = (rows * self.row_multipliers).sum(axis=1) + (salt << np.uint64(32)) + self.band_ids
+        return (keys * GOLDEN_RATIO_MIX).tolist()
+
+
+def split_value(key, seed):
+    digest = hashlib.blake2b(key.to_bytes(8, "little"), digest_size=8, salt=seed.to_bytes(8, "little")).digest()
+    return int.from_bytes(digest, "little") / 2 ** 64
+
+
+# ----------------- Token Counting -----------------
+# get_encoder(): tiktoken's cl100k_base encoder (used by gpt-3.5-turbo) when installed, otherwise the
+# approximate word-and-symbol splitter. Returns (encode function, exact flag).
+# count_tokens(): Tokens of an example as the chat format counts them: 3 per message, 1 per name and 3
+# to prime the reply, plus the text. Returns (all tokens, assistant tokens).
+
+def get_encoder():
+    try:
+        import tiktoken
+    except ImportError:
+        return APPROXIMATE_TOKEN_PATTERN.findall, False
+    return tiktoken.get_encoding("cl100k_base").encode, True
+
+
+def count_tokens(messages, encode):
+    total, assistant = 3, 0
+    for message in messages:
+        total += 3
+        for key, value in message.items():
+            if isinstance(value, str) and key != "role":
+                tokens = len(encode(value))
+                total += tokens
+                if message.get("role") == "assistant" and key == "content":
+                    assistant += tokens
+            if key == "name":
+                total += 1
+        total += len(encode(message.get("role", "")))
+    return total, assistant
+
+
+# ----------------- Worker Processes -----------------
+# Each worker builds its tokenizer and MinHasher once, then analyzes chunks of lines. A record is
+# (line number, line, errors, exact key, band keys, tokens, assistant tokens, messages, split value).
+
+_worker = {}
+
+
+def init_worker(near_duplicates, seed):
+    _worker["encode"], _worker["exact_tokens"] = get_encoder()
+    _worker["minhasher"] = MinHasher() if near_duplicates else None
+    _worker["seed"] = seed
+
+
+def analyze_chunk(first_line, lines):
+    encode, minhasher, seed = _worker["encode"], _worker["minhasher"], _worker["seed"]
+    records = []
+    for number, line in enumerate(lines, start=first_line):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            records.append((number, line, ["empty_line"], None, None, 0, 0, 0, 0.0))
+            continue
+        try:
+            example = json.loads(line)
+        except ValueError:
+            records.append((number, line, ["invalid_json"], None, None, 0, 0, 0, 0.0))
+            continue
+        errors = validate_example(example)
+        if errors:
+            records.append((number, line, errors, None, None, 0, 0, 0, 0.0))
+            continue
+
+        messages = example["messages"]
+        key = exact_key(messages)
+        bands = minhasher.bands_of(messages) if minhasher else []
+        tokens, assistant_tokens = count_tokens(messages, encode)
+        records.append((number, line, [], key, bands, tokens, assistant_tokens, len(messages), split_value(key, seed)))
+    return records
+
+
+def read_chunks(path, chunk_lines):
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        first_line, lines = 1, []
+        for line in source:
+            lines.append(line)
+            if len(lines) == chunk_lines:
+                yield first_line, lines
+                first_line, lines = first_line + len(lines), []
+        if lines:
+            yield first_line, lines
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+# Pool.imap() would read the whole input ahead of the workers, so chunks are submitted by hand with at
+# most two per worker in flight. With one worker everything runs in this process.
+def analyze_file(path, workers=DEFAULT_WORKERS, chunk_lines=DEFAULT_CHUNK_LINES, near_duplicates=True, seed=0):
+    if workers <= 1:
+        init_worker(near_duplicates, seed)
+        for first_line, lines in read_chunks(path, chunk_lines):
+            yield from analyze_chunk(first_line, lines)
+        return
+
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(near_duplicates, seed)) as pool:
+        pending = deque()
+        for chunk in read_chunks(path, chunk_lines):
+            pending.append(pool.apply_async(analyze_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+# ----------------- Length Statistics -----------------
+# Counts of each token length rather than a list of lengths, so percentiles are exact in little memory.
+
+class LengthStats:
+
+    def __init__(self):
+        self.examples = 0
+        self.messages = 0
+        self.assistant_tokens = 0
+        self.lengths = Counter()
+
+    def add(self, tokens, assistant_tokens, messages):
+        self.examples += 1
+        self.messages += messages
+        self.assistant_tokens += assistant_tokens
+        self.lengths[tokens] += 1
+
+    def percentile(self, share):
+        target, seen = share * (self.examples - 1), 0
+        for length in sorted(self.lengths):
+            seen += self.lengths[length]
+            if seen > target:
+                return length
+        return 0
+
+    def summary(self, epochs=DEFAULT_EPOCHS):
+        if not self.examples:
+            return {"examples": 0}
+        total = sum(length * count for length, count in self.lengths.items())
+        billed = sum(min(length, MAX_TOKENS_PER_EXAMPLE) * count for length, count in self.lengths.items())
+        return {
+            "examples": self.examples,
+            "messages_per_example": round(self.messages / self.examples, 2),
+            "tokens_min": min(self.lengths),
+            "tokens_median": self.percentile(0.5),
+            "tokens_p95": self.percentile(0.95),
+            "tokens_max": max(self.lengths),
+            "tokens_mean": round(total / self.examples, 1),
+            "assistant_tokens_mean": round(self.assistant_tokens / self.examples, 1),
+            "examples_over_limit": sum(count for length, count in self.lengths.items()
+                                       if length > MAX_TOKENS_PER_EXAMPLE),
+            "tokens_total": total,
+            "billed_training_tokens": billed * epochs,
+            "epochs": epochs,
+        }
+
+
+# ----------------- Pipeline -----------------
+# run(): One pass over the file. Invalid lines go to `errors` (a JSONL report), duplicates are dropped
+# when `dedup` is set, and the remaining lines go to `train` or, by split value, to `validation`.
+# Any output may be None. Returns the counts and the length statistics of the kept examples.
+
+def open_output(path):
+    if path is None:
+        return None
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8")
+
+
+def run(path, train=None, validation=None, errors=None, dedup=False, near_duplicates=True,
+        val_fraction=0.0, seed=0, workers=DEFAULT_WORKERS, chunk_lines=DEFAULT_CHUNK_LINES):
+    counts = Counter({name: 0 for name in ["lines", "invalid", "exact_duplicates", "near_duplicates", "kept",
+                                           "train", "validation"]})
+    error_codes = Counter()
+    lengths = LengthStats()
+    seen_exact, seen_bands = set(), set()
+    outputs = {"train": open_output(train), "validation": open_output(validation), "errors": open_output(errors)}
+
+    try:
+        records = analyze_file(path, workers, chunk_lines, dedup and near_duplicates, seed)
+        for number, line, problems, key, bands, tokens, assistant_tokens, messages, value in records:
+            counts["lines"] += 1
+            if problems:
+                counts["invalid"] += 1
+                error_codes.update(problems)
+                if outputs["errors"]:
+                    outputs["errors"].write(json.dumps({"line": number, "errors": problems}) + "\n")
+                continue
+            if dedup:
+                if key in seen_exact:
+                    counts["exact_duplicates"] += 1
+                    continue
+                if any(band in seen_bands for band in bands):
+                    counts["near_duplicates"] += 1
+                    continue
+                seen_exact.add(key)
+                seen_bands.update(bands)
+
+            counts["kept"] += 1
+            lengths.add(tokens, assistant_tokens, messages)
+            side = "validation" if value < val_fraction else "train"
+            counts[side] += 1
+            if outputs[side]:
+                outputs[side].write(line + "\n")
+    finally:
+        for output in outputs.values():
+            if output is not None and output is not sys.stdout:
+                output.close()
+
+    return {"counts": dict(counts), "error_codes": dict(error_codes), "lengths": lengths}
+
+
+# ----------------- Command Line -----------------
+
+def print_report(title, values, names=None):
+    print(title, file=sys.stderr)
+    for name, value in values.items():
+        if names and name not in names:
+            continue
+        print(f"  {name:<34} {value}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate, deduplicate, measure and split a chat fine-tuning "
+                                                 "JSONL file.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Worker processes (default: {DEFAULT_WORKERS}, the number of cores)")
+    parser.add_argument("--chunk-lines", type=int, default=DEFAULT_CHUNK_LINES,
+                        help=f"Lines per work unit (default: {DEFAULT_CHUNK_LINES})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate = commands.add_parser("validate", help="Check the messages schema; exits with 1 on any error")
+    validate.add_argument("input", help="JSONL file, or - for standard input")
+    validate.add_argument("--errors", default="-", help="Where to write the error report (default: stdout)")
+
+    dedup = commands.add_parser("dedup", help="Drop invalid lines and exact and near duplicates")
+    dedup.add_argument("input")
+    dedup.add_argument("output", help="Deduplicated JSONL file, or - for standard output")
+    dedup.add_argument("--exact-only", action="store_true", help="Skip near-duplicate detection")
+
+    stats = commands.add_parser("stats", help="Token counts and length statistics of the valid examples")
+    stats.add_argument("input")
+    stats.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS,
+                       help=f"Epochs for the billed token estimate (default: {DEFAULT_EPOCHS})")
+
+    split = commands.add_parser("split", help="Split the valid examples into training and validation files")
+    split.add_argument("input")
+    split.add_argument("train")
+    split.add_argument("validation")
+
+    prepare = commands.add_parser("prepare", help="Validate, deduplicate, split and measure in one pass")
+    prepare.add_argument("input")
+    prepare.add_argument("output_dir", help="Gets train.jsonl, validation.jsonl, errors.jsonl and report.json")
+    prepare.add_argument("--exact-only", action="store_true")
+    prepare.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+
+    for command in (split, prepare):
+        command.add_argument("--val-fraction", type=float, default=DEFAULT_VAL_FRACTION,
+                             help=f"Share of examples for validation (default: {DEFAULT_VAL_FRACTION})")
+        command.add_argument("--seed", type=int, default=0, help="Changes which examples go to validation")
+    args = parser.parse_args()
+    options = {"workers": args.workers, "chunk_lines": args.chunk_lines}
+
+    if args.command == "validate":
+        result = run(args.input, errors=args.errors, **options)
+        counts = result["counts"]
+        print_report("Validation", {"lines": counts["lines"], "valid": counts["kept"], "invalid": counts["invalid"],
+                                    **result["error_codes"]})
+        return 1 if counts["invalid"] else 0
+
+    if args.command == "dedup":
+        result = run(args.input, train=args.output, dedup=True, near_duplicates=not args.exact_only, **options)
+        print_report("Deduplication", result["counts"],
+                     ["lines", "invalid", "exact_duplicates", "near_duplicates", "kept"])
+        return 0
+
+    if args.command == "stats":
+        result = run(args.input, **options)
+        _, exact_tokens = get_encoder()
+        print_report("Token statistics" + ("" if exact_tokens else " (approximate: tiktoken is not installed)"),
+                     result["lengths"].summary(args.epochs))
+        return 0
+
+    if args.command == "split":
+        result = run(args.input, train=args.train, validation=args.validation, val_fraction=args.val_fraction,
+                     seed=args.seed, **options)
+        print_report("Split", result["counts"], ["lines", "invalid", "train", "validation"])
+        return 0
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    result = run(args.input, train=os.path.join(args.output_dir, "train.jsonl"),
+                 validation=os.path.join(args.output_dir, "validation.jsonl"),
+                 errors=os.path.join(args.output_dir, "errors.jsonl"), dedup=True,
+                 near_duplicates=not args.exact_only, val_fraction=args.val_fraction, seed=args.seed, **options)
+    report = {"counts": result["counts"], "error_codes": result["error_codes"],
+              "tokens": result["lengths"].summary(args.epochs), "exact_token_counts": get_encoder()[1]}
+    with open(os.path.join(args.output_dir, "report.json"), "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print_report("Prepared", {**result["counts"], **report["tokens"]})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+📊 Offline Evaluation of the Fine-Tuned and Base Models
+
+Sends every question of one or more question sets to the fine-tuned model and to gpt-3.5-turbo and
+reports answer correctness, latency, tokens and throughput for each model.
+
+### Code Overview:
+- **Question sets** are JSONL files, either in the fine-tuning format (`math_tutor_dataset.jsonl`: the
+  user message is the question, the assistant message the reference answer) or held-out sets with
+  `{"question": ..., "answer": ...}` lines, where the answer is a number or a reference text.
+- **Bounded concurrency and rate limiting**: a thread pool of `--concurrency` workers shares one OpenAI
+  client (pooled connections), at most twice that many calls are queued, and a limiter spaces the calls to
+  `--requests-per-minute`. The client retries rate limit and server errors with backoff.
+- **Checkpoint and resume**: each finished call is appended to the checkpoint file and flushed right away.
+  A rerun with the same checkpoint skips every model/question pair already answered under the same
+  `max_tokens` and `temperature` (the response cache key), so an interrupted run never pays for a call
+  twice. Failed calls are not checkpointed and are retried on the next run.
+- **Numeric scoring** runs locally: the expected number is the one after the last "=" of the reference
+  answer (or its last number, or the local solver's answer), and an answer is correct when its own final
+  number is equal. Answers that mention the right number anywhere are counted too.
+- **Report**: per model, the accuracy, latency percentiles (p50/p90/p99), average prompt and completion
+  tokens and, for this run, requests and completion tokens per second. Wins and losses on the questions
+  both models answered are listed as well.
+- `--stub` runs everything against the local OpenAI stand-in (`openai_stub.py`), with no network.
+
+Usage:
+    python evaluate_models.py                                   # the training set, both models
+    python evaluate_models.py --questions held_out.jsonl --concurrency 8 --requests-per-minute 300
+    python evaluate_models.py --stub --stub-latency 0.2         # offline dry run
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fractions import Fraction
+
+from local_solver import solve
+from response_cache import cache_key
+from tutor_settings import BASE_MODEL, FINE_TUNED_MODEL, MAX_TOKENS, TEMPERATURE
+
+# ----------------- Evaluation Settings -----------------
+# The models and generation settings are the app's own (`tutor_settings.py`), so the scores describe what
+# students see.
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "math_tutor_dataset.jsonl")
+DEFAULT_CHECKPOINT = "evaluation_checkpoint.jsonl"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 120
+DEFAULT_RETRIES = 3
+
+NUMBER_PATTERN = re.compile(r"-?\d+(?:,\d{3})*(?:\.\d+)?")
+FINAL_NUMBER_PATTERN = re.compile(r"=\s*(-?\d+(?:,\d{3})*(?:\.\d+)?)")
+
+
+# ----------------- Numeric Scoring -----------------
+# final_number(): The number after the last "=", else the last number in the text, as a Fraction.
+# numbers_in(): Every number in the text.
+
+def parse_number(text):
+    return Fraction(text.replace(",", ""))
+
+
+def numbers_in(text):
+    return [parse_number(number) for number in NUMBER_PATTERN.findall(text or "")]
+
+
+def final_number(text):
+    results = FINAL_NUMBER_PATTERN.findall(text or "")
+    if results:
+        return parse_number(results[-1])
+    numbers = numbers_in(text)
+    return numbers[-1] if numbers else None
+
+
+def score(answer, expected):
+    if expected is None:
+        return {"final": None, "correct": None, "mentioned": None}
+    final = final_number(answer)
+    return {
+        "final": str(final) if final is not None else None,
+        "correct": final == expected,
+        "mentioned": expected in numbers_in(answer),
+    }
+
+
+# ----------------- Question Sets -----------------
+# load_questions(): (question, expected number or None) pairs from every file, without repeats.
+
+def expected_number(question, reference):
+    if isinstance(reference, (int, float)) and not isinstance(reference, bool):
+        return Fraction(str(reference))
+    if isinstance(reference, str) and reference.strip():
+        if NUMBER_PATTERN.fullmatch(reference.strip()):
+            return parse_number(reference.strip())
+        return final_number(reference)
+    solved = solve(question)
+    return final_number(solved) if solved else None
+
+
+def load_questions(paths):
+    questions, seen = [], set()
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "messages" in record:
+                    messages = record["messages"]
+                    question = next((m["content"] for m in messages if m.get("role") == "user"), None)
+                    reference = next((m["content"] for m in reversed(messages) if m.get("role") == "assistant"),
+                                     None)
+                else:
+                    question, reference = record.get("question"), record.get("answer")
+                if question and question not in seen:
+                    seen.add(question)
+                    questions.append((question, expected_number(question, reference)))
+    return questions
+
+
+# ----------------- Rate Limiter -----------------
+# Hands out evenly spaced start times across threads; wait() sleeps until the caller's slot.
+
+class RateLimiter:
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# ----------------- Checkpoint -----------------
+# One JSON line per answered model/question pair, appended and flushed as soon as the answer arrives.
+
+def load_checkpoint(path):
+    results = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interruption
+                results[record["key"]] = record
+    return results
+
+
+# ----------------- Model Calls -----------------
+
+def ask(client, limiter, model, question, max_tokens, temperature):
+    limiter.wait()
+    started = time.perf_counter()
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": question}],
+        max_tokens=max_tokens,
+        temperature=temperature,
+    )
+    latency_ms = (time.perf_counter() - started) * 1000
+    usage = response.usage
+    return {
+        "answer": response.choices[0].message.content or "",
+        "latency_ms": round(latency_ms, 1),
+        "prompt_tokens": usage.prompt_tokens if usage else None,
+        "completion_tokens": usage.completion_tokens if usage else None,
+    }
+
+
+# Submits the pending pairs with at most 2 x concurrency calls queued and checkpoints each answer as it
+# finishes. On Ctrl+C the queued calls are cancelled, but the calls already running are paid for, so they
+# are waited for and checkpointed too. Returns the new records, the failures and the wall time of this run.
+def run_calls(client, pending, checkpoint_path, concurrency, requests_per_minute, max_tokens, temperature):
+    limiter = RateLimiter(requests_per_minute)
+    records, failures = [], []
+    started = time.perf_counter()
+    pairs = iter(pending)
+
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="evaluation") as executor:
+        running = {}
+
+        def fill():
+            for key, model, question, expected in pairs:
+                future = executor.submit(ask, client, limiter, model, question, max_tokens, temperature)
+                running[future] = (key, model, question, expected)
+                if len(running) >= 2 * concurrency:
+                    return
+
+        def collect(future):
+            key, model, question, expected = running.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                failures.append({"model": model, "question": question, "error": str(e)})
+                return
+            record = {"key": key, "model": model, "question": question,
+                      "expected": str(expected) if expected is not None else None,
+                      "max_tokens": max_tokens, "temperature": temperature, **result,
+                      **score(result["answer"], expected)}
+            checkpoint.write(json.dumps(record) + "\n")
+            checkpoint.flush()
+            records.append(record)
+
+        try:
+            fill()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+                fill()
+        except KeyboardInterrupt:
+            cancelled = [future for future in running if future.cancel()]
+            for future in cancelled:
+                running.pop(future)
+            print(f"Interrupted; waiting for {len(running)} calls in flight to checkpoint them.")
+            wait(running)
+            for future in list(running):
+                collect(future)
+            print("Finished answers are saved in the checkpoint.")
+    return records, failures, time.perf_counter() - started
+
+
+# ----------------- Report -----------------
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else None
+
+
+def mean(values):
+    values = [value for value in values if value is not None]
+    return round(statistics.fmean(values), 1) if values else None
+
+
+def summarize(models, results, new_records, failures, wall_seconds):
+    report = {}
+    for model in models:
+        rows = [row for row in results if row["model"] == model]
+        scored = [row for row in rows if row["correct"] is not None]
+        latencies = [row["latency_ms"] for row in rows]
+        new_rows = [row for row in new_records if row["model"] == model]
+        report[model] = {
+            "answered": len(rows),
+            "failed_this_run": sum(failure["model"] == model for failure in failures),
+            "accuracy": round(sum(row["correct"] for row in scored) / len(scored), 3) if scored else None,
+            "mentions_answer": round(sum(row["mentioned"] for row in scored) / len(scored), 3) if scored else None,
+            "latency_p50_ms": percentile(latencies, 0.5),
+            "latency_p90_ms": percentile(latencies, 0.9),
+            "latency_p99_ms": percentile(latencies, 0.99),
+            "prompt_tokens_mean": mean([row["prompt_tokens"] for row in rows]),
+            "completion_tokens_mean": mean([row["completion_tokens"] for row in rows]),
+            "requests_per_second": round(len(new_rows) / wall_seconds, 2) if new_rows and wall_seconds else None,
+            "completion_tokens_per_second": round(sum(row["completion_tokens"] or 0 for row in new_rows)
+                                                  / wall_seconds, 1) if new_rows and wall_seconds else None,
+        }
+
+    if len(models) == 2:
+        by_question = defaultdict(dict)
+        for row in results:
+            if row["correct"] is not None:
+                by_question[row["question"]][row["model"]] = row["correct"]
+        both = [answers for answers in by_question.values() if len(answers) == 2]
+        first, second = models
+        report["head_to_head"] = {
+            "questions": len(both),
+            "only_correct": {first: sum(answers[first] and not answers[second] for answers in both),
+                             second: sum(answers[second] and not answers[first] for answers in both)},
+            "both_correct": sum(answers[first] and answers[second] for answers in both),
+        }
+    return report
+
+
+def print_report(report):
+    for model, values in report.items():
+        print(f"\n{model}")
+        for name, value in values.items():
+            print(f"  {name:<30} {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fine-tuned and base models on question sets.")
+    parser.add_argument("--questions", nargs="+", default=[DATASET_PATH],
+                        help="JSONL question sets (default: math_tutor_dataset.jsonl)")
+    parser.add_argument("--models", nargs="+", default=[FINE_TUNED_MODEL, BASE_MODEL])
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                        help=f"Answers so far; reused to resume (default: {DEFAULT_CHECKPOINT})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests-per-minute", type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help="0 turns the rate limit off")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Client retries per call")
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--temperature", type=float, default=TEMPERATURE)
+    parser.add_argument("--report", help="Also write the report as JSON to this file")
+    parser.add_argument("--stub", action="store_true", help="Answer from the local OpenAI stand-in")
+    parser.add_argument("--stub-latency", type=float, default=0.1, help="Stand-in latency in seconds")
+    args = parser.parse_args()
+
+    from openai import OpenAI
+
+    stub = None
+    if args.stub:
+        from openai_stub import StubServer
+
+        stub = StubServer(latency=args.stub_latency, jitter=args.stub_latency / 2).start()
+        client = OpenAI(api_key="stub", base_url=stub.url, max_retries=args.retries)
+    else:
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=args.retries)
+
+    questions = load_questions(args.questions)
+    checkpoint = load_checkpoint(args.checkpoint)
+    pairs = [(cache_key(model, question, args.max_tokens, args.temperature), model, question, expected)
+             for question, expected in questions for model in args.models]
+    pending = [pair for pair in pairs if pair[0] not in checkpoint]
+    print(f"{len(questions)} questions x {len(args.models)} models: {len(pairs) - len(pending)} answers "
+          f"in the checkpoint, {len(pending)} to request")
+
+    try:
+        new_records, failures, wall_seconds = run_calls(client, pending, args.checkpoint, args.concurrency,
+                                                        args.requests_per_minute, args.max_tokens,
+                                                        args.temperature)
+    finally:
+        if stub:
+            stub.stop()
+
+    checkpoint.update({record["key"]: record for record in new_records})
+    results = [checkpoint[pair[0]] for pair in pairs if pair[0] in checkpoint]
+    report = summarize(args.models, results, new_records, failures, wall_seconds)
+    print_report(report)
+    for failure in failures[:5]:
+        print(f"Failed: {failure['model']}: {failure['question'][:60]!r}: {failure['error']}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+📝 Feedback Store for the Math Tutor Chatbot
+
+Keeps every feedback submission from the Feedback tab in SQLite, together with the question it is about,
+the answer the student saw, which model wrote it and how long the answer took.
+
+### Code Overview:
+- `FeedbackStore.submit()` only puts the record on an in-memory queue and returns at once, so the
+  Streamlit thread never waits for the disk.
+- A background writer thread takes records off the queue in batches (up to 200, or whatever arrived
+  within half a second) and writes each batch in one transaction (group commit). The database runs in
+  WAL mode, so readers are never blocked by the writer.
+- Every batch also updates a small `feedback_totals` table (count and total answer latency per model and
+  rating), so the rating distribution is read from a handful of rows no matter how much feedback exists.
+- Aggregation queries: `rating_distribution()` (counts per model and rating) and `model_summary()`
+  (feedback count, average rating score and average answer latency per model).
+- `flush()` waits until everything submitted so far is on disk; `close()` flushes and stops the writer, and
+  runs automatically when the process exits.
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# ----------------- Feedback Settings -----------------
+# - The database lives next to this file by default (MATH_TUTOR_FEEDBACK_PATH overrides it).
+# - Batches hold up to 200 records and wait at most half a second for more.
+# - At most 10,000 records wait in memory; beyond that new ones are dropped (and counted) rather than
+#   slowing down the app.
+
+DEFAULT_FEEDBACK_PATH = os.getenv(
+    "MATH_TUTOR_FEEDBACK_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tutor_feedback.sqlite3"),
+)
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_SECONDS = 0.5
+DEFAULT_QUEUE_SIZE = 10000
+
+# Ratings offered in the Feedback tab, worst first; the score is the position (1-4).
+RATINGS = ["Not Helpful", "Slightly Helpful", "Helpful", "Very Helpful"]
+NO_RATING = "No rating"
+
+# The columns of a feedback record, in table order.
+FIELDS = ["created", "session_id", "question", "model", "answer", "latency_ms", "base_answer", "rating",
+          "score", "comment"]
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS feedback ("
+    "id INTEGER PRIMARY KEY, created REAL NOT NULL, session_id TEXT, question TEXT, model TEXT, answer TEXT, "
+    "latency_ms REAL, base_answer TEXT, rating TEXT, score INTEGER, comment TEXT)",
+    "CREATE INDEX IF NOT EXISTS feedback_created ON feedback (created)",
+    "CREATE TABLE IF NOT EXISTS feedback_totals ("
+    "model TEXT NOT NULL, rating TEXT NOT NULL, count INTEGER NOT NULL, timed INTEGER NOT NULL, "
+    "latency_ms_total REAL NOT NULL, PRIMARY KEY (model, rating))",
+]
+MODEL, LATENCY, RATING = FIELDS.index("model"), FIELDS.index("latency_ms"), FIELDS.index("rating")
+
+
+def rating_score(rating):
+    return RATINGS.index(rating) + 1 if rating in RATINGS else None
+
+
+# ----------------- Feedback Store -----------------
+# - submit(): queues one record (a dict with any of FIELDS); never blocks. Returns False if it was dropped.
+# - flush(): blocks until every queued record is written.
+# - rating_distribution() / model_summary(): aggregation queries over the totals table.
+# - stats(): records written, batches, dropped records and the current queue length.
+
+class FeedbackStore:
+
+    def __init__(self, path=DEFAULT_FEEDBACK_PATH, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_seconds=DEFAULT_FLUSH_SECONDS, queue_size=DEFAULT_QUEUE_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._read_lock = threading.Lock()
+        self._writer_connection = self._connect()
+        with self._writer_connection:
+            for statement in SCHEMA:
+                self._writer_connection.execute(statement)
+        self._read_connection = self._connect()
+
+        self._writer = threading.Thread(target=self._write_loop, name="feedback-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def submit(self, record):
+        row = dict(record)
+        row.setdefault("created", time.time())
+        if "score" not in row:
+            row["score"] = rating_score(row.get("rating"))
+        try:
+            self._queue.put_nowait(tuple(row.get(field) for field in FIELDS))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        self._queue.join()
+
+    # Background thread: wait for a record, gather a batch, write it in one transaction.
+    def _write_loop(self):
+        while True:
+            row = self._queue.get()
+            if row is None:
+                self._queue.task_done()
+                return
+            batch = [row]
+            deadline = time.monotonic() + self.flush_seconds
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+
+            self._write_batch(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        totals = [(row[MODEL] or "", row[RATING] or NO_RATING, int(row[LATENCY] is not None), row[LATENCY] or 0.0)
+                  for row in batch]
+        try:
+            with self._writer_connection:
+                self._writer_connection.executemany(
+                    f"INSERT INTO feedback ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})", batch
+                )
+                self._writer_connection.executemany(
+                    "INSERT INTO feedback_totals (model, rating, count, timed, latency_ms_total) "
+                    "VALUES (?, ?, 1, ?, ?) "
+                    "ON CONFLICT (model, rating) DO UPDATE SET count = count + 1, timed = timed + excluded.timed, "
+                    "latency_ms_total = latency_ms_total + excluded.latency_ms_total",
+                    totals
+                )
+            self.written += len(batch)
+            self.batches += 1
+        except sqlite3.Error as e:
+            # Keep the writer alive; the batch is lost but the app keeps working
+            self.errors += 1
+            print("Failed to write feedback batch:", e)
+
+    # {model: {rating: count}}, with every rating present for each model.
+    def rating_distribution(self):
+        with self._read_lock:
+            rows = self._read_connection.execute("SELECT model, rating, count FROM feedback_totals").fetchall()
+        distribution = {}
+        for model, rating, count in rows:
+            counts = distribution.setdefault(model, {label: 0 for label in RATINGS + [NO_RATING]})
+            counts[rating] = counts.get(rating, 0) + count
+        return distribution
+
+    # {model: {"count", "average_score", "average_latency_ms"}}; unrated feedback counts but has no score.
+    def model_summary(self):
+        with self._read_lock:
+            rows = self._read_connection.execute(
+                "SELECT model, rating, count, timed, latency_ms_total FROM feedback_totals"
+            ).fetchall()
+        summary = {}
+        for model, rating, count, timed, latency_total in rows:
+            entry = summary.setdefault(model, {"count": 0, "rated": 0, "score_total": 0, "timed": 0,
+                                               "latency_total": 0.0})
+            entry["count"] += count
+            entry["timed"] += timed
+            entry["latency_total"] += latency_total
+            if rating_score(rating):
+                entry["rated"] += count
+                entry["score_total"] += rating_score(rating) * count
+        return {
+            model: {
+                "count": entry["count"],
+                "average_score": entry["score_total"] / entry["rated"] if entry["rated"] else None,
+                "average_latency_ms": entry["latency_total"] / entry["timed"] if entry["timed"] else None,
+            }
+            for model, entry in summary.items()
+        }
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queued": self._queue.qsize(),
+        }
+
+    def close(self):
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer_connection.close()
+        with self._read_lock:
+            self._read_connection.close()
@@ -0,0 +1,351 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+🏫 Load Test for the Math Tutor Chatbot
+
+Simulates many students using one app process at the same time, to find out how many classrooms a
+process can serve and to catch performance regressions. Runs without a browser (Streamlit's `AppTest`)
+and without OpenAI: answers come from the local stand-in (`openai_stub.py`) with injectable latency.
+
+### Code Overview:
+- Every simulated session runs the Math Tutor flow on its own thread, like a browser session on a
+  Streamlit server: open the app, pick an example question, choose "Select your own question", type a
+  word problem, tick "Compare with base model", open the Feedback tab, type a comment, pick a rating and
+  submit. Typed questions use fresh numbers, so they miss the caches and reach the upstream API.
+- Each session repeats the flow `--flows` times, optionally waiting `--think-time` seconds between clicks.
+- The load runs at every level of `--sessions` (for example 5, 10 and 20 sessions at once) in the same
+  process, so the shared caches, thread pool and feedback writer are exercised as on a real server.
+- **Reported** per level: rerun latency (median, p95, max) per interaction, interactions per second,
+  upstream calls per interaction, `st.session_state` size per session after the first and the last flow
+  (growth means state leaks across questions), and process memory growth per session. Sessions per
+  process is estimated as interactions per second x think time, for the levels whose p95 rerun latency of
+  the clicks that do not wait for a model (page loads aside) stays under `--target-p95-ms`.
+- Before the load, one session runs the flow alone with cold caches, and the upstream calls each
+  interaction triggered are counted exactly (background base model fetches included). The startup
+  warm-up of popular answers runs as in production and is counted against the first page load;
+  `--no-warm-up` turns it off.
+- `AppTest` swaps process-wide Streamlit globals on every run, which breaks runs on parallel threads.
+  The harness installs one shared runtime and compiled script instead, as a server process has.
+
+Usage:
+    python load_test.py                                    # 5, 10 and 20 sessions, 0.3 s model latency
+    python load_test.py --sessions 10 40 --latency 0.8 --token-delay 0.02 --flows 3
+    python load_test.py --json load_report.json            # keep the numbers to compare against later
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_reruns import APP_PATH, isolated_environment, percentile
+from tutor_settings import EXAMPLE_QUESTIONS
+
+# ----------------- Load Settings -----------------
+# - Example questions are the app's own (`tutor_settings.py`); the first three are answered by the local solver.
+# - Typed questions are word problems with random numbers, so each one is new to the caches.
+# - Interactions that wait for a model answer, and the first page load, are left out of the plain rerun p95.
+
+TYPED_QUESTIONS = [
+    "Mia has {a} stickers and gets {b} more from her friend. How many stickers does she have now?",
+    "A farmer has {a} apples and puts them in baskets of {b}. How many baskets does he fill?",
+    "There are {a} kids on the bus and {b} get off at the park. How many kids are still on the bus?",
+]
+ANSWER_INTERACTIONS = {"select example", "type question", "compare"}
+PAGE_LOAD = "load"
+DEFAULT_SESSIONS = [5, 10, 20]
+DEFAULT_FLOWS = 2
+DEFAULT_LATENCY = 0.3
+DEFAULT_THINK_TIME = 0.0
+CAPACITY_THINK_TIME = 15.0
+DEFAULT_TARGET_P95_MS = 250.0
+
+
+# ----------------- Shared Runtime -----------------
+# AppTest.run() creates a mock Streamlit runtime, sets it as the process-wide instance, compiles the script
+# and changes config options, then undoes all of it when the run ends; each new AppTest also scans the
+# installed packages for components. With sessions on parallel threads
+# one run would remove the runtime from under another, so those steps are replaced by one shared setup.
+# With a runtime always present, Streamlit warns about every session_state access made between runs, so
+# its log is limited to errors.
+
+def install_shared_runtime():
+    from unittest.mock import MagicMock
+
+    from streamlit import config, logger
+    from streamlit.components.v2.component_manager import BidiComponentManager
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+
+    class RuntimeSlot:
+        _instance = None
+
+    script_cache = ScriptCache()
+    app_test.Runtime = RuntimeSlot
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    components = BidiComponentManager()
+    components.discover_and_register_components(start_file_watching=False)
+    SimulatedSession.components = components
+    config.set_option("global.appTest", True)
+    app_test.patch_config_options = lambda *_: contextlib.nullcontext()
+    logger.set_log_level("error")
+
+
+# ----------------- Measurements -----------------
+# state_size(): Bytes held by a session's st.session_state values, following containers and objects.
+# process_memory(): Resident memory of this process in bytes.
+
+def deep_size(value, seen):
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(key, seen) + deep_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += deep_size(vars(value), seen)
+    return size
+
+
+def state_size(app):
+    seen = set()
+    return sum(deep_size(key, seen) + deep_size(value, seen) for key, value in app.session_state.items())
+
+
+def process_memory():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# ----------------- Simulated Session -----------------
+# One student. Each step of flow() changes a widget, then the app reruns with the tab the student is
+# looking at; on_step(name, seconds) receives every rerun time.
+
+class SimulatedSession:
+    components = None
+
+    def __init__(self, app_path, seed, think_time=DEFAULT_THINK_TIME):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(app_path, default_timeout=120)
+        self.app._bidi_component_manager = self.components
+        self.random = random.Random(seed)
+        self.think_time = think_time
+        self.state_sizes = []
+
+    def rerun(self, name, tab, on_step):
+        if self.think_time:
+            time.sleep(self.random.uniform(0.5, 1.5) * self.think_time)
+        self.app.session_state["active_tab"] = tab
+        started = time.perf_counter()
+        self.app.run()
+        on_step(name, time.perf_counter() - started)
+        if self.app.exception:
+            raise RuntimeError(f"{name}: {self.app.exception[0].value}")
+
+    def flow(self, on_step):
+        app = self.app
+        if not self.state_sizes:
+            self.rerun("load", "Math Tutor", on_step)
+        else:
+            self.rerun("open tutor", "Math Tutor", on_step)
+
+        app.selectbox(key="selected_question").select(self.random.choice(EXAMPLE_QUESTIONS))
+        self.rerun("select example", "Math Tutor", on_step)
+        app.selectbox(key="selected_question").select("Select your own question")
+        self.rerun("own question", "Math Tutor", on_step)
+        question = self.random.choice(TYPED_QUESTIONS).format(a=self.random.randint(10, 999),
+                                                              b=self.random.randint(2, 9))
+        app.text_input(key="user_question").input(question)
+        self.rerun("type question", "Math Tutor", on_step)
+        app.checkbox(key="compare_checkbox").check()
+        self.rerun("compare", "Math Tutor", on_step)
+
+        self.rerun("open feedback", "Feedback", on_step)
+        app.text_area(key="feedback_text_area").input(f"Comment {self.random.randint(1, 10 ** 6)}")
+        self.rerun("type feedback", "Feedback", on_step)
+        app.radio(key="feedback_rating_radio").set_value(self.random.choice(["Helpful", "Very Helpful"]))
+        self.rerun("rate", "Feedback", on_step)
+        app.button(key="feedback_submit_button").click()
+        self.rerun("submit feedback", "Feedback", on_step)
+        self.state_sizes.append(state_size(app))
+
+
+# ----------------- Calibration -----------------
+# One session alone with cold caches; after each rerun, background base model fetches (and the startup
+# warm-up) are waited for, so every upstream call is counted against the interaction that caused it.
+
+def calibrate(app_path, stub, seed, warm_up):
+    from tutor_resources import get_answer_warmer, get_comparison_runner
+
+    runner = get_comparison_runner(int(os.getenv("MATH_TUTOR_SPECULATIVE_PER_HOUR", "100")))
+    warmer = get_answer_warmer()
+    calls = defaultdict(list)
+    before = [sum(stub.calls().values())]
+
+    def on_step(name, _):
+        if warm_up:
+            warmer.ready.wait(30)
+        deadline = time.monotonic() + 30
+        while runner.stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        now = sum(stub.calls().values())
+        calls[name].append(now - before[0])
+        before[0] = now
+
+    SimulatedSession(app_path, seed).flow(on_step)
+    return {name: statistics.fmean(counts) for name, counts in calls.items()}
+
+
+# ----------------- Load Level -----------------
+
+def run_level(app_path, stub, sessions, flows, think_time, seed):
+    timings = defaultdict(list)
+    lock = threading.Lock()
+    errors = []
+
+    def on_step(name, seconds):
+        with lock:
+            timings[name].append(seconds)
+
+    def student(index):
+        session = SimulatedSession(app_path, seed + index, think_time)
+        try:
+            for _ in range(flows):
+                session.flow(on_step)
+        except Exception as e:
+            errors.append(str(e))
+        return session.state_sizes
+
+    calls_before = sum(stub.calls().values())
+    memory_before = process_memory()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="session") as executor:
+        state_sizes = [sizes for sizes in executor.map(student, range(sessions)) if sizes]
+    elapsed = time.perf_counter() - started
+    memory_growth = process_memory() - memory_before
+
+    interactions = sum(len(values) for values in timings.values())
+    local = [value for name, values in timings.items()
+             if name not in ANSWER_INTERACTIONS and name != PAGE_LOAD for value in values]
+    return {
+        "sessions": sessions,
+        "interactions": interactions,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "interactions_per_second": round(interactions / elapsed, 1),
+        "upstream_calls_per_interaction": round((sum(stub.calls().values()) - calls_before) / interactions, 3)
+        if interactions else None,
+        "rerun_p50_ms": round(statistics.median(local) * 1000, 1) if local else None,
+        "rerun_p95_ms": round(percentile(local, 0.95) * 1000, 1) if local else None,
+        "state_kb_first_flow": round(statistics.fmean(sizes[0] for sizes in state_sizes) / 1024, 1)
+        if state_sizes else None,
+        "state_kb_last_flow": round(statistics.fmean(sizes[-1] for sizes in state_sizes) / 1024, 1)
+        if state_sizes else None,
+        "memory_kb_per_session": round(memory_growth / sessions / 1024, 1),
+        "by_interaction": {
+            name: {"n": len(values), "p50_ms": round(statistics.median(values) * 1000, 1),
+                   "p95_ms": round(percentile(values, 0.95) * 1000, 1), "max_ms": round(max(values) * 1000, 1)}
+            for name, values in timings.items()
+        },
+    }
+
+
+def print_level(level):
+    print(f"\n{level['sessions']} sessions: {level['interactions_per_second']} interactions/s, "
+          f"{level['upstream_calls_per_interaction']} upstream calls per interaction, {level['errors']} errors")
+    print(f"  session_state: {level['state_kb_first_flow']} KB after the first flow, "
+          f"{level['state_kb_last_flow']} KB after the last; process memory +{level['memory_kb_per_session']} KB "
+          f"per session")
+    print(f"  {'interaction':<18} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, values in level["by_interaction"].items():
+        print(f"  {name:<18} {values['n']:>5} {values['p50_ms']:>9} {values['p95_ms']:>9} {values['max_ms']:>9}")
+    if level["first_error"]:
+        print(f"  first error: {level['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Math Tutor app with simulated sessions.")
+    parser.add_argument("--app", default=APP_PATH, help="App script to load (default: Math-tutor-app.py)")
+    parser.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSIONS,
+                        help="Concurrent sessions per level (default: 5 10 20)")
+    parser.add_argument("--flows", type=int, default=DEFAULT_FLOWS, help="Flows per session (default: 2)")
+    parser.add_argument("--think-time", type=float, default=DEFAULT_THINK_TIME,
+                        help="Average seconds between a student's clicks (default: 0, as fast as possible)")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help="Stand-in seconds before the first token (default: 0.3)")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Stand-in seconds between streamed words")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stand-in calls that fail")
+    parser.add_argument("--target-p95-ms", type=float, default=DEFAULT_TARGET_P95_MS,
+                        help="Highest acceptable p95 of plain reruns for the capacity estimate (default: 250)")
+    parser.add_argument("--no-warm-up", action="store_true",
+                        help="Do not pin popular answers at startup (MATH_TUTOR_WARM_UP=0)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    environment = isolated_environment()
+    environment["OPENAI_API_KEY"] = "stub"
+    environment["MATH_TUTOR_WARM_UP"] = "0" if args.no_warm_up else "1"
+    os.environ.update(environment)
+
+    from openai_stub import StubServer
+
+    stub = StubServer(latency=args.latency, jitter=args.latency / 2, token_delay=args.token_delay,
+                      error_rate=args.error_rate).start()
+    os.environ["OPENAI_BASE_URL"] = stub.url
+    install_shared_runtime()
+    app_path = os.path.abspath(args.app)
+
+    try:
+        calls = calibrate(app_path, stub, args.seed, not args.no_warm_up)
+        print("Upstream calls per interaction (one session, cold caches):")
+        for name, count in calls.items():
+            print(f"  {name:<18} {count:g}")
+        levels = [run_level(app_path, stub, sessions, args.flows, args.think_time, args.seed + 1000 * sessions)
+                  for sessions in args.sessions]
+    finally:
+        stub.stop()
+
+    for level in levels:
+        print_level(level)
+    think_time = args.think_time or CAPACITY_THINK_TIME
+    healthy = [level for level in levels if not level["errors"] and level["rerun_p95_ms"] is not None
+               and level["rerun_p95_ms"] <= args.target_p95_ms]
+    capacity = max((level["interactions_per_second"] * think_time for level in healthy), default=None)
+    if capacity is None:
+        print(f"\nNo level kept the p95 rerun under {args.target_p95_ms:g} ms.")
+    else:
+        print(f"\nEstimated sessions per process at one click every {think_time:g} s: {capacity:.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"settings": vars(args), "calibration": calls, "levels": levels,
+                       "sessions_per_process": capacity}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
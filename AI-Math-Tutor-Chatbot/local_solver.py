@@ -0,0 +1,313 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+🧮 Local Solver for the Math Tutor Chatbot
+
+Answers plain arithmetic ("What is 5 + 2?", "What is half of 10?") and one-step equations
+("Solve for x: x + 3 = 7") right away, without calling OpenAI. The answers follow the kid-friendly style
+of `math_tutor_dataset.jsonl`: count together, share candies, check the answer, and cheer at the end.
+
+### Code Overview:
+- The question is normalized first: lowercased, math words mapped to symbols ("plus" -> "+",
+  "divided by" -> "/"), and polite filler removed ("what is", "can you tell me", "explain it like I'm in
+  2nd grade").
+- What is left must be exactly one of the supported shapes, otherwise the question is out of scope and
+  goes to the model: `a + b`, `a - b`, `a x b`, `a / b`, `half of a`, `double a`, and the equations
+  `x + a = b`, `a + x = b`, `x - a = b`, `a - x = b`, `ax = b`, `x / a = b` (any single letter works as the
+  variable, either side of the equals sign).
+- Word problems ("I have 3 boxes of crayons...") never match, so the fine-tuned model still explains them.
+- Numbers are computed with `Fraction`, so answers are exact; results that are not whole numbers or short
+  decimals (1 / 3), division by zero and very large numbers are left to the model.
+- `LocalSolver` counts how many questions it answered and how many it passed on, for the sidebar.
+"""
+import re
+import threading
+from fractions import Fraction
+
+# ----------------- Solver Settings -----------------
+# - Numbers above 1,000,000 are left to the model (the templates are meant for elementary math).
+# - Counting on or back is only shown for small steps ("Start with 5 and count 2 more: 6, 7!").
+
+MAX_NUMBER = 1000000
+MAX_COUNTING_STEPS = 5
+
+# Math words mapped to one symbol, longest phrases first.
+OPERATOR_WORDS = [
+    (r"\bmultiplied by\b", " x "),
+    (r"\bdivided by\b", " / "),
+    (r"\btake away\b", " - "),
+    (r"\bplus\b", " + "),
+    (r"\bminus\b", " - "),
+    (r"\btimes\b", " x "),
+    (r"[*×]", " x "),
+    (r"÷", " / "),
+    (r"[−–]", " - "),
+]
+
+# Filler that does not change the question, removed from the start and the end.
+LEADING_FILLER = re.compile(
+    r"^(?:(?:hi|hello|hey|please|can you|could you|tell me|help me|i want to know|"
+    r"what(?:'s| is| does)?|how much is|how much does|calculate|work out|find|equal|equals|"
+    r"solve(?: for [a-z])?|the answer to|answer)\b\s*[:,]?\s*)+"
+)
+TRAILING_FILLER = re.compile(
+    r"(?:\s*(?:[?!.,]|\bplease\b|\bequals?\b|\bequal to\b|=|\bis\b|"
+    r"\bexplain it(?: to me)? like i'?m in (?:kindergarten|(?:the )?\d+(?:st|nd|rd|th) grade)\b))+$"
+)
+
+NUMBER = r"(\d+(?:\.\d+)?)"
+VARIABLE = r"([a-z])"
+
+# The supported shapes, matched against the whole normalized question.
+ARITHMETIC_PATTERN = re.compile(rf"^{NUMBER} ([+\-x/]) {NUMBER}$")
+ADD_PATTERN = re.compile(rf"^(?:add|sum of) {NUMBER} (?:and|to|\+) {NUMBER}$")
+SUBTRACT_PATTERN = re.compile(rf"^subtract {NUMBER} from {NUMBER}$")
+HALF_PATTERN = re.compile(rf"^half of {NUMBER}$")
+DOUBLE_PATTERN = re.compile(rf"^(?:double|twice) {NUMBER}$")
+EQUATION_PATTERN = re.compile(r"^(.+?) = (.+)$")
+# The variable a question asks for ("solve for y"); the filler pattern above removes it from the text.
+NAMED_VARIABLE_PATTERN = re.compile(r"\bsolve for ([a-z])\b")
+TERM_PATTERNS = [
+    ("x+a", re.compile(rf"^{VARIABLE} \+ {NUMBER}$")),
+    ("a+x", re.compile(rf"^{NUMBER} \+ {VARIABLE}$")),
+    ("x-a", re.compile(rf"^{VARIABLE} - {NUMBER}$")),
+    ("a-x", re.compile(rf"^{NUMBER} - {VARIABLE}$")),
+    ("ax", re.compile(rf"^{NUMBER} ?(?:x )?{VARIABLE}$")),
+    ("x/a", re.compile(rf"^{VARIABLE} / {NUMBER}$")),
+]
+
+
+# ----------------- Question Normalization -----------------
+# normalize(): Lowercases the question, maps math words to symbols, spaces out the symbols and removes
+# the filler around the math. "3x" stays together so it can be read as "3 times x" in an equation.
+
+def normalize(question):
+    text = str(question).lower().replace("’", "'")
+    for pattern, replacement in OPERATOR_WORDS:
+        text = re.sub(pattern, replacement, text)
+    text = re.sub(r"(?<=\d)\s*x\s*(?=\d)", " x ", text)
+    text = re.sub(r"(?<=\d),(?=\d{3}\b)", "", text)
+    text = re.sub(r"\s*([+\-/=])\s*", r" \1 ", text)
+    text = " ".join(text.split())
+    text = LEADING_FILLER.sub("", text)
+    text = TRAILING_FILLER.sub("", text)
+    return text.strip(" :")
+
+
+# ----------------- Number Formatting -----------------
+# to_number(): Parses a number and rejects the ones too big for the templates.
+# show(): Writes an exact number the way a student would, or returns None when it has no short decimal
+# form (the model explains fractions like 1/3 better than a template).
+
+def to_number(text):
+    number = Fraction(text)
+    if number > MAX_NUMBER:
+        raise ValueError("number too large")
+    return number
+
+
+def show(number):
+    if number.denominator == 1:
+        return str(number.numerator)
+    denominator = number.denominator
+    for factor in (2, 5):
+        while denominator % factor == 0:
+            denominator //= factor
+    if denominator != 1:
+        return None
+    return f"{float(number):.6f}".rstrip("0").rstrip(".")
+
+
+def is_whole(*numbers):
+    return all(number.denominator == 1 and number >= 0 for number in numbers)
+
+
+# ----------------- Answer Templates -----------------
+# One function per kind of question. Each returns the kid-friendly answer text, or None when the numbers
+# do not fit the template (the question then goes to the model).
+
+def explain_addition(a, b):
+    total = a + b
+    if is_whole(a, b) and 0 < b <= MAX_COUNTING_STEPS:
+        steps = ", ".join(show(a + step) for step in range(1, int(b) + 1))
+        return (f"Let’s count together! Start with {show(a)} and count {show(b)} more: {steps}! "
+                f"So, {show(a)} + {show(b)} = {show(total)}! 🎉 Awesome job!")
+    if is_whole(a, b) and total <= 20:
+        return (f"Easy peasy! If you have {show(a)} apples 🍎 and get {show(b)} more, you have "
+                f"{show(total)} apples! {show(a)} + {show(b)} = {show(total)}! 🍎")
+    return f"Let’s add them! {show(a)} + {show(b)} = {show(total)}! 🎉 You did it! 🎉"
+
+
+def explain_subtraction(a, b):
+    difference = a - b
+    if difference < 0:
+        return (f"Let’s subtract! {show(b)} is bigger than {show(a)}, so we go below zero: "
+                f"{show(a)} - {show(b)} = {show(difference)}! 🎉 Great thinking!")
+    if is_whole(a, b) and 0 < b <= MAX_COUNTING_STEPS:
+        steps = ", ".join(show(a - step) for step in range(1, int(b) + 1))
+        return (f"Let’s count back! Start with {show(a)} and take away {show(b)}: {steps}! "
+                f"So, {show(a)} - {show(b)} = {show(difference)}! 🎉 Great job!")
+    if is_whole(a, b):
+        return (f"Let’s take away! Tom had {show(a)} candies 🍬 and gave away {show(b)}. "
+                f"{show(a)} - {show(b)} = {show(difference)}! Now Tom has {show(difference)} candies left. 🍭")
+    return f"Let’s subtract! {show(a)} - {show(b)} = {show(difference)}! 🎉 Great job!"
+
+
+def explain_multiplication(a, b):
+    product = a * b
+    if is_whole(a, b) and a <= 12 and b <= 12:
+        return (f"Let’s think of it like this: If you have {show(a)} baskets and each basket has {show(b)} "
+                f"apples 🍏, then {show(a)} x {show(b)} = {show(product)} apples! So, you have {show(product)} "
+                f"apples in total! Yum!")
+    return f"Let’s multiply! {show(a)} x {show(b)} = {show(product)}! 🎉 Awesome job!"
+
+
+def explain_division(a, b):
+    if b == 0:
+        return None
+    if is_whole(a, b) and 2 <= b <= 12 and a >= b:
+        quotient, remainder = divmod(int(a), int(b))
+        if remainder:
+            return (f"Let’s share! If you have {show(a)} candies 🍬 and share them equally with {show(b)} friends, "
+                    f"each friend gets {quotient} candies and {remainder} are left over! "
+                    f"{show(a)} ÷ {show(b)} = {quotient} with {remainder} left over. That’s fair sharing!")
+        return (f"If you have {show(a)} candies 🍬 and you want to share them equally with {show(b)} friends, "
+                f"each friend gets {quotient} candies! {show(a)} ÷ {show(b)} = {quotient}! That’s fair sharing!")
+    quotient = show(a / b)
+    if quotient is None:
+        return None
+    return f"Let’s divide! {show(a)} ÷ {show(b)} = {quotient}! 🎉 Great job!"
+
+
+def explain_half(a):
+    half = show(a / 2)
+    if is_whole(a) and a <= 100:
+        return (f"Half means splitting into 2 equal parts! If you share {show(a)} cookies 🍪 equally between "
+                f"2 friends, each friend gets {half}. So, half of {show(a)} is {half}! "
+                f"{show(a)} ÷ 2 = {half}! 🎉")
+    return f"Half means splitting into 2 equal parts! {show(a)} ÷ 2 = {half}, so half of {show(a)} is {half}! 🎉"
+
+
+def explain_double(a):
+    double = show(a * 2)
+    return (f"Double means two of the same! {show(a)} + {show(a)} = {double}, so double {show(a)} is "
+            f"{double}! 🎉 Awesome job!")
+
+
+# explain_equation(): One-step equations. The inverse operation is shown on both sides, then the answer
+# is put back into the equation as a check.
+def explain_equation(shape, variable, a, b, equation):
+    if shape in ("x+a", "a+x"):
+        value, step = b - a, f"Take {show(a)} away from both sides: {variable} = {show(b)} - {show(a)}"
+    elif shape == "x-a":
+        value, step = b + a, f"Add {show(a)} to both sides: {variable} = {show(b)} + {show(a)}"
+    elif shape == "a-x":
+        value, step = a - b, f"{show(a)} minus something is {show(b)}, so {variable} = {show(a)} - {show(b)}"
+    elif shape == "ax":
+        if a == 0:
+            return None
+        value, step = b / a, f"Divide both sides by {show(a)}: {variable} = {show(b)} ÷ {show(a)}"
+    else:
+        if a == 0:
+            return None
+        value, step = b * a, f"Multiply both sides by {show(a)}: {variable} = {show(b)} x {show(a)}"
+
+    if show(value) is None:
+        return None
+    check = equation.replace(variable, show(value)) if shape != "ax" else f"{show(a)} x {show(value)} = {show(b)}"
+    return (f"Let’s find {variable}! We need the number that makes {equation} true. {step} = {show(value)}. "
+            f"Check: {check} ✅ So, {variable} = {show(value)}! 🎉 You did it!")
+
+
+# ----------------- Solver -----------------
+# solve(): Returns the answer text for a question in scope, or None when the model should answer it.
+# An equation is only solved for the variable the question names, if it names one.
+
+def solve(question):
+    text = normalize(question)
+    named = NAMED_VARIABLE_PATTERN.search(str(question).lower())
+    try:
+        match = EQUATION_PATTERN.match(text)
+        if match:
+            return solve_equation(*match.groups(), named.group(1) if named else None)
+
+        match = ARITHMETIC_PATTERN.match(text)
+        if match:
+            a, operator, b = to_number(match.group(1)), match.group(2), to_number(match.group(3))
+            if operator == "+":
+                return explain_addition(a, b)
+            if operator == "-":
+                return explain_subtraction(a, b)
+            if operator == "x":
+                return explain_multiplication(a, b)
+            return explain_division(a, b)
+
+        match = ADD_PATTERN.match(text)
+        if match:
+            return explain_addition(to_number(match.group(1)), to_number(match.group(2)))
+        match = SUBTRACT_PATTERN.match(text)
+        if match:
+            return explain_subtraction(to_number(match.group(2)), to_number(match.group(1)))
+        match = HALF_PATTERN.match(text)
+        if match:
+            return explain_half(to_number(match.group(1)))
+        match = DOUBLE_PATTERN.match(text)
+        if match:
+            return explain_double(to_number(match.group(1)))
+    except (ValueError, ZeroDivisionError):
+        return None
+    return None
+
+
+# The variable side may be on the left or the right of the equals sign; the other side is a number.
+def solve_equation(left, right, named_variable=None):
+    if re.fullmatch(NUMBER, left) and not re.fullmatch(NUMBER, right):
+        left, right = right, left
+    if not re.fullmatch(NUMBER, right):
+        return None
+    equation = f"{left} = {right}"
+    for shape, pattern in TERM_PATTERNS:
+        match = pattern.match(left)
+        if match:
+            if shape in ("a+x", "a-x", "ax"):
+                a, variable = match.groups()
+            else:
+                variable, a = match.groups()
+            if named_variable is not None and variable != named_variable:
+                return None
+            if shape == "ax":
+                equation = f"{a}{variable} = {right}"
+            return explain_equation(shape, variable, to_number(a), to_number(right), equation)
+    return None
+
+
+# ----------------- Local Solver -----------------
+# Wraps solve() with counters of the questions answered locally and the ones passed on to the model.
+# One LocalSolver is shared by every Streamlit session; a lock keeps the counters exact.
+
+class LocalSolver:
+
+    def __init__(self):
+        self.solved = 0
+        self.passed = 0
+        self._lock = threading.Lock()
+
+    def solve(self, question):
+        answer = solve(question)
+        with self._lock:
+            if answer is None:
+                self.passed += 1
+            else:
+                self.solved += 1
+        return answer
+
+    def stats(self):
+        with self._lock:
+            questions = self.solved + self.passed
+            return {
+                "solved": self.solved,
+                "passed": self.passed,
+                "solved_rate": self.solved / questions if questions else 0.0,
+            }
@@ -0,0 +1,206 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+🧪 Local OpenAI Stand-In for the Math Tutor Chatbot
+
+A small HTTP server that speaks the part of the OpenAI API the tutor uses (`POST /v1/chat/completions`,
+plain and streamed), so the app, the evaluation runner and the load test can run without network access
+or API costs. Point the OpenAI client at it with `OPENAI_BASE_URL=http://127.0.0.1:<port>/v1`.
+
+### Code Overview:
+- Answers come from the reference answers in `math_tutor_dataset.jsonl` when the question is in it, from
+  the local solver when it can solve the question, and otherwise from a fixed friendly reply. Every model
+  name gets the same answers: the stub measures the tooling, not answer quality.
+- Latency is injectable: `latency` seconds before the first token (plus up to `jitter` more), and
+  `token_delay` seconds between streamed words. `error_rate` makes that share of calls fail with HTTP 500.
+- Usage (`prompt_tokens`, `completion_tokens`) is reported with one token per word, number or symbol.
+- `StubServer.calls()` counts the requests per model, so callers can check how many upstream calls an
+  interaction made.
+
+Usage:
+    python openai_stub.py --port 8000 --latency 0.5 --token-delay 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8000/v1 OPENAI_API_KEY=stub streamlit run Math-tutor-app.py
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from local_solver import solve
+from response_cache import normalize_prompt
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "math_tutor_dataset.jsonl")
+FALLBACK_ANSWER = "Let's think about it together, one step at a time! 🤔 You can do it! 🎉"
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def load_answers(paths):
+    answers = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                messages = json.loads(line).get("messages", []) if line.strip() else []
+                questions = [message["content"] for message in messages if message.get("role") == "user"]
+                replies = [message["content"] for message in messages if message.get("role") == "assistant"]
+                if questions and replies:
+                    answers[normalize_prompt(questions[-1])] = replies[-1]
+    return answers
+
+
+def count_tokens(text):
+    return len(TOKEN_PATTERN.findall(text))
+
+
+# ----------------- Request Handler -----------------
+# One handler thread per connection (ThreadingHTTPServer), so concurrent clients overlap their latency
+# the way they would against the real API. Settings and counters live on the server object.
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body are written separately; without this, Nagle's algorithm adds ~40 ms per response.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *_):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self.send_json(200, {"object": "list", "data": []})
+        else:
+            self.send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": "Not found"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        stub = self.server.stub
+        model = request.get("model", "")
+        stub.record_call(model)
+
+        time.sleep(stub.latency + random.uniform(0, stub.jitter))
+        if stub.error_rate and random.random() < stub.error_rate:
+            self.send_json(500, {"error": {"message": "Injected stub error", "type": "server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        question = messages[-1].get("content", "") if messages else ""
+        answer = stub.answer(question)
+        usage = {
+            "prompt_tokens": sum(count_tokens(str(message.get("content", ""))) + 3 for message in messages) + 3,
+            "completion_tokens": count_tokens(answer),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if request.get("stream"):
+            self.stream(model, answer, usage if (request.get("stream_options") or {}).get("include_usage") else None)
+            return
+        self.send_json(200, {
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    # Server-sent events, one word per chunk, then the usage chunk when asked for and [DONE].
+    def stream(self, model, answer, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(choices, **extra):
+            chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        words = answer.split(" ")
+        for position, word in enumerate(words):
+            if position:
+                time.sleep(self.server.stub.token_delay)
+            text = word if position == len(words) - 1 else word + " "
+            send([{"index": 0, "delta": {"content": text}, "finish_reason": None}])
+        send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage:
+            send([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+# ----------------- Stub Server -----------------
+# start() serves on a background thread and returns the server; url is the base URL for the OpenAI client.
+
+class StubServer:
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, token_delay=0.0, error_rate=0.0,
+                 answer_paths=(DATASET_PATH,)):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.answers = load_answers([path for path in answer_paths if os.path.exists(path)])
+        self._calls = Counter()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.url = f"http://{host}:{self.server.server_address[1]}/v1"
+
+    def answer(self, question):
+        return self.answers.get(normalize_prompt(question)) or solve(question) or FALLBACK_ANSWER
+
+    def record_call(self, model):
+        with self._lock:
+            self._calls[model] += 1
+
+    def calls(self):
+        with self._lock:
+            return dict(self._calls)
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="openai-stub", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the OpenAI chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds, at random")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed words")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls that fail with HTTP 500")
+    args = parser.parse_args()
+
+    stub = StubServer(args.host, args.port, args.latency, args.jitter, args.token_delay, args.error_rate)
+    print(f"OpenAI stand-in listening on {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+💾 Response Cache for the Math Tutor Chatbot
+
+Keeps model answers so the same question is only sent to OpenAI once, for every student and across
+restarts of the app.
+
+### Code Overview:
+- Answers are keyed by the model name, the normalized question (lowercased, whitespace collapsed),
+  `max_tokens` and `temperature`, so the fine-tuned and base model answers never mix.
+- A small in-memory LRU sits in front of an on-disk SQLite table, so repeat questions are answered from
+  memory and the cache survives restarts.
+- Entries expire after a time to live and both layers are size-bounded with least recently used eviction.
+- Hit, miss and eviction counters report how many API calls the cache saved.
+- Every cached question counts how often it was asked, so `popular()` can name the most frequent
+  questions (for pinning their answers at startup, see `warm_cache.py`). Counts are collected in memory and
+  written with the next disk write, so hits stay free of disk writes.
+- One cache is shared by every Streamlit session in the process (the app creates it with
+  `st.cache_resource`); a lock makes it safe to use from the sessions' threads.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# ----------------- Cache Settings -----------------
+# - The database lives next to this file by default (MATH_TUTOR_CACHE_PATH overrides it).
+# - Answers are kept for 7 days, so improvements to the fine-tuned model show up within a week.
+# - The disk table keeps at most 50,000 answers and the memory layer the 1,000 most recently used.
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "MATH_TUTOR_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tutor_response_cache.sqlite3"),
+)
+DEFAULT_CACHE_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 50000
+DEFAULT_MEMORY_ENTRIES = 1000
+
+
+# ----------------- Cache Keys -----------------
+# normalize_prompt(): Lowercases the question and collapses runs of whitespace, so "What is 5 + 2?"
+# and "what is  5 + 2? " share one answer.
+# cache_key(): Hashes everything that changes the answer into a fixed-length key.
+
+def normalize_prompt(prompt):
+    return " ".join(str(prompt).lower().split())
+
+
+def cache_key(model, prompt, max_tokens, temperature):
+    payload = json.dumps([model, normalize_prompt(prompt), max_tokens, temperature])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ----------------- Response Cache -----------------
+# ResponseCache stores answer text (not the OpenAI response objects) in two layers:
+# - get(): memory first, then disk; a disk hit is copied into memory. Expired answers count as misses.
+# - put(): writes both layers and evicts the least recently used disk rows past max_entries.
+# - stats(): sizes, hit/miss counters split by layer, and the overall hit rate.
+# - recent(): the most recently used unexpired (prompt, answer) pairs of a model, for warming other caches.
+# - asked(): counts one more ask of a cached question answered elsewhere (a pinned answer).
+# - popular(): the most often asked prompts of a model.
+# With path=None the cache is memory-only.
+
+class ResponseCache:
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_CACHE_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory = OrderedDict()
+        self._asked = Counter()
+        self._lock = threading.Lock()
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, model TEXT NOT NULL, prompt TEXT NOT NULL, answer TEXT NOT NULL, "
+                    "created REAL NOT NULL, last_used REAL NOT NULL, asked INTEGER NOT NULL DEFAULT 1)"
+                )
+                columns = {row[1] for row in self._connection.execute("PRAGMA table_info(responses)")}
+                if "asked" not in columns:
+                    # Databases from before ask counting
+                    self._connection.execute("ALTER TABLE responses ADD COLUMN asked INTEGER NOT NULL DEFAULT 1")
+                self._connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def get(self, model, prompt, max_tokens, temperature):
+        key = cache_key(model, prompt, max_tokens, temperature)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    self._asked[key] += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._connection is not None:
+                with self._connection:
+                    row = self._connection.execute(
+                        "SELECT answer, created FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and now - row[1] <= self.ttl:
+                        self._connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                        self._remember(key, row[1], row[0])
+                        self.disk_hits += 1
+                        self._asked[key] += 1
+                        return row[0]
+                    if row is not None:
+                        self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+            self.misses += 1
+            return None
+
+    def put(self, model, prompt, max_tokens, temperature, answer):
+        if not answer:
+            return
+        key = cache_key(model, prompt, max_tokens, temperature)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, answer)
+            if self._connection is None:
+                return
+            with self._connection:
+                # A refreshed answer keeps the question's ask count
+                self._connection.execute(
+                    "INSERT INTO responses (key, model, prompt, answer, created, last_used) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET answer = excluded.answer, created = excluded.created, "
+                    "last_used = excluded.last_used",
+                    (key, model, normalize_prompt(prompt), answer, now, now)
+                )
+                self._write_asked()
+                count = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_entries:
+                    cursor = self._connection.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+                    self.evictions += cursor.rowcount
+
+    # Keep an answer in the memory layer (the caller holds the lock).
+    def _remember(self, key, created, answer):
+        self._memory[key] = (created, answer)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # Add the ask counts collected in memory to the disk rows (the caller holds the lock and a transaction).
+    def _write_asked(self):
+        if self._asked:
+            self._connection.executemany("UPDATE responses SET asked = asked + ? WHERE key = ?",
+                                         [(count, key) for key, count in self._asked.items()])
+            self._asked.clear()
+
+    def asked(self, model, prompt, max_tokens, temperature):
+        with self._lock:
+            self._asked[cache_key(model, prompt, max_tokens, temperature)] += 1
+
+    def popular(self, model, limit):
+        if self._connection is None:
+            return []
+        with self._lock, self._connection:
+            self._write_asked()
+            return [row[0] for row in self._connection.execute(
+                "SELECT prompt FROM responses WHERE model = ? ORDER BY asked DESC, last_used DESC LIMIT ?",
+                (model, limit)
+            )]
+
+    def recent(self, model, limit):
+        if self._connection is None:
+            return []
+        with self._lock:
+            return self._connection.execute(
+                "SELECT prompt, answer FROM responses WHERE model = ? AND created >= ? "
+                "ORDER BY last_used DESC LIMIT ?",
+                (model, time.time() - self.ttl, limit)
+            ).fetchall()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            disk_size = 0
+            if self._connection is not None:
+                disk_size = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_size": len(self._memory),
+                "disk_size": disk_size,
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                with self._connection:
+                    self._write_asked()
+                self._connection.close()
+                self._connection = None
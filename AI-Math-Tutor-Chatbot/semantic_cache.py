@@ -0,0 +1,272 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+🔎 Semantic Cache for the Math Tutor Chatbot
+
+Students ask the same question in many forms ("what's 5+2", "What is 5 + 2?", "5 plus 2?"). The exact
+response cache only matches the same words, so this cache matches questions by meaning instead and
+returns the stored answer of a close enough earlier question.
+
+### Code Overview:
+- `HashingEmbedder` turns a question into a fixed-size vector without any model download: words and
+  character trigrams are hashed into 512 signed buckets and the vector is L2-normalized. Math words are
+  mapped to symbols first ("plus" -> "+", "times" -> "x", "half of 10" -> "10 / 2"), so wording changes barely
+  move the vector.
+- Every question also gets a math signature: its numbers, operators and the operations named by
+  word-problem verbs ("gets 2 more" adds, "eats 2" takes away, "3 bags of 4 each" multiplies, "shares
+  equally" divides), each in order of appearance. Two questions only match when their signatures are
+  equal, so "5 + 2" never returns the answer to "5 + 3" or "5 - 2", "8 - 3 + 1" never the answer to
+  "8 + 3 - 1", and "gets 2 more apples" never the answer to "eats 2 apples", however similar the words are.
+- Questions without numbers ("How many sides does a hexagon have?") add their content words to the
+  signature, so a heptagon or "centimeters in a meter" never gets the answer for a hexagon or millimeters;
+  only rewordings that change filler words match.
+- Questions with numbers but no operator or operation word ("What comes after 7?") cannot be told apart
+  by their signature, so they are neither looked up nor stored and always go to the model.
+- `VectorIndex` keeps the vectors in one preallocated NumPy matrix and searches it with a single
+  matrix-vector product (brute force, well under a millisecond for thousands of entries). Its
+  add/search/remove methods are the seam for an approximate nearest-neighbor index (such as FAISS or
+  hnswlib) if the cache ever grows to millions of questions.
+- `SemanticCache` stores one answer per entry, returns it when the cosine similarity reaches the threshold
+  (0.85, or 0.7 for short arithmetic questions whose math signature already matched), and is
+  memory-bounded: at `max_entries` the least recently used entry is replaced.
+"""
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# ----------------- Semantic Cache Settings -----------------
+# - 512 dimensions keep the matrix small (2 KB per question) while hash collisions stay rare for short questions.
+# - 5,000 entries bound the index at about 10 MB.
+# - 0.85 cosine similarity accepts rewordings but not different questions (the math signature guards numbers
+#   and operations).
+# - Short arithmetic questions (numbers and at most 3 other words, like "add 5 and 2") only need 0.7, since
+#   their equal math signature already pins down the problem.
+
+DEFAULT_DIMENSIONS = 512
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_MATH_THRESHOLD = 0.7
+SHORT_QUESTION_WORDS = 3
+
+# Words and symbols mapped to one operator symbol before embedding, longest phrases first.
+OPERATOR_WORDS = [
+    (r"\bmultiplied by\b", " x "),
+    (r"\bdivided by\b", " / "),
+    (r"\btake away\b", " - "),
+    (r"\bhalf of (\d+(?:\.\d+)?)", r" \1 / 2 "),
+    (r"\bdouble (\d+(?:\.\d+)?)", r" \1 x 2 "),
+    (r"\b(plus|add|added to|sum of)\b", " + "),
+    (r"\b(minus|subtract|less)\b", " - "),
+    (r"\b(times|multiply)\b", " x "),
+    (r"\b(divide|over)\b", " / "),
+    (r"[*×]", " x "),
+    (r"÷", " / "),
+    (r"\bwhat'?s\b", "what is"),
+]
+
+# Words that carry no meaning for matching.
+STOP_WORDS = {"a", "an", "the", "is", "what", "please", "can", "you", "tell", "me", "of", "and", "to", "i", "do"}
+
+# Question filler left out of the content words of a question without numbers.
+FILLER_WORDS = STOP_WORDS | {"how", "many", "much", "does", "did", "have", "has", "are", "there", "in", "on",
+                             "for", "it", "its", "be", "with", "know", "explain", "like", "kid"}
+
+# Word-problem phrases that name an operation without a symbol. "How many more ... than" compares, which
+# is a subtraction, so plain "more" only counts as adding when it does not follow "how many".
+OPERATION_WORDS = [
+    ("+", re.compile(r"\b(?<!how many )more\b|\b(gets?|got|buys?|bought|finds?|found|receives?|received|"
+                     r"joins?|joined|altogether|in all|total)\b")),
+    ("-", re.compile(r"\bhow many more\b|\b(eats?|ate|gives? away|gave away|loses?|lost|spends?|spent|"
+                     r"sells?|sold|breaks?|broke|left|remains?|remaining|fewer)\b")),
+    ("x", re.compile(r"\b(each|every|groups? of|rows? of|bags? of|boxes? of)\b")),
+    ("/", re.compile(r"\b(shares?|shared|splits?|equally|among)\b")),
+]
+
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+OPERATOR_PATTERN = re.compile(r"[+\-/=]|(?<=\d )x(?= \d)")
+
+
+# ----------------- Question Normalization -----------------
+# normalize_question(): Lowercases the question, maps math words to symbols and spaces out the symbols.
+# math_signature(): The numbers, the operators and the operations named by words, each in order of
+# appearance (repeats in a row, like "gets 2 more", count once), plus the sorted content words of a
+# question without numbers, as one hashable tuple. An "x" only counts as multiplication between two
+# numbers, so the x in "solve for x" stays a variable.
+# is_distinguishable(): False for questions with numbers but nothing that says what to do with them.
+
+def normalize_question(question):
+    text = str(question).lower()
+    for pattern, replacement in OPERATOR_WORDS:
+        text = re.sub(pattern, replacement, text)
+    text = re.sub(r"(\d)\s*x\s*(\d)", r"\1 x \2", text)
+    text = re.sub(r"([+\-/=?!.,])", r" \1 ", text)
+    return " ".join(text.split())
+
+
+def math_signature(normalized):
+    numbers = tuple(NUMBER_PATTERN.findall(normalized))
+    operators = tuple(OPERATOR_PATTERN.findall(normalized))
+    found = sorted((match.start(), symbol) for symbol, pattern in OPERATION_WORDS
+                   for match in pattern.finditer(normalized))
+    operations = tuple(symbol for position, (_, symbol) in enumerate(found)
+                       if not position or found[position - 1][1] != symbol)
+    words = () if numbers else tuple(sorted({content_word(word) for word in normalized.split()
+                                             if word.isalpha() and word not in FILLER_WORDS}))
+    return numbers, operators, operations, words
+
+
+# Plurals count as the same word ("sides" and "side").
+def content_word(word):
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def is_distinguishable(signature):
+    numbers, operators, operations, _ = signature
+    return not numbers or bool(operators or operations)
+
+
+# ----------------- Hashing Embedder -----------------
+# Hashes word unigrams and character trigrams into `dimensions` buckets with a sign bit, so collisions
+# tend to cancel out, then L2-normalizes the vector so a dot product is the cosine similarity.
+
+class HashingEmbedder:
+
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def features(self, normalized):
+        words = [word for word in normalized.split() if word not in STOP_WORDS and word not in "?!.,"]
+        features = [f"w:{word}" for word in words]
+        joined = f" {' '.join(words)} "
+        features.extend(f"c:{joined[i:i + 3]}" for i in range(len(joined) - 2))
+        return features
+
+    def embed(self, normalized):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in self.features(normalized):
+            hashed = zlib.crc32(feature.encode("utf-8"))
+            vector[hashed % self.dimensions] += 1.0 if hashed & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+# ----------------- Vector Index -----------------
+# A fixed-capacity matrix of unit vectors, one row per slot, plus a group id per row (the model and math
+# signature). search() only considers rows in the same group and returns (slot, similarity) of the best
+# row. Empty slots have group -1. An ANN index can replace this class by providing the same methods.
+
+class VectorIndex:
+
+    def __init__(self, dimensions, capacity):
+        self.vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self.groups = np.full(capacity, -1, dtype=np.int64)
+
+    def add(self, slot, vector, group):
+        self.vectors[slot] = vector
+        self.groups[slot] = group
+
+    def remove(self, slot):
+        self.groups[slot] = -1
+
+    def search(self, vector, group):
+        candidates = np.flatnonzero(self.groups == group)
+        if not len(candidates):
+            return None, 0.0
+        similarities = self.vectors[candidates] @ vector
+        best = int(np.argmax(similarities))
+        return int(candidates[best]), float(similarities[best])
+
+
+# ----------------- Semantic Cache -----------------
+# - lookup(): returns (answer, similarity, matched question) for the closest earlier question of the same
+#   model and math signature, or None when nothing reaches the threshold.
+# - add(): stores a question and its answer, replacing the least recently used entry when full.
+# Both skip questions whose signature cannot tell them apart (see is_distinguishable()).
+# - stats(): entry count, memory used by the index, hits, misses and hit rate.
+# A lock makes the cache safe to share between Streamlit sessions.
+
+class SemanticCache:
+
+    def __init__(self, embedder=None, threshold=DEFAULT_THRESHOLD, math_threshold=DEFAULT_MATH_THRESHOLD,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.math_threshold = math_threshold
+        self.max_entries = max_entries
+        self.index = VectorIndex(self.embedder.dimensions, max_entries)
+        self.questions = [None] * max_entries
+        self.answers = [None] * max_entries
+        self.last_used = np.zeros(max_entries, dtype=np.float64)
+        self.slots = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def group_id(model, signature):
+        return zlib.crc32(repr((model, signature)).encode("utf-8"))
+
+    # The similarity needed for a match: lower for short questions that are mostly numbers and operators.
+    def threshold_for(self, normalized):
+        if not NUMBER_PATTERN.search(normalized):
+            return self.threshold
+        words = [word for word in normalized.split() if word.isalpha() and word not in STOP_WORDS]
+        return self.math_threshold if len(words) <= SHORT_QUESTION_WORDS else self.threshold
+
+    def lookup(self, model, question):
+        normalized = normalize_question(question)
+        signature = math_signature(normalized)
+        if not is_distinguishable(signature):
+            with self._lock:
+                self.misses += 1
+            return None
+        vector = self.embedder.embed(normalized)
+        group = self.group_id(model, signature)
+        with self._lock:
+            slot, similarity = self.index.search(vector, group)
+            if slot is None or similarity < self.threshold_for(normalized):
+                self.misses += 1
+                return None
+            self.last_used[slot] = time.monotonic()
+            self.hits += 1
+            return self.answers[slot], similarity, self.questions[slot][1]
+
+    def add(self, model, question, answer):
+        if not answer:
+            return
+        normalized = normalize_question(question)
+        signature = math_signature(normalized)
+        if not is_distinguishable(signature):
+            return
+        vector = self.embedder.embed(normalized)
+        group = self.group_id(model, signature)
+        with self._lock:
+            slot = self.slots.get((model, normalized))
+            if slot is None:
+                if self.size < self.max_entries:
+                    slot = self.size
+                    self.size += 1
+                else:
+                    slot = int(np.argmin(self.last_used))
+                    self.slots.pop(self.questions[slot], None)
+                self.slots[(model, normalized)] = slot
+            self.index.add(slot, vector, group)
+            self.questions[slot] = (model, normalized)
+            self.answers[slot] = answer
+            self.last_used[slot] = time.monotonic()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "index_bytes": self.index.vectors.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,223 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+📈 Model Call Telemetry for the Math Tutor Chatbot
+
+Records every answer the tutor produces, whether it came from OpenAI, a cache or the local solver:
+how long it took, how soon the first token arrived, how many tokens it used, what it cost and whether it
+failed. Cheap enough to stay on all the time.
+
+### Code Overview:
+- `Telemetry.track(model)` wraps one model call in a `with` block. The call object marks the first token
+  (`first_token()`), takes the `usage` from the response (`set_usage()`), and notes when the answer came
+  from a cache instead (`source`). Leaving the block records wall-clock latency, and an exception leaving
+  the block is recorded as an error (or as cancelled, for a background fetch nobody needed) and re-raised.
+- `Telemetry.record()` records answers that never reach a model call (local solver, semantic cache), and
+  `Telemetry.error()` records errors the app shows to students that happened outside a model call.
+- Cost is estimated from the token counts and the per-million-token prices of each model.
+- **Structured logs**: each event is one JSON line on the `math_tutor.telemetry` logger. With
+  `MATH_TUTOR_TELEMETRY_LOG` set, the lines go to that file through a queue and a background thread, so
+  the app never waits for the disk; the file is flushed when the process exits. Without any handler the
+  JSON is not even built.
+- **Rolling aggregates**: the last 1,000 events per model are kept in a ring buffer, and `summary()`
+  computes counts, cache hit rate, errors, latency and first-token percentiles, tokens and cost from them
+  only when asked (the admin panel). Lifetime totals are kept alongside.
+- Recording an event costs a few microseconds: a lock, a tuple and a deque append.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from comparison_runner import PrefetchCancelled
+
+# ----------------- Telemetry Settings -----------------
+# - Prices in US dollars per million tokens (input, output), matched by model name prefix, longest first.
+#   Fine-tuned gpt-3.5-turbo models are billed at a higher rate than the base model.
+# - 1,000 recent events per model are enough for stable percentiles and take about 200 KB.
+
+PRICES_PER_MILLION = {
+    "ft:gpt-3.5-turbo": (3.00, 6.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+DEFAULT_WINDOW = 1000
+TELEMETRY_LOG_PATH = os.getenv("MATH_TUTOR_TELEMETRY_LOG")
+
+# Where an answer came from; everything but "api" costs nothing. "app" marks errors outside a model call.
+API, RESPONSE_CACHE, SEMANTIC_CACHE, LOCAL_SOLVER = "api", "response_cache", "semantic_cache", "local_solver"
+PINNED, APP = "pinned", "app"
+OK, ERROR, CANCELLED = "ok", "error", "cancelled"
+
+# The fields of one event, in order; recent events are stored as plain tuples.
+FIELDS = ["time", "model", "source", "status", "latency_ms", "ttft_ms", "prompt_tokens", "completion_tokens",
+          "cost_usd", "error"]
+TIME, MODEL, SOURCE, STATUS, LATENCY, TTFT, PROMPT, COMPLETION, COST, ERROR_TEXT = range(len(FIELDS))
+
+logger = logging.getLogger("math_tutor.telemetry")
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    if prompt_tokens is None and completion_tokens is None:
+        return None
+    for prefix in sorted(PRICES_PER_MILLION, key=len, reverse=True):
+        if model.startswith(prefix):
+            input_price, output_price = PRICES_PER_MILLION[prefix]
+            return ((prompt_tokens or 0) * input_price + (completion_tokens or 0) * output_price) / 1_000_000
+    return None
+
+
+def round_ms(value):
+    return round(value, 1) if value is not None else None
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else None
+
+
+# ----------------- Tracked Call -----------------
+# Filled in by the code making the call; Telemetry.track() turns it into an event when the block ends.
+
+class TrackedCall:
+
+    def __init__(self, model):
+        self.model = model
+        self.source = API
+        self.started = time.perf_counter()
+        self.ttft_ms = None
+        self.prompt_tokens = None
+        self.completion_tokens = None
+
+    def first_token(self):
+        if self.ttft_ms is None:
+            self.ttft_ms = (time.perf_counter() - self.started) * 1000
+
+    def set_usage(self, usage):
+        if usage is not None:
+            self.prompt_tokens = usage.prompt_tokens
+            self.completion_tokens = usage.completion_tokens
+
+
+# ----------------- Telemetry -----------------
+# One Telemetry is shared by every session and background thread of the process; a lock guards the
+# ring buffers and totals.
+
+class Telemetry:
+
+    def __init__(self, window=DEFAULT_WINDOW, log_path=TELEMETRY_LOG_PATH):
+        self.window = window
+        self.recent = {}
+        self.totals = {}
+        self._lock = threading.Lock()
+        self._listener = None
+        if log_path:
+            self._start_log(log_path)
+
+    # Log lines are handed to a queue; a listener thread appends them to the file.
+    def _start_log(self, log_path):
+        log_queue = queue.SimpleQueue()
+        file_handler = logging.FileHandler(log_path, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = logging.handlers.QueueListener(log_queue, file_handler)
+        self._listener.start()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        atexit.register(self.close)
+
+    def track(self, model):
+        return _Tracking(self, TrackedCall(model))
+
+    def record(self, model, source, latency_ms, ttft_ms=None, prompt_tokens=None, completion_tokens=None,
+               status=OK, error=None):
+        cost = estimate_cost(model, prompt_tokens, completion_tokens) if source == API else 0.0
+        event = (round(time.time(), 3), model, source, status, round_ms(latency_ms), round_ms(ttft_ms),
+                 prompt_tokens, completion_tokens, cost, error)
+        with self._lock:
+            recent = self.recent.get(model)
+            if recent is None:
+                recent = self.recent[model] = deque(maxlen=self.window)
+                self.totals[model] = {"events": 0, "api_calls": 0, "errors": 0, "prompt_tokens": 0,
+                                      "completion_tokens": 0, "cost_usd": 0.0}
+            recent.append(event)
+            totals = self.totals[model]
+            totals["events"] += 1
+            totals["api_calls"] += source == API
+            totals["errors"] += status == ERROR
+            totals["prompt_tokens"] += prompt_tokens or 0
+            totals["completion_tokens"] += completion_tokens or 0
+            totals["cost_usd"] += cost or 0.0
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(dict(zip(FIELDS, event))))
+
+    # Errors the app catches and shows, unless the model call already recorded them.
+    def error(self, model, exception):
+        if not getattr(exception, "telemetry_recorded", False):
+            self.record(model or "", APP, None, status=ERROR, error=f"{type(exception).__name__}: {exception}")
+
+    # {model: rolling aggregates over the recent events, plus lifetime totals}
+    def summary(self):
+        with self._lock:
+            snapshot = {model: (list(events), dict(self.totals[model])) for model, events in self.recent.items()}
+        summary = {}
+        for model, (events, totals) in snapshot.items():
+            answered = [event for event in events if event[STATUS] == OK]
+            calls = [event for event in answered if event[SOURCE] == API]
+            latencies = [event[LATENCY] for event in calls]
+            first_tokens = [event[TTFT] for event in calls if event[TTFT] is not None]
+            summary[model] = {
+                "events": len(events),
+                "api_calls": len(calls),
+                "cache_hit_rate": (len(answered) - len(calls)) / len(answered) if answered else 0.0,
+                "errors": sum(event[STATUS] == ERROR for event in events),
+                "cancelled": sum(event[STATUS] == CANCELLED for event in events),
+                "latency_p50_ms": percentile(latencies, 0.5),
+                "latency_p95_ms": percentile(latencies, 0.95),
+                "ttft_p50_ms": percentile(first_tokens, 0.5),
+                "ttft_p95_ms": percentile(first_tokens, 0.95),
+                "completion_tokens": sum(event[COMPLETION] or 0 for event in events),
+                "cost_usd": sum(event[COST] or 0.0 for event in events),
+                "last_error": next((event[ERROR_TEXT] for event in reversed(events) if event[ERROR_TEXT]), None),
+                "totals": totals,
+            }
+        return summary
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+# The `with` block of Telemetry.track(): records the call when it ends, successful or not.
+class _Tracking:
+
+    def __init__(self, telemetry, call):
+        self.telemetry = telemetry
+        self.call = call
+
+    def __enter__(self):
+        return self.call
+
+    def __exit__(self, exception_type, exception, traceback):
+        call = self.call
+        latency_ms = (time.perf_counter() - call.started) * 1000
+        status, error = OK, None
+        if exception is not None:
+            if isinstance(exception, PrefetchCancelled):
+                status = CANCELLED
+            else:
+                status, error = ERROR, f"{exception_type.__name__}: {exception}"
+                exception.telemetry_recorded = True
+        ttft_ms = call.ttft_ms
+        if ttft_ms is None and status == OK and call.source == API:
+            ttft_ms = latency_ms  # not streamed: the whole answer arrives at once
+        self.telemetry.record(call.model, call.source, latency_ms, ttft_ms, call.prompt_tokens,
+                              call.completion_tokens, status, error)
+        return False
@@ -0,0 +1,52 @@
+"""
+Tests for the local solver: questions in scope get a correct answer, and everything it cannot answer
+correctly is left to the model (None).
+
+Run with `python -m pytest test_local_solver.py`.
+"""
+import pytest
+
+from local_solver import LocalSolver, solve
+from tutor_settings import EXAMPLE_QUESTIONS
+
+
+@pytest.mark.parametrize("question, answer", [
+    ("What is 5 + 2?", "= 7"),
+    ("what's 9 minus 4", "= 5"),
+    ("What is 3 x 4?", "= 12"),
+    ("What is 12 divided by 3?", "= 4"),
+    ("What is half of 10?", "5"),
+    ("Solve for x: x + 3 = 7", "x = 4"),
+    ("Solve for y: y + 3 = 7", "y = 4"),
+    ("x - 2 = 5", "x = 7"),
+    ("10 - x = 4", "x = 6"),
+    ("Solve for x: 3x = 12", "x = 4"),
+    ("Solve for x: x / 2 = 5", "x = 10"),
+])
+def test_questions_in_scope_are_answered(question, answer):
+    assert answer in solve(question)
+
+
+@pytest.mark.parametrize("question", [
+    "Solve for x: x / 0 = 5",
+    "Solve for x: 0x = 5",
+    "What is 5 / 0?",
+    "What is 1 / 3?",
+    "Solve for y: x + 3 = 7",
+    "Solve for a: 2x = 10",
+    "How many sides does a triangle have?",
+    "Mia has 3 stickers and gets 2 more. How many stickers does she have?",
+])
+def test_questions_out_of_scope_go_to_the_model(question):
+    assert solve(question) is None
+
+
+def test_the_first_three_examples_are_solved_locally():
+    assert [solve(question) is not None for question in EXAMPLE_QUESTIONS] == [True, True, True, False]
+
+
+def test_counters():
+    solver = LocalSolver()
+    solver.solve("What is 5 + 2?")
+    solver.solve("How many sides does a triangle have?")
+    assert solver.stats() == {"solved": 1, "passed": 1, "solved_rate": 0.5}
@@ -0,0 +1,95 @@
+"""
+Tests for the semantic cache's math signature: reworded questions still match, but questions with the same
+numbers and a different operation never share an answer.
+
+Run with `python -m pytest test_semantic_cache.py`.
+"""
+import pytest
+
+from dataset_tools import MinHasher
+from semantic_cache import SemanticCache, is_distinguishable, math_signature, normalize_question
+
+MODEL = "ft:math-tutor"
+GETS_MORE = "Sarah has 3 apples and gets 2 more. How many apples does she have?"
+
+
+def signature(question):
+    return math_signature(normalize_question(question))
+
+
+@pytest.fixture
+def cache():
+    cache = SemanticCache(max_entries=100)
+    cache.add(MODEL, GETS_MORE, "5 apples")
+    cache.add(MODEL, "What is 5 + 2?", "7")
+    return cache
+
+
+@pytest.mark.parametrize("question", [
+    "Sarah has 3 apples and eats 2. How many apples does she have?",
+    "Sarah has 3 apples and gives away 2. How many apples does she have?",
+    "Sarah has 3 apples and loses 2. How many apples are left?",
+    "Sarah has 3 bags of 2 apples each. How many apples does she have?",
+])
+def test_word_problems_with_another_operation_do_not_match(cache, question):
+    assert signature(question) != signature(GETS_MORE)
+    assert cache.lookup(MODEL, question) is None
+
+
+def test_reworded_word_problem_matches(cache):
+    match = cache.lookup(MODEL, "Sarah has 3 apples and she gets 2 more. How many apples does she have now?")
+    assert match is not None and match[0] == "5 apples"
+
+
+@pytest.mark.parametrize("question", ["5 plus 2?", "what's 5+2", "What is 5 + 2"])
+def test_reworded_arithmetic_matches(cache, question):
+    assert cache.lookup(MODEL, question)[0] == "7"
+
+
+def test_numbers_without_an_operation_are_never_cached(cache):
+    assert not is_distinguishable(signature("What comes after 7?"))
+    cache.add(MODEL, "What comes after 7?", "8")
+    assert cache.lookup(MODEL, "What comes before 7?") is None
+    assert cache.stats()["size"] == 2
+
+
+def test_how_many_more_is_a_subtraction():
+    assert signature("Tom has 7 cars and Sam has 3. How many more cars does Tom have?")[2] == ("-",)
+
+
+def test_near_duplicate_bands_keep_operations_apart():
+    hasher = MinHasher()
+    gets = hasher.bands_of([{"role": "user", "content": GETS_MORE}])
+    eats = hasher.bands_of([{"role": "user", "content": GETS_MORE.replace("gets 2 more", "eats 2")}])
+    assert not set(gets) & set(eats)
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("What is 8 - 3 + 1?", "What is 8 + 3 - 1?"),
+    ("Sam has 10 apples. He eats 2 and then gets 3 more. How many apples does he have?",
+     "Sam has 10 apples. He gets 2 more and then eats 3. How many apples does he have?"),
+])
+def test_operations_in_another_order_do_not_match(cached, asked):
+    cache = SemanticCache(max_entries=10)
+    cache.add(MODEL, cached, "cached answer")
+    assert signature(cached) != signature(asked)
+    assert cache.lookup(MODEL, asked) is None
+    assert cache.lookup(MODEL, cached) is not None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("How many sides does a hexagon have?", "How many sides does a heptagon have?"),
+    ("How many sides does an octagon have?", "How many sides does a pentagon have?"),
+    ("How many millimeters are in a meter?", "How many centimeters are in a meter?"),
+    ("How many minutes are in an hour?", "How many minutes are in a day?"),
+])
+def test_questions_without_numbers_need_the_same_content_words(cached, asked):
+    cache = SemanticCache(max_entries=10)
+    cache.add(MODEL, cached, "cached answer")
+    assert cache.lookup(MODEL, asked) is None
+
+
+def test_reworded_question_without_numbers_matches():
+    cache = SemanticCache(max_entries=10)
+    cache.add(MODEL, "How many sides does a hexagon have?", "6")
+    assert cache.lookup(MODEL, "how many sides does a hexagon have")[0] == "6"
@@ -0,0 +1,96 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+🧰 Shared Resources for the Math Tutor Chatbot
+
+Streamlit runs the whole app script again on every click. Everything that should live as long as the
+server process – the OpenAI client and its pooled HTTP connections, the caches, the local solver and the
+background thread pool – is created here once per process with `st.cache_resource` and shared by every
+session and rerun.
+
+### Code Overview:
+- The functions live in their own module so they are decorated once at import, not on every rerun of the
+  app script.
+- Heavy libraries are imported inside the functions that need them: `openai` (most of a second to import)
+  only when the first question needs the API, and NumPy only when the semantic cache is first used. A
+  page load that only shows the tabs or a locally solved answer never imports either.
+- `get_openai_client()`: one client for the process, so HTTPS connections are reused (keep-alive) across
+  questions and sessions instead of a new client, TLS context and connection per rerun.
+- `get_response_cache()`, `get_semantic_cache()`, `get_local_solver()`, `get_comparison_runner()`,
+  `get_feedback_store()`, `get_telemetry()`, `get_answer_warmer()`: the shared caches and helpers used by
+  the app.
+"""
+import os
+
+import streamlit as st
+
+from feedback_store import FeedbackStore
+from local_solver import LocalSolver
+from response_cache import ResponseCache
+from telemetry import Telemetry
+from warm_cache import AnswerWarmer
+
+
+# ----------------- OpenAI Client -----------------
+# Reads the API key from the environment (OPENAI_BASE_URL also works, for a local stand-in server).
+
+@st.cache_resource
+def get_openai_client():
+    from openai import OpenAI
+
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+# ----------------- Caches -----------------
+# get_response_cache(): exact answers in memory and SQLite (see response_cache.py).
+# get_semantic_cache(): reworded questions, warmed with the model's most recently used cached answers.
+
+@st.cache_resource
+def get_response_cache():
+    return ResponseCache()
+
+
+@st.cache_resource
+def get_semantic_cache(model):
+    from semantic_cache import SemanticCache
+
+    cache = SemanticCache()
+    for question, answer in get_response_cache().recent(model, cache.max_entries):
+        cache.add(model, question, answer)
+    return cache
+
+
+# ----------------- Helpers -----------------
+# get_local_solver(): the arithmetic and one-step equation solver with its counters.
+# get_comparison_runner(): the thread pool for background base model answers.
+# get_feedback_store(): the feedback database and its background writer thread.
+# get_telemetry(): latency, token, cost and error records of every answer, with their log file if configured.
+# get_answer_warmer(): the pinned answers of popular questions; the app starts its refresh thread.
+
+@st.cache_resource
+def get_local_solver():
+    return LocalSolver()
+
+
+@st.cache_resource
+def get_comparison_runner(speculative_per_hour):
+    from comparison_runner import ComparisonRunner
+
+    return ComparisonRunner(speculative_per_hour=speculative_per_hour)
+
+
+@st.cache_resource
+def get_feedback_store():
+    return FeedbackStore()
+
+
+@st.cache_resource
+def get_telemetry():
+    return Telemetry()
+
+
+@st.cache_resource
+def get_answer_warmer():
+    return AnswerWarmer()
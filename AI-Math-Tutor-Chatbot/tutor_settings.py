@@ -0,0 +1,35 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+⚙️ Shared Settings for the Math Tutor Chatbot
+
+The models, generation settings and example questions used by the app and by the tools around it
+(`warm_cache.py`, `evaluate_models.py`, `load_test.py`). They are defined once here because the tools
+only describe what students see while they use the same values: the response cache key and the warm-up
+artifact both include `max_tokens` and `temperature`.
+"""
+
+# ----------------- Models -----------------
+# The fine-tuned GPT-3.5 Turbo model that answers students, and the base model it is compared with.
+
+FINE_TUNED_MODEL = "ft:gpt-3.5-turbo-0125:personal:math-tutor:BVPvM7jo"
+BASE_MODEL = "gpt-3.5-turbo"
+
+# ----------------- Generation Settings -----------------
+# Shared by both models; part of the response cache key.
+
+MAX_TOKENS = 150
+TEMPERATURE = 0.7
+
+# ----------------- Example Questions -----------------
+# Offered in the Math Tutor tab (the app adds its "Select your own question" entry); the first three are
+# answered by the local solver.
+
+EXAMPLE_QUESTIONS = [
+    "What is 5 + 2?",
+    "Solve for x: x + 3 = 7",
+    "What is half of 10?",
+    "How many sides does a triangle have?",
+]
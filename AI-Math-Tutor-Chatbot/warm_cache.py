@@ -0,0 +1,253 @@
+"""
+Author: Vema Dondeti
+Date: 2026-10-17
+Version: 1.0
+
+🔥 Startup Warm-Up of Popular Answers for the Math Tutor Chatbot
+
+The example questions in the Math Tutor tab are what most students click first, and a handful of other
+questions are asked over and over. Their answers are fetched once, pinned in memory and refreshed in the
+background, so these clicks show an answer at once and never wait on OpenAI.
+
+### Code Overview:
+- **Targets**: the example questions plus the top-N most often asked questions of each model (counted by
+  the response cache, see `ResponseCache.popular()`), for the fine-tuned and the base model. Questions the
+  local solver answers are skipped for the fine-tuned model (the solver answers them anyway), but not for
+  the base model, which a student comparing answers still asks.
+- **Pinned answers** live in a dict keyed by model and normalized question. Unlike the response cache they
+  never expire and are never evicted; they are replaced only by a newer answer for the same question.
+- **Build-time artifact**: `python warm_cache.py build` writes the pinned answers to `warm_answers.json`
+  (reusing answers already in the response cache). The app loads the file before it serves its first page,
+  so a fresh deployment starts warm; the file is ignored when it was built with other `max_tokens` or
+  `temperature` settings than the app uses.
+- **Background refresh**: `AnswerWarmer.start()` runs a daemon thread that first fetches the targets not
+  yet pinned, then every `refresh_seconds` fetches all of them again and unpins questions that are no
+  longer targets (including artifact questions that are not popular here). A failed fetch keeps the
+  previous answer pinned.
+- `AnswerWarmer.stats()` reports pinned answers, hits, fetches, failures and the last refresh time.
+
+Usage:
+    python warm_cache.py build                           # examples + top 20 questions of both models
+    python warm_cache.py build --top-n 50 --output warm_answers.json
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from local_solver import solve
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache, normalize_prompt
+from tutor_settings import BASE_MODEL, EXAMPLE_QUESTIONS, FINE_TUNED_MODEL, MAX_TOKENS, TEMPERATURE
+
+# ----------------- Warm-Up Settings -----------------
+# - The example questions, models and generation settings are the app's own (`tutor_settings.py`).
+# - The 20 most asked questions per model are pinned besides the examples, about 40 answers or 30 KB.
+# - Pinned answers are fetched again every 6 hours (MATH_TUTOR_WARM_REFRESH_HOURS, 0 turns refreshing off).
+
+DEFAULT_ARTIFACT_PATH = os.getenv(
+    "MATH_TUTOR_WARM_ARTIFACT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "warm_answers.json")
+)
+DEFAULT_TOP_N = int(os.getenv("MATH_TUTOR_WARM_TOP_N", "20"))
+DEFAULT_REFRESH_SECONDS = float(os.getenv("MATH_TUTOR_WARM_REFRESH_HOURS", "6")) * 60 * 60
+
+
+def pin_key(model, question):
+    return model, normalize_prompt(question)
+
+
+# The (model, question) pairs to pin, examples first, each question once per model.
+def warm_targets(popular, top_n=DEFAULT_TOP_N, questions=EXAMPLE_QUESTIONS,
+                 models=(FINE_TUNED_MODEL, BASE_MODEL)):
+    targets = {}
+    for model in models:
+        candidates = list(questions) + (popular(model, top_n) if top_n else [])
+        for question in candidates:
+            if model == FINE_TUNED_MODEL and solve(question) is not None:
+                continue
+            targets.setdefault(pin_key(model, question), (model, question))
+    return list(targets.values())
+
+
+# ----------------- Artifact -----------------
+# A JSON file with the generation settings and a list of {"model", "question", "answer"} entries.
+
+def load_artifact(path, max_tokens=MAX_TOKENS, temperature=TEMPERATURE):
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        artifact = json.load(file)
+    if artifact.get("max_tokens") != max_tokens or artifact.get("temperature") != temperature:
+        return []
+    return [(entry["model"], entry["question"], entry["answer"]) for entry in artifact.get("answers", [])]
+
+
+def save_artifact(path, answers, max_tokens=MAX_TOKENS, temperature=TEMPERATURE):
+    artifact = {
+        "created": round(time.time()),
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "answers": [{"model": model, "question": question, "answer": answer}
+                    for model, question, answer in answers],
+    }
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(artifact, file, ensure_ascii=False, indent=1)
+    os.replace(temporary_path, path)
+
+
+# ----------------- Answer Warmer -----------------
+# One warmer per process (see `tutor_resources.py`). Lookups are a dict read; the background thread swaps
+# in new answers under the lock. Each pinned entry keeps the question as it was asked, for the artifact.
+# - fetch(model, question, refresh) returns an answer; with refresh=True it must not come from a cache.
+# - targets() returns the (model, question) pairs to pin right now (see warm_targets()).
+
+class AnswerWarmer:
+
+    def __init__(self):
+        self._pinned = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ready = threading.Event()
+        self.hits = 0
+        self.fetched = 0
+        self.failures = 0
+        self.refreshes = 0
+        self.last_refresh = None
+
+    def get(self, model, question):
+        entry = self._pinned.get(pin_key(model, question))
+        if entry is None:
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry[1]
+
+    def pin(self, model, question, answer):
+        with self._lock:
+            self._pinned[pin_key(model, question)] = (question, answer)
+
+    # Loads the artifact right away and warms the rest in the background; later calls do nothing.
+    def start(self, fetch, targets, artifact_path=DEFAULT_ARTIFACT_PATH, max_tokens=MAX_TOKENS,
+              temperature=TEMPERATURE, refresh_seconds=DEFAULT_REFRESH_SECONDS):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, args=(fetch, targets, refresh_seconds),
+                                            name="answer-warmer", daemon=True)
+        try:
+            for model, question, answer in load_artifact(artifact_path, max_tokens, temperature):
+                self.pin(model, question, answer)
+        except (OSError, ValueError, KeyError):
+            pass  # A broken artifact only means a cold start
+        self._thread.start()
+
+    def _run(self, fetch, targets, refresh_seconds):
+        try:
+            self.warm(fetch, targets, refresh=False)
+        finally:
+            self.ready.set()
+        while refresh_seconds > 0 and not self._stop.wait(refresh_seconds):
+            self.warm(fetch, targets, refresh=True)
+
+    # Fetches the targets (all of them when refreshing, else the ones not pinned yet); a refresh also unpins
+    # the answers that are no longer targets.
+    def warm(self, fetch, targets, refresh):
+        try:
+            wanted = targets()
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            return
+        for model, question in wanted:
+            if self._stop.is_set():
+                return
+            if not refresh and pin_key(model, question) in self._pinned:
+                continue
+            try:
+                answer = fetch(model, question, refresh)
+            except Exception:
+                with self._lock:
+                    self.failures += 1
+                continue
+            with self._lock:
+                self.fetched += 1
+                if answer:
+                    self._pinned[pin_key(model, question)] = (question, answer)
+        keep = {pin_key(model, question) for model, question in wanted}
+        with self._lock:
+            if refresh:
+                self._pinned = {key: entry for key, entry in self._pinned.items() if key in keep}
+            self.refreshes += 1
+            self.last_refresh = time.time()
+
+    def answers(self):
+        with self._lock:
+            return [(model, question, answer) for (model, _), (question, answer) in self._pinned.items()]
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pinned": len(self._pinned),
+                "hits": self.hits,
+                "fetched": self.fetched,
+                "failures": self.failures,
+                "refreshes": self.refreshes,
+                "last_refresh": self.last_refresh,
+                "ready": self.ready.is_set(),
+            }
+
+
+# ----------------- Build Command -----------------
+# Pins the targets from the response cache where possible and from OpenAI otherwise, then writes the artifact.
+
+def build(output, top_n, cache_path):
+    from openai import OpenAI
+
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    cache = ResponseCache(cache_path)
+
+    def fetch(model, question, refresh):
+        answer = cache.get(model, question, MAX_TOKENS, TEMPERATURE)
+        if answer is None:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": question}],
+                max_tokens=MAX_TOKENS,
+                temperature=TEMPERATURE,
+            )
+            answer = response.choices[0].message.content
+            cache.put(model, question, MAX_TOKENS, TEMPERATURE, answer)
+        return answer
+
+    warmer = AnswerWarmer()
+    try:
+        warmer.warm(fetch, lambda: warm_targets(cache.popular, top_n), refresh=False)
+    finally:
+        cache.close()
+    answers = warmer.answers()
+    save_artifact(output, answers)
+    stats = warmer.stats()
+    print(f"Pinned {len(answers)} answers ({stats['fetched']} fetched, {stats['failures']} failed) to {output}")
+    return 1 if stats["failures"] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the answers the tutor app pins at startup.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Write the warm-up artifact")
+    build_parser.add_argument("--output", default=DEFAULT_ARTIFACT_PATH)
+    build_parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N,
+                              help="Most asked questions per model to pin besides the examples")
+    build_parser.add_argument("--cache", default=None, help="Response cache database (default: the app's)")
+    args = parser.parse_args()
+    return build(args.output, args.top_n, args.cache or DEFAULT_CACHE_PATH)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,6 +9,58 @@
 # Change(s) Made: Initial creation of the weather lookup program.
 # Date of Change: 8/08/20024
 # Author: Vema Dondeti
+#
+# Change#: 2
+# Change(s) Made: Added an asyncio bulk lookup mode that reads locations from a CSV or JSONL file
+#                 and runs the geo and weather lookups concurrently over a shared connection pool.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 3
+# Change(s) Made: Added a persistent SQLite geocoding cache so coordinates are reused across lookups and runs.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 4
+# Change(s) Made: Zip code lookups resolve coordinates from the offline ZCTA gazetteer when it is available.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 5
+# Change(s) Made: Weather is fetched in Kelvin and converted to the chosen unit locally, and responses are
+#                 cached in memory by rounded coordinates for a short time to live.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 6
+# Change(s) Made: API requests go through a shared WeatherTransport with connection pooling, timeouts,
+#                 retries with backoff and single-flight coalescing; it also reports request errors.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 7
+# Change(s) Made: Split the lookups into a non-interactive API (weather_lookup.py) that returns WeatherResult
+#                 objects; WeatherProgram moved to weather_program.py. main() is now a thin interactive
+#                 shell over the API, and bulk mode streams NDJSON or CSV rows as lookups finish.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 8
+# Change(s) Made: Added --api-base so the program can run against the local OpenWeatherMap stub (owm_stub.py).
+#                 The lookups can also be served over HTTP by weather_service.py.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 9
+# Change(s) Made: Added --timings and --metrics-file to report per-stage timings and counters (weather_metrics.py).
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 10
+# Change(s) Made: Added --rate-limit and --rate-limit-file to keep every API request inside a calls-per-minute
+#                 budget shared with other processes; bulk lookups yield to interactive ones.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
 
 
 """
@@ -19,258 +71,154 @@ This program allows users to look up the current weather by either city name or
 Users can choose between Celsius, Fahrenheit, or Kelvin for temperature units. The program retrieves
 weather data from the OpenWeatherMap API and displays it in a formatted manner.
 
+Library API:
+The lookups themselves live in weather_lookup.py (WeatherLookup and WeatherResult) and WeatherProgram
+(weather_program.py), so services and batch jobs can use them without prompts or printed output. This
+file is the interactive shell and command line over that API. weather_service.py serves the same
+lookups over HTTP as a long-lived service.
+
+Bulk Mode:
+Running the program with --bulk <file> looks up the weather for every location in a CSV or JSONL
+file instead of prompting for one location at a time. Each row provides either 'city' and 'state'
+or 'zip', and optionally 'units' (C, F, or K). Lookups run concurrently under asyncio, limited by
+--concurrency, and share one pooled HTTP transport. Results are written as they finish, either as
+a readable table (--format text) or as NDJSON or CSV rows (--format ndjson/csv, optionally --output).
+
+Geocoding Cache:
+Coordinates returned by the geo API are stored in an on-disk SQLite cache (weather_cache.py) keyed by the
+normalized city/state or zero-padded zip code, so repeated locations skip the geo API call. The cache
+can be disabled with --no-geo-cache.
+
+Zip Code Gazetteer:
+When the zcta_centroids.bin table has been built (see zip_gazetteer.py), zip code coordinates come from
+the memory-mapped local table and the geo API is only called for zip codes that are not in it.
+
+Weather Cache:
+Weather is always requested in one canonical unit (Kelvin) and converted to Celsius or Fahrenheit when
+it is displayed, so looking up the same place in different units needs only one API call. Responses are
+kept in memory by coordinates rounded to about a kilometer for --weather-cache-ttl seconds.
+
+HTTP Transport:
+All API requests go through a WeatherTransport (weather_transport.py) that reuses keep-alive connections,
+applies connect/read timeouts, retries 429 and 5xx responses with jittered exponential backoff, and
+coalesces concurrent requests for the same URL into one call.
+
+Rate Limit:
+--rate-limit N keeps the requests to N calls per minute with a token bucket (weather_rate_limit.py). The
+bucket is kept in a small file (--rate-limit-file) so every process using the same API key shares the
+budget. Interactive lookups go before bulk lookups, which leave a few calls free for them.
+
+Instrumentation:
+--timings writes one JSON log line to stderr for every timed stage (geocode, weather, http, parse,
+render), and --metrics-file writes the stage histograms and the cache, retry and error counters in the
+Prometheus text format when the program exits. Without either flag the instrumentation stays disabled.
+
 API Key:
 The program uses an API key for accessing the OpenWeatherMap service.
 
 """
 
-import requests
+import argparse
+import asyncio
+import logging
+import sys
 from datetime import datetime
-import textwrap
+from weather_cache import GeoCache, WeatherCache, DEFAULT_GEO_CACHE_PATH, DEFAULT_WEATHER_CACHE_TTL
+from zip_gazetteer import load_default_gazetteer
+from weather_program import WeatherProgram, TEMP_UNITS
+from weather_lookup import WeatherLookup, read_locations, write_ndjson, write_csv, DEFAULT_CONCURRENCY
+from weather_metrics import get_instrumentation, JsonLogHook
+from weather_rate_limit import rate_limiter_from_args, PRIORITY_BULK, DEFAULT_RATE_LIMIT_PATH
 
 # API Key for OpenWeatherMap
 API_KEY = 'Insert Your API Key Here'
 
 
-# Class to manage weather data retrieval and display using OpenWeatherMap API.
-class WeatherProgram:
-
-    # Initialize WeatherProgram with API key and default values.
-    def __init__(self, api_key):
-        self.api_key = api_key
-        self.latitude = None
-        self.longitude = None
-        self.city = None
-        self.zip_code = None
-        self.state = None
-        self.temp_unit = None
-
-    #  Get User's choice of weather lookup method or quit option.
-    @staticmethod
-    def get_user_choice():
-        print("\nHow would you like to look up the weather today?")
-        print("1 - By City")
-        print("2 - By Zip code")
-        print("q - Quit")
-        choice = input("Enter your choice: ")
-        return choice
-
-    # get city and state for weather lookup by city
-    def set_city(self):
-
-        while True:
-            self.city = input("\nEnter city name: ").strip()
-            self.state = input("Enter state abbreviation (e.g., 'TX'): ").strip().upper()
-
-            if self.city and self.state:
-                break
-            else:
-                print("\n***Error: Both city name and state abbreviation are required. Please try again.***")
-
-    # set zip code for weather lookup by zip
-    def set_zip_code(self):
-
-        self.zip_code = self.get_zip_code()
-
-    # get a valid 5 digit zip code for the lookup
-    def get_zip_code(self):
-        while True:
-            self.zip_code = input("\nEnter a zip code (5 digits): ").strip()
-
-            if self.zip_code.isdigit():
-                if len(self.zip_code) > 5:
-                    print("\n***Error: Zip code cannot be more than 5 digits. Please try again.***")
-                else:
-                    self.zip_code = self.zip_code.zfill(5)
-                    return self.zip_code
-            else:
-                print("\n***Error: Zip code must contain only digits. Please try again.***")
-
-    # get temperature unit for API request ('metric', 'imperial', or 'standard').
-    def set_temperature_unit(self):
-        while True:
-            unit_choice = input(
-                "\nPlease enter the temperature unit you prefer:\n"
-                "(C) for Celsius\n"
-                "(F) for Fahrenheit\n"
-                "(K) for Kelvin\n"
-                "Enter your choice (C, F, or K): "
-            ).lower()
-            if unit_choice == 'c':
-                self.temp_unit = 'metric'
-                break
-            elif unit_choice == 'f':
-                self.temp_unit = 'imperial'
-                break
-            elif unit_choice == 'k':
-                self.temp_unit = 'standard'
-                break
-            else:
-                print("\n***Invalid choice. Please enter 'C', 'F', or 'K'.***")
-
-    # fetch geo coordinates based on city or zip code.
-    def get_geo_coordinates(self):
-
-        base_url = 'http://api.openweathermap.org/geo/1.0/'
-
-        if self.city and self.state:
-            complete_url = f"{base_url}direct?q={self.city},{self.state},US&limit=1&appid={self.api_key}"
-        elif self.zip_code:
-            complete_url = f"{base_url}zip?zip={self.zip_code},US&appid={self.api_key}"
+# write the results as a readable table, one line per location as each lookup finishes.
+async def write_text(results, output):
+    count = 0
+    async for result in results:
+        label = f"{result.city}, {result.state}" if result.city else f"{result.zip_code}"
+        if result.ok:
+            output.write(f"{label:<30} {result.temp} {result.unit_label:<3} {result.description.capitalize()}\n")
         else:
-            print("\n***Error: Must provide either city or zip code.***")
-            return None
-
-        try:
-            # Send a GET request to the API endpoint with the complete URL
-            response = requests.get(complete_url)
-
-            # Raise an HTTPError for bad responses
-            response.raise_for_status()
-
-            # Parse the JSON response from the API into a Python dictionary
-            response_dict = response.json()
-
-            # If the response is empty or contains no data, return None
-            if not response_dict:
-                return None
-
-            # Extract latitude and longitude from the response.
-            # The response is a list for city lookups and a dictionary for zip code lookups.
-            # The following line ensures that 'location' is always a dictionary with the relevant location details.
-            location = response_dict[0] if isinstance(response_dict, list) else response_dict
-
-            self.latitude = location['lat']
-            self.longitude = location['lon']
-
-            return self.latitude, self.longitude
-
-        except requests.exceptions.ConnectionError as conn_err:
-            error_message = f"\nUnable to connect to the server: {conn_err}"
-            print(textwrap.fill(error_message, width=80))
-            return None
-
-        except requests.exceptions.Timeout as timeout_err:
-            error_message = f"\nRequest timed out. Please try again later: {timeout_err}"
-            print(textwrap.fill(error_message, width=80))
-            return None
-
-        except requests.exceptions.HTTPError as http_err:
-            error_message = f"\nAn HTTP error occurred: {http_err}"
-            print(textwrap.fill(error_message, width=80))
-            return None
-
-        except requests.exceptions.RequestException as req_err:
-            error_message = f"\nFailed to retrieve location coordinates: {req_err}"
-            print(textwrap.fill(error_message, width=80))
-            return None
-
-    # Fetch weather data using the current latitude and longitude.
-    def get_weather(self):
-        base_url = 'https://api.openweathermap.org/data/2.5/weather?'
-
-        if self.latitude is None or self.longitude is None:
-            print(
-                "***Error: Coordinates must be set before fetching weather.***\n"
-                "***Please ensure you have entered a valid city name and state or a valid zip code.***"
-            )
-            return None
-
-        complete_url = (
-            f"{base_url}lat={self.latitude}&lon={self.longitude}"
-            f"&units={self.temp_unit}&appid={self.api_key}"
-        )
-
-        try:
-            # Send a GET request to the API endpoint with the complete URL
-            response = requests.get(complete_url)
-
-            # Raise an HTTPError for bad responses
-            response.raise_for_status()
-
-            # Parse the JSON response from the API into a Python dictionary
-            weather_data = response.json()
-
-            # Return the parsed weather data
-            return weather_data
-
-        except requests.exceptions.ConnectionError as conn_err:
-            error_message = f"\nUnable to connect to the server: {conn_err}"
-            print(textwrap.fill(error_message, width=80))
-            return None
-
-        except requests.exceptions.Timeout as timeout_err:
-            error_message = f"\nRequest timed out. Please try again later: {timeout_err}"
-            print(textwrap.fill(error_message, width=80))
-            return None
-
-        except requests.exceptions.HTTPError as http_err:
-            error_message = f"\nAn HTTP error occurred: {http_err}"
-            print(textwrap.fill(error_message, width=80))
-            return None
-
-        except requests.exceptions.RequestException as req_err:
-            error_message = f"\nFailed to retrieve weather data: {req_err}"
-            print(textwrap.fill(error_message, width=80))
-            return None
-
-    # Display the weather data in a formatted manner.
-    def display_weather(self, weather_data):
-
-        # Determine the unit label based on the user's choice
-        unit_label = {
-            'metric': '°C',
-            'imperial': '°F',
-            'standard': 'K'
-        }.get(self.temp_unit, 'Unknown')
-
-        # Extract main weather details from the API response
-        main_weather = weather_data['main']
-        weather_desc = weather_data['weather'][0]['description']
-
-        # Retrieve specific weather attributes
-        current_temp = main_weather['temp']
-        feels_like = main_weather['feels_like']
-        low_temp = main_weather['temp_min']
-        high_temp = main_weather['temp_max']
-        pressure = main_weather['pressure']
-        humidity = main_weather['humidity']
-
-        # Start with the city name from the weather data
-        location = f"{weather_data['name']}"
-
-        # Append state abbreviation city look up
-        if self.state:
-            location += f", {self.state}"
-        # Append zip code if weather lookup is by zip code
-        elif self.zip_code:
-            location += f", {self.zip_code}"
-
-        print("\n" + "-" * 50)  # Line at the top
-        print(
-            f"Weather for {location}"
-            f" at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        )
-        print("" + "-" * 50)
-        print(f"{'Current Temp:':<20} {current_temp} {unit_label}")
-        print(f"{'Feels Like:':<20} {feels_like} {unit_label}")
-        print(f"{'Low Temp:':<20} {low_temp} {unit_label}")
-        print(f"{'High Temp:':<20} {high_temp} {unit_label}")
-        print(f"{'Pressure:':<20} {pressure} hPa")
-        print(f"{'Humidity:':<20} {humidity}%")
-        print(f"{'Weather Description:':<20} {weather_desc.capitalize()}")
-        print("-" * 50)  # Line at the bottom
+            output.write(f"{label:<30} ***Error: {result.error}***\n")
+        output.flush()
+        count += 1
+    return count
+
+
+# Bulk function to look up the weather for every location in a file and write one row per location.
+# Rows are written as lookups finish; the summary goes to stderr for NDJSON/CSV so the output stays parseable.
+def bulk_main(path, concurrency=DEFAULT_CONCURRENCY, units='metric', geo_cache=None, gazetteer=None,
+              weather_cache=None, output_format='text', output_path=None, api_base=None, rate_limiter=None):
+
+    writer = {'text': write_text, 'ndjson': write_ndjson, 'csv': write_csv}[output_format]
+    summary = sys.stdout if output_format == 'text' and output_path is None else sys.stderr
+
+    weather_lookup = WeatherLookup(API_KEY, geo_cache=geo_cache, gazetteer=gazetteer,
+                                   weather_cache=weather_cache, pool_size=concurrency, api_base=api_base,
+                                   rate_limiter=rate_limiter, priority=PRIORITY_BULK)
+
+    # Count failures on the way through so the results themselves are never kept
+    failures = [0]
+
+    async def counted(results):
+        async for result in results:
+            if not result.ok:
+                failures[0] += 1
+            yield result
+
+    output = open(output_path, 'w', newline='', encoding='utf-8') if output_path else sys.stdout
+    started = datetime.now()
+    try:
+        results = weather_lookup.stream(read_locations(path), concurrency=concurrency, default_units=units)
+        count = asyncio.run(writer(counted(results), output))
+    finally:
+        weather_lookup.close()
+        if output_path:
+            output.close()
+    elapsed = (datetime.now() - started).total_seconds()
+
+    print("-" * 50, file=summary)
+    print(f"Looked up {count} locations in {elapsed:.1f} seconds ({failures[0]} failed).", file=summary)
+
+    transport = weather_lookup.transport
+    print(f"HTTP: {transport.requests_sent} requests, {transport.retries} retries, "
+          f"{transport.coalesced} coalesced.", file=summary)
+
+    if rate_limiter is not None:
+        stats = rate_limiter.stats()
+        print(f"Rate limit: {stats['waited']} of {stats['acquired']} requests waited "
+              f"{stats['wait_seconds']:.1f} seconds in total.", file=summary)
+
+    if geo_cache is not None:
+        stats = geo_cache.stats()
+        print(f"Geo cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate).",
+              file=summary)
+
+    if weather_cache is not None:
+        stats = weather_cache.stats()
+        print(f"Weather cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate).",
+              file=summary)
 
 
 # Main function to run the weather lookup program.
-def main():
+# The prompts come from WeatherProgram and the lookups go through one WeatherLookup, so the transport,
+# caches and gazetteer are shared by every lookup in the loop. The lookup is not quiet, so request
+# errors are shown to the user as they happen.
+def main(geo_cache=None, gazetteer=None, weather_cache=None, api_base=None, rate_limiter=None):
 
     print("\nWelcome to the Weather Program!")
     print("This weather_app allows you to lookup the current weather by city or zip code in the US.")
 
+    weather_lookup = WeatherLookup(API_KEY, geo_cache=geo_cache, gazetteer=gazetteer,
+                                   weather_cache=weather_cache, pool_size=2, quiet=False, api_base=api_base,
+                                   rate_limiter=rate_limiter)
+
     while True:
 
-        weather_app = WeatherProgram(API_KEY)
+        weather_app = WeatherProgram(API_KEY, transport=weather_lookup.transport, api_base=api_base)
 
         choice = weather_app.get_user_choice()
 
@@ -280,16 +228,16 @@ def main():
 
         if choice == '1':
             weather_app.set_city()
-            coordinates = weather_app.get_geo_coordinates()
+            result = weather_lookup.geocode(city=weather_app.city, state=weather_app.state)
 
         elif choice == '2':
             weather_app.set_zip_code()
-            coordinates = weather_app.get_geo_coordinates()
+            result = weather_lookup.geocode(zip_code=weather_app.zip_code)
         else:
             print("\n***Invalid choice. Please enter '1' for city lookup or '2' for zip code lookup.***")
             continue
 
-        if not coordinates:
+        if not result.ok:
             print(
                 "\n***Unable to retrieve geo coordinates. Please ensure that valid "
                 "city/state or zip code details are entered and try again.***"
@@ -300,12 +248,71 @@ def main():
         weather_app.set_temperature_unit()
 
         # Fetch and display weather data
-        weather_data = weather_app.get_weather()
+        result = weather_lookup.fetch_weather(result, weather_app.temp_unit)
 
         # If weather data is successfully retrieved, display the weather information
-        if weather_data:
-            weather_app.display_weather(weather_data)
+        if result.ok:
+            weather_app.display_weather(result.weather_data)
+
+    weather_lookup.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Look up the current weather by city or zip code in the US.")
+    parser.add_argument('--bulk', metavar='FILE', help="CSV or JSONL file of locations to look up")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="number of locations looked up at the same time in bulk mode")
+    parser.add_argument('--units', choices=['C', 'F', 'K'], default='C',
+                        help="default temperature unit for bulk rows without a 'units' column")
+    parser.add_argument('--format', choices=['text', 'ndjson', 'csv'], default='text',
+                        help="bulk output format, written row by row as lookups finish")
+    parser.add_argument('--output', metavar='FILE', help="write bulk results to a file instead of stdout")
+    parser.add_argument('--geo-cache', metavar='PATH', default=DEFAULT_GEO_CACHE_PATH,
+                        help="SQLite file used to cache geo coordinates")
+    parser.add_argument('--no-geo-cache', action='store_true', help="always call the geo API")
+    parser.add_argument('--no-gazetteer', action='store_true',
+                        help="resolve zip codes with the geo API instead of the offline gazetteer")
+    parser.add_argument('--weather-cache-ttl', type=float, default=DEFAULT_WEATHER_CACHE_TTL,
+                        help="seconds a weather response is reused for nearby lookups (0 disables the cache)")
+    parser.add_argument('--api-base', metavar='URL',
+                        help="send API requests to another host, such as the local stub (owm_stub.py)")
+    parser.add_argument('--timings', action='store_true',
+                        help="log a JSON line to stderr for every timed lookup stage")
+    parser.add_argument('--metrics-file', metavar='FILE',
+                        help="write stage timings and counters in the Prometheus text format on exit")
+    parser.add_argument('--rate-limit', type=float, metavar='CALLS_PER_MINUTE',
+                        help="keep API requests within this many calls per minute (default: no limit)")
+    parser.add_argument('--rate-limit-file', metavar='PATH', default=DEFAULT_RATE_LIMIT_PATH,
+                        help="file holding the rate limit shared with other processes ('' for this process only)")
+    args = parser.parse_args()
+
+    instrumentation = get_instrumentation()
+    if args.timings:
+        logging.basicConfig(stream=sys.stderr, level=logging.INFO, format='%(message)s')
+        instrumentation.add_hook(JsonLogHook())
+    if args.timings or args.metrics_file:
+        instrumentation.enable()
+
+    geo_cache = None if args.no_geo_cache else GeoCache(args.geo_cache)
+    gazetteer = None if args.no_gazetteer else load_default_gazetteer()
+    weather_cache = WeatherCache(ttl=args.weather_cache_ttl) if args.weather_cache_ttl > 0 else None
+    rate_limiter = rate_limiter_from_args(args.rate_limit, args.rate_limit_file)
+    try:
+        if args.bulk:
+            bulk_main(args.bulk, concurrency=args.concurrency, units=TEMP_UNITS[args.units.lower()],
+                      geo_cache=geo_cache, gazetteer=gazetteer, weather_cache=weather_cache,
+                      output_format=args.format, output_path=args.output, api_base=args.api_base,
+                      rate_limiter=rate_limiter)
+        else:
+            main(geo_cache=geo_cache, gazetteer=gazetteer, weather_cache=weather_cache, api_base=args.api_base,
+                 rate_limiter=rate_limiter)
+    finally:
+        if rate_limiter is not None:
+            rate_limiter.close()
+        if geo_cache is not None:
+            geo_cache.close()
+        if gazetteer is not None:
+            gazetteer.close()
+        if args.metrics_file:
+            with open(args.metrics_file, 'w', encoding='utf-8') as metrics_file:
+                metrics_file.write(instrumentation.prometheus_text())
@@ -0,0 +1,191 @@
+# Weather Lookup App - Benchmark
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the weather lookup benchmark.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Weather Lookup Benchmark
+
+Measures the weather lookup paths against the local OpenWeatherMap stub (owm_stub.py), so no API quota is
+spent and the results do not depend on the real API. The stub's latency, jitter and error rate are set
+from the command line to model the upstream API.
+
+Modes:
+- single: one lookup at a time with no caches, like the interactive program
+- bulk:   WeatherLookup.stream() with --concurrency lookups in flight, no caches
+- cached: one lookup at a time with the geocoding and weather caches, after a warm-up pass over the
+          same locations, so nearly every lookup is served from the caches
+
+For each mode the benchmark reports lookups per second, the p50/p95/p99 lookup latency, the number of
+failed lookups and the number of requests that reached the stub.
+
+    python benchmark_weather.py --lookups 500 --latency 0.05 --concurrency 32
+    python benchmark_weather.py --modes bulk --error-rate 0.02 --json results.json
+
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import tempfile
+import time
+
+from owm_stub import start_stub_server
+from weather_cache import GeoCache, WeatherCache
+from weather_lookup import WeatherLookup, DEFAULT_CONCURRENCY
+from weather_transport import WeatherTransport
+
+MODES = ['single', 'bulk', 'cached']
+
+
+# return the p-th percentile (0-100) of the sorted values using the nearest-rank method.
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+# return benchmark locations: zip codes spread over `unique` distinct places.
+def make_locations(count, unique=None):
+    unique = unique or count
+    return [{'zip': f"{10000 + i % unique:05d}"} for i in range(count)]
+
+
+# Class that records the latency of every lookup made through it.
+class TimedLookup(WeatherLookup):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+
+    def lookup_location(self, location, default_units='metric'):
+        started = time.perf_counter()
+        result = super().lookup_location(location, default_units)
+        self.latencies.append(time.perf_counter() - started)
+        return result
+
+
+# summarize one benchmark run.
+def summarize(mode, lookup, results, elapsed, upstream_calls, retries):
+    latencies = sorted(lookup.latencies)
+    failures = sum(1 for result in results if not result.ok)
+    return {
+        'mode': mode,
+        'lookups': len(results),
+        'failures': failures,
+        'seconds': round(elapsed, 3),
+        'lookups_per_second': round(len(results) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'upstream_calls': upstream_calls,
+        'retries': retries
+    }
+
+
+# run one benchmark mode against the stub and return its summary.
+def run_mode(mode, stub, locations, concurrency, backoff):
+    transport = WeatherTransport(pool_size=max(concurrency, 1), backoff_base=backoff, backoff_max=backoff * 8)
+    geo_cache = weather_cache = None
+    cache_dir = None
+
+    if mode == 'cached':
+        cache_dir = tempfile.TemporaryDirectory()
+        geo_cache = GeoCache(os.path.join(cache_dir.name, 'geo_cache.sqlite3'))
+        weather_cache = WeatherCache()
+
+    lookup = TimedLookup('benchmark', transport=transport, geo_cache=geo_cache, weather_cache=weather_cache,
+                         api_base=stub.base_url)
+    try:
+        if mode == 'cached':
+            # Warm the caches, then measure only the second pass
+            for location in locations:
+                lookup.lookup_location(location)
+            lookup.latencies = []
+
+        calls_before = stub.total_calls
+        retries_before = transport.retries
+        started = time.perf_counter()
+
+        if mode == 'bulk':
+            async def collect():
+                return [result async for result in lookup.stream(locations, concurrency=concurrency)]
+            results = asyncio.run(collect())
+        else:
+            results = [lookup.lookup_location(location) for location in locations]
+
+        elapsed = time.perf_counter() - started
+        return summarize(mode, lookup, results, elapsed, stub.total_calls - calls_before,
+                         transport.retries - retries_before)
+    finally:
+        transport.close()
+        if geo_cache is not None:
+            geo_cache.close()
+        if cache_dir is not None:
+            cache_dir.cleanup()
+
+
+# print the summaries as a table.
+def print_report(summaries, settings):
+    print(f"Stub latency {settings['latency'] * 1000:.0f} ms (+{settings['jitter'] * 1000:.0f} ms jitter), "
+          f"error rate {settings['error_rate']:.1%}, {settings['lookups']} lookups, "
+          f"concurrency {settings['concurrency']}")
+    print("-" * 96)
+    print(f"{'Mode':<8} {'Lookups':>8} {'Failed':>7} {'Seconds':>8} {'Lookups/s':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Upstream':>9} {'Retries':>8}")
+    print("-" * 96)
+    for summary in summaries:
+        print(f"{summary['mode']:<8} {summary['lookups']:>8} {summary['failures']:>7} {summary['seconds']:>8.2f} "
+              f"{summary['lookups_per_second']:>10.1f} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} "
+              f"{summary['p99_ms']:>8.2f} {summary['upstream_calls']:>9} {summary['retries']:>8}")
+    print("-" * 96)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the weather lookup against a local API stub.")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--lookups', type=int, default=200, help="lookups per mode")
+    parser.add_argument('--unique', type=int, help="number of distinct locations (default: all distinct)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="lookups in flight in bulk mode")
+    parser.add_argument('--latency', type=float, default=0.02, help="stub seconds per response")
+    parser.add_argument('--jitter', type=float, default=0.01, help="stub extra random seconds per response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of stub responses that fail")
+    parser.add_argument('--error-status', type=int, default=503, help="HTTP status of failed stub responses")
+    parser.add_argument('--backoff', type=float, default=0.01, help="retry backoff base in seconds")
+    parser.add_argument('--seed', type=int, default=1, help="random seed for the stub")
+    parser.add_argument('--json', metavar='FILE', help="also write the results as JSON for regression tracking")
+    args = parser.parse_args()
+
+    stub = start_stub_server(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             error_status=args.error_status, seed=args.seed)
+    locations = make_locations(args.lookups, args.unique)
+    settings = {
+        'lookups': args.lookups,
+        'concurrency': args.concurrency,
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate
+    }
+
+    try:
+        summaries = [run_mode(mode, stub, locations, args.concurrency, args.backoff) for mode in args.modes]
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+    print_report(summaries, settings)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'settings': settings, 'results': summaries}, file, indent=2)
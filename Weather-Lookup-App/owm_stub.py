@@ -0,0 +1,250 @@
+# Weather Lookup App - OpenWeatherMap Stub Server
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the local OpenWeatherMap stub server.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 2
+# Change(s) Made: Added configurable latency, jitter and error rate for benchmarking.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 3
+# Change(s) Made: Added city IDs to weather responses and the /data/2.5/group endpoint.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+OpenWeatherMap Stub Server
+
+A small local HTTP server that answers the OpenWeatherMap endpoints the weather program uses,
+so the program, the weather service and the tools can be run and tested without an API key or network:
+
+- /geo/1.0/direct?q=<city>,<state>,US   returns a one-element list with 'lat' and 'lon'
+- /geo/1.0/zip?zip=<zip>,US             returns an object with 'lat' and 'lon' (404 for zip 00000)
+- /data/2.5/weather?lat=..&lon=..       returns a weather response in Kelvin, with a city 'id'
+- /data/2.5/group?id=<id>,<id>,...      returns {'cnt', 'list'} with the weather of each city ID the stub
+                                        has handed out before (unknown IDs are left out)
+
+Coordinates and weather values are derived from the request, so the same request always gets the same
+answer. The number of requests per endpoint is counted in StubServer.calls.
+
+To look like a real remote API, every response can be delayed (--latency seconds plus up to --jitter
+seconds) and a fraction of requests (--error-rate) can fail with --error-status (503 by default, or
+429 to simulate rate limiting).
+
+    python owm_stub.py --port 8001 --latency 0.05 --error-rate 0.01
+    python Weather-Lookup-App.py --api-base http://127.0.0.1:8001
+
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_STUB_PORT = 8001
+
+# Weather descriptions handed out by the stub.
+DESCRIPTIONS = ['clear sky', 'few clouds', 'scattered clouds', 'broken clouds', 'light rain', 'mist']
+
+
+# return a stable number between 0 and 1 for the text, used to make up repeatable values.
+def stable_fraction(text):
+    return (zlib.crc32(text.encode('utf-8')) % 100000) / 100000
+
+
+# return made-up but plausible US coordinates for a city/state or zip code query.
+def fake_coordinates(query):
+    latitude = round(25 + stable_fraction('lat:' + query) * 23, 4)
+    longitude = round(-124 + stable_fraction('lon:' + query) * 57, 4)
+    return latitude, longitude
+
+
+# return a weather response in the OpenWeatherMap format (Kelvin) for the coordinates.
+def fake_weather(latitude, longitude):
+    key = f"{latitude},{longitude}"
+    temp = round(260 + stable_fraction('temp:' + key) * 50, 2)
+    return {
+        'coord': {'lat': latitude, 'lon': longitude},
+        'weather': [{'description': DESCRIPTIONS[int(stable_fraction('desc:' + key) * len(DESCRIPTIONS))]}],
+        'main': {
+            'temp': temp,
+            'feels_like': round(temp - 1.5, 2),
+            'temp_min': round(temp - 3, 2),
+            'temp_max': round(temp + 3, 2),
+            'pressure': 1000 + int(stable_fraction('pressure:' + key) * 30),
+            'humidity': 20 + int(stable_fraction('humidity:' + key) * 70)
+        },
+        'id': city_id(latitude, longitude),
+        'name': f"Stub City {int(stable_fraction('name:' + key) * 1000)}"
+    }
+
+
+# return a made-up but stable OpenWeatherMap city ID for the coordinates.
+def city_id(latitude, longitude):
+    return 1000000 + int(stable_fraction(f"id:{latitude},{longitude}") * 8999999)
+
+
+# Class to answer the stubbed OpenWeatherMap endpoints.
+class StubRequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body are written separately; without this, Nagle's algorithm adds ~40 ms per response.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.server.count_call(url.path)
+
+        # Simulate network and server time, then fail a share of the requests
+        delay, fail = self.server.next_behavior()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self.send_json(self.server.error_status, {'cod': str(self.server.error_status), 'message': 'stub error'})
+            return
+
+        if url.path == '/geo/1.0/direct':
+            location = query.get('q', '')
+            latitude, longitude = fake_coordinates(location.lower())
+            self.send_json(200, [{'name': location.split(',')[0], 'lat': latitude, 'lon': longitude}])
+
+        elif url.path == '/geo/1.0/zip':
+            zip_code = query.get('zip', '').split(',')[0]
+            if zip_code == '00000':
+                self.send_json(404, {'cod': '404', 'message': 'not found'})
+            else:
+                latitude, longitude = fake_coordinates(zip_code)
+                self.send_json(200, {'zip': zip_code, 'lat': latitude, 'lon': longitude})
+
+        elif url.path == '/data/2.5/weather':
+            try:
+                latitude, longitude = float(query['lat']), float(query['lon'])
+            except (KeyError, ValueError):
+                self.send_json(400, {'cod': '400', 'message': 'wrong latitude or longitude'})
+                return
+            self.server.remember_city(latitude, longitude)
+            self.send_json(200, fake_weather(latitude, longitude))
+
+        elif url.path == '/data/2.5/group':
+            try:
+                city_ids = [int(value) for value in query.get('id', '').split(',') if value]
+            except ValueError:
+                self.send_json(400, {'cod': '400', 'message': 'wrong id'})
+                return
+            if not city_ids or len(city_ids) > 20:
+                self.send_json(400, {'cod': '400', 'message': 'between 1 and 20 ids are allowed'})
+                return
+            places = [self.server.cities[value] for value in city_ids if value in self.server.cities]
+            self.send_json(200, {'cnt': len(places), 'list': [fake_weather(*place) for place in places]})
+
+        else:
+            self.send_json(404, {'cod': '404', 'message': 'unknown endpoint'})
+
+    # send a JSON response with the given status code.
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # keep the console quiet; the stub is usually run next to other output.
+    def log_message(self, format, *args):
+        pass
+
+
+# Class for the stub HTTP server, which counts the requests made to each endpoint.
+# latency and jitter are in seconds; error_rate is the fraction of requests answered with error_status.
+class StubServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, handler=StubRequestHandler, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, seed=None):
+        super().__init__(address, handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.calls = {}
+        self.errors = 0
+        self.cities = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def count_call(self, path):
+        with self._lock:
+            self.calls[path] = self.calls.get(path, 0) + 1
+
+    # remember the coordinates of a city ID handed out in a weather response, for the group endpoint.
+    def remember_city(self, latitude, longitude):
+        with self._lock:
+            self.cities[city_id(latitude, longitude)] = (latitude, longitude)
+
+    # return (seconds to delay, whether to fail) for the next request.
+    def next_behavior(self):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    # return the total number of requests answered.
+    @property
+    def total_calls(self):
+        with self._lock:
+            return sum(self.calls.values())
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+# start a stub server on a background thread and return it; port 0 picks a free port.
+def start_stub_server(host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                      seed=None):
+    server = StubServer((host, port), latency=latency, jitter=jitter, error_rate=error_rate,
+                        error_status=error_status, seed=seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stub of the OpenWeatherMap API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_STUB_PORT)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="up to this many extra random seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests that fail (0 to 1)")
+    parser.add_argument('--error-status', type=int, default=503, help="HTTP status of failed requests")
+    parser.add_argument('--seed', type=int, help="random seed for repeatable jitter and errors")
+    args = parser.parse_args()
+
+    stub = StubServer((args.host, args.port), latency=args.latency, jitter=args.jitter,
+                      error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    print(f"OpenWeatherMap stub listening on {stub.base_url}")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server_close()
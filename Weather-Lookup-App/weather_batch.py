@@ -0,0 +1,197 @@
+# Weather Lookup App - Batched Weather Fetch
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the batched multi-location weather fetch.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 2
+# Change(s) Made: Requests are made in a rate limiter priority lane, 'bulk' by default.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 3
+# Change(s) Made: A failed group request returns its error for its places instead of retrying each one
+#                 with a single request.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Batched Weather Fetch
+
+Fetches the weather for many places with far fewer API calls than one /data/2.5/weather request each.
+Every weather response carries the OpenWeatherMap city ID of the place; WeatherBatcher remembers it for
+the (rounded) coordinates, and from then on places with a known city ID are fetched together through
+the group endpoint, up to 20 cities per request:
+
+    /data/2.5/group?id=4671654,4699066,5391811&units=standard
+
+The combined response is fanned back out to each place. Places without a known city ID, and cities
+missing from a successful group response, fall back to the single weather request, which also learns
+their city ID for the next time. Refreshing 500 known cities takes 25 requests instead of 500.
+
+When a group request fails (a 429, an exhausted quota, a server error), its places get its error
+instead: retrying them one at a time would turn one failed request into up to 20 more against the same
+per-minute quota.
+
+    batcher = WeatherBatcher(api_key)
+    responses = batcher.fetch([(30.27, -97.74), (29.76, -95.37)])
+
+The deprecated bounding-box endpoint is not used: it answers with whichever cities lie in the box, so
+the responses cannot be matched exactly to the requested places.
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from weather_metrics import get_instrumentation
+from weather_program import WeatherProgram, CANONICAL_UNIT
+from weather_rate_limit import PRIORITY_BULK
+from weather_transport import get_default_transport
+
+# OpenWeatherMap endpoint for the current weather of several cities by ID.
+GROUP_BASE_URL = 'https://api.openweathermap.org/data/2.5/group?'
+
+# Most city IDs the group endpoint accepts in one request.
+MAX_GROUP_SIZE = 20
+
+# Requests sent at the same time by one fetch().
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# Decimal places the coordinates are rounded to before looking up a city ID (about 1 km).
+CITY_ID_PRECISION = 2
+
+
+# Class to fetch the weather for many coordinates with grouped requests, falling back to single requests.
+class WeatherBatcher:
+
+    # Initialize the batcher with the API key and optionally the shared transport, a WeatherCache, the
+    # alternative API host, the cities per group request, the number of requests sent at the same time and
+    # the rate limiter lane of the requests.
+    def __init__(self, api_key, transport=None, weather_cache=None, api_base=None, group_size=MAX_GROUP_SIZE,
+                 concurrency=DEFAULT_BATCH_CONCURRENCY, instrumentation=None, priority=PRIORITY_BULK):
+        self.api_key = api_key
+        self.priority = priority
+        self.api_base = api_base
+        self.transport = transport if transport is not None else get_default_transport()
+        self.weather_cache = weather_cache
+        self.group_size = max(1, min(int(group_size), MAX_GROUP_SIZE))
+        self.concurrency = max(1, int(concurrency))
+        self.instrumentation = instrumentation if instrumentation is not None else get_instrumentation()
+        self.group_base_url = f"{api_base.rstrip('/')}/data/2.5/group?" if api_base else GROUP_BASE_URL
+
+        # City ID for each rounded (latitude, longitude), learned from weather responses.
+        self.city_ids = {}
+
+        # Counters for the bulk summary.
+        self.group_requests = 0
+        self.grouped = 0
+        self.single_requests = 0
+
+    @staticmethod
+    def key(latitude, longitude):
+        return round(float(latitude), CITY_ID_PRECISION), round(float(longitude), CITY_ID_PRECISION)
+
+    # remember the city ID of a weather response for the coordinates it was requested for.
+    def learn(self, latitude, longitude, weather_data):
+        city_id = weather_data.get('id') if weather_data else None
+        if city_id:
+            self.city_ids[self.key(latitude, longitude)] = int(city_id)
+
+    # return a list with one (weather response, error message) pair per (latitude, longitude), in order.
+    # Responses are in Kelvin, like WeatherProgram.get_weather.
+    def fetch(self, coordinates):
+        coordinates = list(coordinates)
+        results = [None] * len(coordinates)
+
+        # Serve what the weather cache has, and sort the rest into known cities and unknown places
+        by_city = {}
+        singles = []
+        for index, (latitude, longitude) in enumerate(coordinates):
+            if self.weather_cache is not None:
+                weather_data = self.weather_cache.get(latitude, longitude)
+                self.instrumentation.count('cache_lookups_total', cache='weather',
+                                           result='miss' if weather_data is None else 'hit')
+                if weather_data is not None:
+                    results[index] = (weather_data, None)
+                    continue
+
+            city_id = self.city_ids.get(self.key(latitude, longitude))
+            if city_id is None:
+                singles.append(index)
+            else:
+                by_city.setdefault(city_id, []).append(index)
+
+        city_ids = list(by_city)
+        groups = [city_ids[start:start + self.group_size] for start in range(0, len(city_ids), self.group_size)]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            # Cities missing from a successful group response are retried one at a time below
+            for group, (responses, error_message) in zip(groups, executor.map(self._fetch_group, groups)):
+                self.group_requests += 1
+                if error_message:
+                    for city_id in group:
+                        for index in by_city[city_id]:
+                            results[index] = (None, error_message)
+                    continue
+                self.grouped += len(responses)
+                for city_id in group:
+                    weather_data = responses.get(city_id)
+                    if weather_data is None:
+                        singles.extend(by_city[city_id])
+                        continue
+                    for index in by_city[city_id]:
+                        results[index] = (weather_data, None)
+                        if self.weather_cache is not None:
+                            self.weather_cache.put(*coordinates[index], weather_data)
+
+            for index, result in zip(singles, executor.map(lambda i: self._fetch_single(*coordinates[i]), singles)):
+                self.single_requests += 1
+                results[index] = result
+                if result[0] is not None and self.weather_cache is not None:
+                    self.weather_cache.put(*coordinates[index], result[0])
+
+        return results
+
+    # fetch one group of city IDs and return ({city ID: weather response}, None), or ({}, error message) if
+    # the request failed.
+    def _fetch_group(self, city_ids):
+        url = (f"{self.group_base_url}id={','.join(str(city_id) for city_id in city_ids)}"
+               f"&units={CANONICAL_UNIT}&appid={self.api_key}")
+        data, error_message = self.transport.request_json(url, "Failed to retrieve grouped weather data",
+                                                          priority=self.priority)
+        self.instrumentation.count('batch_requests_total', kind='group')
+        if error_message or not data:
+            return {}, error_message or "Failed to retrieve grouped weather data."
+
+        responses = {int(item['id']): item for item in data.get('list', []) if item.get('id')}
+        self.instrumentation.count('batch_locations_total', len(responses))
+        return responses, None
+
+    # fetch the weather for one place with the single weather request and learn its city ID.
+    # The weather cache was already checked by fetch(), which also stores the response.
+    def _fetch_single(self, latitude, longitude):
+        program = WeatherProgram(self.api_key, transport=self.transport, quiet=True, api_base=self.api_base,
+                                 instrumentation=self.instrumentation, priority=self.priority)
+        program.latitude, program.longitude = latitude, longitude
+        weather_data = program.get_weather()
+        self.instrumentation.count('batch_requests_total', kind='single')
+        if weather_data is None:
+            return None, program.last_error or "Unable to retrieve weather data."
+        self.learn(latitude, longitude, weather_data)
+        return weather_data, None
+
+    # return the request counters.
+    def stats(self):
+        return {
+            'known_cities': len(self.city_ids),
+            'group_requests': self.group_requests,
+            'grouped_locations': self.grouped,
+            'single_requests': self.single_requests
+        }
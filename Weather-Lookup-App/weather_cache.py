@@ -0,0 +1,221 @@
+# Weather Lookup App - Caches
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the persistent geocoding cache.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 2
+# Change(s) Made: Added the in-memory weather response cache keyed by rounded coordinates.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Weather Lookup Caches
+
+Zip code and city/state coordinates almost never change, so the geo lookups made by WeatherProgram
+are stored in a small SQLite database and reused across runs of the program. Entries expire after a
+time to live, the table is bounded to a maximum number of entries with least recently used eviction,
+and hit/miss counters are kept so the savings can be reported.
+
+Weather responses change every few minutes, so they are kept in memory only, keyed by the coordinates
+rounded to about a kilometer, for a short time to live. Responses are cached in one canonical unit and
+converted to the user's unit locally, so the same place in C, F and K costs a single API call.
+
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Default location of the geocoding cache database, next to this file.
+DEFAULT_GEO_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'geo_cache.sqlite3')
+
+# Coordinates are kept for 30 days by default.
+DEFAULT_GEO_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Maximum number of cached locations before the least recently used entries are evicted.
+DEFAULT_GEO_CACHE_SIZE = 100000
+
+# Weather responses are reused for 10 minutes by default, about how often OpenWeatherMap updates them.
+DEFAULT_WEATHER_CACHE_TTL = 10 * 60
+
+# Maximum number of weather responses kept in memory.
+DEFAULT_WEATHER_CACHE_SIZE = 10000
+
+# Number of decimal places the coordinates are rounded to (2 places is roughly 1 km).
+DEFAULT_WEATHER_CACHE_PRECISION = 2
+
+
+# build the cache key for a city/state or zip code lookup.
+# City and state are lowercased and stripped, zip codes are zero-padded to 5 digits.
+def geo_cache_key(city=None, state=None, zip_code=None):
+    if city and state:
+        return f"city:{' '.join(city.lower().split())},{state.strip().lower()}"
+    if zip_code:
+        return f"zip:{str(zip_code).strip().zfill(5)}"
+    return None
+
+
+# Class to store geo coordinates in an on-disk SQLite database.
+class GeoCache:
+
+    # Open (or create) the cache database at the given path.
+    def __init__(self, path=DEFAULT_GEO_CACHE_PATH, ttl=DEFAULT_GEO_CACHE_TTL, max_entries=DEFAULT_GEO_CACHE_SIZE):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # The bulk lookup calls the cache from several threads, so one connection is shared behind a lock.
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS geo_cache ("
+                "key TEXT PRIMARY KEY, lat REAL NOT NULL, lon REAL NOT NULL, "
+                "created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS geo_cache_last_used ON geo_cache (last_used)")
+
+    # return the cached (latitude, longitude) for the key, or None if missing or expired.
+    def get(self, key):
+        if key is None:
+            return None
+
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT lat, lon, created FROM geo_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            if self.ttl is not None and now - row[2] > self.ttl:
+                self._connection.execute("DELETE FROM geo_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            # Touch the entry so it is treated as recently used.
+            self._connection.execute("UPDATE geo_cache SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0], row[1]
+
+    # store the coordinates for the key and evict the least recently used entries if over the size limit.
+    def put(self, key, latitude, longitude):
+        if key is None:
+            return
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO geo_cache (key, lat, lon, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, latitude, longitude, now, now)
+            )
+
+            if self.max_entries is not None:
+                count = self._connection.execute("SELECT COUNT(*) FROM geo_cache").fetchone()[0]
+                if count > self.max_entries:
+                    cursor = self._connection.execute(
+                        "DELETE FROM geo_cache WHERE key IN "
+                        "(SELECT key FROM geo_cache ORDER BY last_used LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+                    self.evictions += cursor.rowcount
+
+    # remove every entry from the cache.
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM geo_cache")
+
+    # return the number of entries and the hit/miss counters.
+    def stats(self):
+        with self._lock:
+            size = self._connection.execute("SELECT COUNT(*) FROM geo_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'size': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    # close the database connection.
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+# Class to keep recent weather responses in memory, keyed by rounded latitude and longitude.
+class WeatherCache:
+
+    # Initialize the cache with a time to live in seconds, a maximum size and the coordinate rounding.
+    def __init__(self, ttl=DEFAULT_WEATHER_CACHE_TTL, max_entries=DEFAULT_WEATHER_CACHE_SIZE,
+                 precision=DEFAULT_WEATHER_CACHE_PRECISION):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # build the cache key from the coordinates.
+    def key(self, latitude, longitude):
+        return round(float(latitude), self.precision), round(float(longitude), self.precision)
+
+    # return the cached weather response for the coordinates, or None if missing or expired.
+    # The returned dictionary is shared with the cache and must not be modified.
+    def get(self, latitude, longitude):
+        key = self.key(latitude, longitude)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    # store the weather response for the coordinates, evicting the least recently used response if full.
+    def put(self, latitude, longitude, weather_data):
+        key = self.key(latitude, longitude)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), weather_data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # remove every response from the cache.
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # return the number of entries and the hit/miss counters.
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
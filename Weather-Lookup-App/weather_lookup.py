@@ -0,0 +1,339 @@
+# Weather Lookup App - Library API
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the non-interactive weather lookup API and the streaming bulk lookup.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 2
+# Change(s) Made: Added api_base to run against a local OpenWeatherMap stub, and the 'not_found' error stage.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 3
+# Change(s) Made: Added lookup_many and fetch_weather_many, which fetch the weather through grouped requests.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 4
+# Change(s) Made: Added the rate limiter and the priority lane of the lookups' requests.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Weather Lookup API
+
+A non-interactive API over WeatherProgram for services and batch jobs. Nothing is read from the keyboard
+or printed; every lookup returns a WeatherResult with the location, coordinates and the weather values
+that display_weather shows, already converted to the requested unit, or an error message.
+
+    lookup = WeatherLookup(api_key)
+    result = lookup.lookup(zip_code='78701', units='F')
+    print(result.temp, result.description)
+
+Many locations are looked up concurrently with WeatherLookup.stream(), an async generator that yields
+each result as soon as it finishes. Only `concurrency` lookups are in flight at a time and the locations
+are read lazily, so memory stays bounded no matter how many locations there are. write_ndjson and
+write_csv write the results as rows as they arrive.
+
+For the same set of places looked up again and again (a dashboard or the weather recorder), lookup_many()
+fetches the weather through the group endpoint (see weather_batch.py), 20 cities per request once their
+city IDs are known.
+
+"""
+
+import asyncio
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from typing import Optional
+
+from weather_batch import WeatherBatcher
+from weather_program import WeatherProgram, TEMP_UNITS, UNIT_LABELS, convert_temperature
+from weather_rate_limit import PRIORITY_INTERACTIVE
+from weather_transport import WeatherTransport
+
+# Default number of locations looked up at the same time by stream().
+DEFAULT_CONCURRENCY = 20
+
+
+# Typed result of one weather lookup. Temperatures are in the requested unit.
+# error_stage tells where a failed lookup stopped: 'input', 'not_found', 'geocode' or 'weather'.
+@dataclass
+class WeatherResult:
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip_code: Optional[str] = None
+    units: str = 'metric'
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    name: Optional[str] = None
+    temp: Optional[float] = None
+    feels_like: Optional[float] = None
+    temp_min: Optional[float] = None
+    temp_max: Optional[float] = None
+    pressure: Optional[int] = None
+    humidity: Optional[int] = None
+    description: Optional[str] = None
+    fetched_at: Optional[str] = None
+    error: Optional[str] = None
+    error_stage: Optional[str] = None
+
+    # The raw API response, kept for callers that want fields not copied above. Not written to output rows.
+    weather_data: Optional[dict] = field(default=None, repr=False, compare=False)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def unit_label(self):
+        return UNIT_LABELS.get(self.units, 'Unknown')
+
+    # return the result as a flat dictionary suitable for an NDJSON or CSV row.
+    def to_dict(self):
+        return {name: getattr(self, name) for name in RESULT_FIELDS}
+
+
+# Output columns of a WeatherResult, in order.
+RESULT_FIELDS = [result_field.name for result_field in fields(WeatherResult) if result_field.name != 'weather_data']
+
+
+# return the OpenWeatherMap 'units' value for C/F/K or metric/imperial/standard, or None if not recognized.
+def normalize_units(units, default='metric'):
+    if units is None or str(units).strip() == '':
+        return default
+    units = str(units).strip().lower()
+    if units in TEMP_UNITS:
+        return TEMP_UNITS[units]
+    if units in UNIT_LABELS:
+        return units
+    return None
+
+
+# Class that looks up the weather without any user interaction.
+# One transport and the optional caches and gazetteer are shared by every lookup made through it.
+class WeatherLookup:
+
+    # Initialize the lookup with the API key, an optional WeatherTransport (one is created with
+    # pool_size connections if not given), and the optional GeoCache, ZipGazetteer and WeatherCache.
+    # api_base sends the requests to another OpenWeatherMap-compatible host, such as a local stub.
+    # rate_limiter is given to the transport created here; priority is the lane every request waits in,
+    # 'interactive' for lookups a user is waiting on and 'bulk' for batch jobs.
+    def __init__(self, api_key, transport=None, geo_cache=None, gazetteer=None, weather_cache=None,
+                 pool_size=DEFAULT_CONCURRENCY, quiet=True, api_base=None, rate_limiter=None,
+                 priority=PRIORITY_INTERACTIVE):
+        self.api_key = api_key
+        self.api_base = api_base
+        self.priority = priority
+        self.owns_transport = transport is None
+        self.transport = transport if transport is not None else WeatherTransport(pool_size=pool_size,
+                                                                                  rate_limiter=rate_limiter)
+        self.geo_cache = geo_cache
+        self.gazetteer = gazetteer
+        self.weather_cache = weather_cache
+        self.quiet = quiet
+        self.batcher = WeatherBatcher(api_key, transport=self.transport, weather_cache=weather_cache,
+                                      api_base=api_base, priority=priority)
+
+    # create a WeatherProgram that uses the shared transport, caches and gazetteer.
+    def new_program(self):
+        return WeatherProgram(self.api_key, transport=self.transport, geo_cache=self.geo_cache,
+                              gazetteer=self.gazetteer, weather_cache=self.weather_cache, quiet=self.quiet,
+                              api_base=self.api_base, priority=self.priority)
+
+    # normalize a city/state or zip code into a program and an empty WeatherResult, without any API call.
+    # Returns the program, whether the location is valid, and the result.
+    def new_result(self, city=None, state=None, zip_code=None):
+        program = self.new_program()
+        valid = program.set_location(city, state, zip_code)
+        result = WeatherResult(city=program.city, state=program.state,
+                               zip_code=program.zip_code or (str(zip_code).strip() if zip_code else None))
+        return program, valid, result
+
+    # resolve the coordinates of a city/state or zip code and return a WeatherResult without weather.
+    def geocode(self, city=None, state=None, zip_code=None):
+        program, valid, result = self.new_result(city, state, zip_code)
+
+        if not valid:
+            result.error = "Must provide either city and state or a valid zip code."
+            result.error_stage = 'input'
+            return result
+
+        # A failed request is a 'geocode' error; an empty answer from the geo API means the place is unknown
+        coordinates = program.get_geo_coordinates()
+        if not coordinates:
+            result.error = program.last_error or "Unable to retrieve geo coordinates."
+            result.error_stage = 'geocode' if program.last_error else 'not_found'
+            return result
+
+        result.latitude, result.longitude = coordinates
+        return result
+
+    # fetch the weather for a geocoded result in the given unit and fill in the weather fields.
+    def fetch_weather(self, result, units='metric'):
+        if result.error:
+            return result
+
+        result.units = normalize_units(units)
+        if result.units is None:
+            result.units = 'metric'
+            result.error = f"Unknown temperature unit: {units}"
+            result.error_stage = 'input'
+            return result
+
+        program = self.new_program()
+        program.latitude, program.longitude = result.latitude, result.longitude
+        program.temp_unit = result.units
+
+        weather_data = program.get_weather()
+        if not weather_data:
+            result.error = program.last_error or "Unable to retrieve weather data."
+            result.error_stage = 'weather'
+            return result
+
+        # Teach the batcher this place's city ID so lookup_many can group it next time
+        self.batcher.learn(result.latitude, result.longitude, weather_data)
+        return self.fill_weather(result, weather_data)
+
+    # fetch the weather for several geocoded results at once with grouped requests, filling in each result.
+    def fetch_weather_many(self, results, units='metric'):
+        pending = []
+        for result in results:
+            if result.error:
+                continue
+            result.units = normalize_units(units)
+            if result.units is None:
+                result.units = 'metric'
+                result.error = f"Unknown temperature unit: {units}"
+                result.error_stage = 'input'
+                continue
+            pending.append(result)
+
+        responses = self.batcher.fetch((result.latitude, result.longitude) for result in pending)
+        for result, (weather_data, error_message) in zip(pending, responses):
+            if weather_data is None:
+                result.error = error_message
+                result.error_stage = 'weather'
+            else:
+                self.fill_weather(result, weather_data)
+        return results
+
+    # look up many location dictionaries (see lookup_location) and return the WeatherResults in input order.
+    # Places are geocoded `concurrency` at a time, then their weather is fetched with grouped requests.
+    def lookup_many(self, locations, default_units='metric', concurrency=DEFAULT_CONCURRENCY):
+        locations = list(locations)
+        with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+            results = list(executor.map(
+                lambda location: self.geocode(location.get('city'), location.get('state'), location.get('zip')),
+                locations))
+
+        # Group the places by unit so each group of city IDs is fetched once
+        by_units = {}
+        for location, result in zip(locations, results):
+            by_units.setdefault(location.get('units') or default_units, []).append(result)
+        for units, unit_results in by_units.items():
+            self.fetch_weather_many(unit_results, units)
+        return results
+
+    # copy the weather values from an API response into the result, converted to the result's unit.
+    @staticmethod
+    def fill_weather(result, weather_data):
+        main_weather = weather_data['main']
+        result.weather_data = weather_data
+        result.name = weather_data.get('name')
+        result.temp = convert_temperature(main_weather['temp'], result.units)
+        result.feels_like = convert_temperature(main_weather['feels_like'], result.units)
+        result.temp_min = convert_temperature(main_weather['temp_min'], result.units)
+        result.temp_max = convert_temperature(main_weather['temp_max'], result.units)
+        result.pressure = main_weather['pressure']
+        result.humidity = main_weather['humidity']
+        result.description = weather_data['weather'][0]['description']
+        result.fetched_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        return result
+
+    # look up the weather for a city/state or zip code and return a WeatherResult.
+    def lookup(self, city=None, state=None, zip_code=None, units='metric'):
+        if normalize_units(units) is None:
+            _, _, result = self.new_result(city, state, zip_code)
+            result.error = f"Unknown temperature unit: {units}"
+            result.error_stage = 'input'
+            return result
+        result = self.geocode(city, state, zip_code)
+        return self.fetch_weather(result, units)
+
+    # look up the weather for a location dictionary with 'city'/'state' or 'zip' and optional 'units' keys.
+    def lookup_location(self, location, default_units='metric'):
+        units = location.get('units') or default_units
+        return self.lookup(location.get('city'), location.get('state'), location.get('zip'), units)
+
+    # look up every location and yield each WeatherResult as soon as it finishes (not in input order).
+    # At most `concurrency` lookups run at a time and locations are only read as slots free up.
+    async def stream(self, locations, concurrency=DEFAULT_CONCURRENCY, default_units='metric'):
+        concurrency = max(1, int(concurrency))
+        loop = asyncio.get_running_loop()
+        locations = iter(locations)
+        pending = set()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while True:
+                # Fill the free slots with the next locations
+                for location in locations:
+                    pending.add(loop.run_in_executor(executor, self.lookup_location, location, default_units))
+                    if len(pending) >= concurrency:
+                        break
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    # close the transport if this lookup created it.
+    def close(self):
+        if self.owns_transport:
+            self.transport.close()
+
+
+# read locations from a CSV file with a header row or a JSONL file with one object per line.
+# Rows are yielded one at a time so large files are never loaded into memory.
+def read_locations(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        if path.lower().endswith(('.jsonl', '.ndjson', '.json')):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(file):
+                yield {key.strip().lower(): value for key, value in row.items() if key}
+
+
+# write one JSON object per result to the output file as the results arrive.
+async def write_ndjson(results, output):
+    count = 0
+    async for result in results:
+        output.write(json.dumps(result.to_dict(), ensure_ascii=False) + '\n')
+        output.flush()
+        count += 1
+    return count
+
+
+# write one CSV row per result to the output file as the results arrive.
+async def write_csv(results, output):
+    writer = csv.DictWriter(output, fieldnames=RESULT_FIELDS)
+    writer.writeheader()
+    count = 0
+    async for result in results:
+        writer.writerow(result.to_dict())
+        output.flush()
+        count += 1
+    return count
@@ -0,0 +1,269 @@
+# Weather Lookup App - Instrumentation
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the per-stage timing and counters for the weather lookup.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Weather Lookup Instrumentation
+
+Times each stage of a lookup and counts what happened along the way:
+
+Stages (histograms, in seconds):
+- geocode: WeatherProgram.get_geo_coordinates, including gazetteer and cache lookups
+- weather: WeatherProgram.get_weather, including the weather cache
+- http:    one request to the API, including retries and backoff
+- parse:   parsing the JSON response
+- render:  WeatherProgram.display_weather
+
+Counters:
+- cache_lookups_total{cache, result}    gazetteer, geo and weather cache hits and misses
+- upstream_requests_total{status}       requests sent to the API by HTTP status
+- upstream_retries_total                retried requests
+- upstream_coalesced_total              requests that joined an identical request already in flight
+- errors_total{error_class}             connection, timeout, http and request errors
+
+Instrumentation is disabled by default. While disabled, timed methods skip straight to the work and
+count() returns at once, so it costs one attribute check per call. Enable the process-wide instance
+with get_instrumentation().enable(). Timing events can be sent to hooks (for example JsonLogHook for
+structured logs), and everything can be exported in the Prometheus text format.
+
+"""
+
+import functools
+import json
+import logging
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prefix of every exported metric name.
+METRIC_PREFIX = 'weather_lookup'
+
+
+# Class for a cumulative histogram with fixed buckets.
+class Histogram:
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    # return the approximate value below which the given fraction (0 to 1) of observations fall.
+    def quantile(self, fraction):
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+# Class for a context manager that times one stage.
+class _StageTimer:
+
+    __slots__ = ('instrumentation', 'stage', 'labels', 'started')
+
+    def __init__(self, instrumentation, stage, labels):
+        self.instrumentation = instrumentation
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        labels = self.labels
+        if exc_type is not None:
+            labels = dict(labels or {}, error=exc_type.__name__)
+        self.instrumentation.observe(self.stage, time.perf_counter() - self.started, labels)
+        return False
+
+
+# Class for the timer handed out while instrumentation is disabled; it does nothing.
+class _NullTimer:
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+# Class that collects stage timings and counters and sends timing events to hooks.
+class Instrumentation:
+
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.histograms = {}
+        self.counters = {}
+        self.hooks = []
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+        return self
+
+    # add a callable that receives a dictionary for every timed stage: {'stage', 'seconds', ...labels}.
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    # return a context manager that times the stage (a no-op while disabled).
+    def timer(self, stage, **labels):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage, labels or None)
+
+    # record how long a stage took and pass the event to the hooks.
+    def observe(self, stage, seconds, labels=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+        if self.hooks:
+            event = {'stage': stage, 'seconds': round(seconds, 6)}
+            if labels:
+                event.update(labels)
+            for hook in self.hooks:
+                hook(event)
+
+    # add to a counter; labels become Prometheus labels.
+    def count(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    # return the current value of a counter.
+    def counter_value(self, name, **labels):
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    # forget every timing and counter.
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    # return the timings and counters as a plain dictionary, for structured logs or JSON output.
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': histogram.count,
+                    'sum_seconds': round(histogram.sum, 6),
+                    'p50_seconds': histogram.quantile(0.5),
+                    'p95_seconds': histogram.quantile(0.95),
+                    'p99_seconds': histogram.quantile(0.99)
+                }
+                for stage, histogram in self.histograms.items()
+            }
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+        return {'stages': stages, 'counters': counters}
+
+    # return the timings and counters in the Prometheus text exposition format.
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            if self.histograms:
+                name = f"{METRIC_PREFIX}_stage_seconds"
+                lines.append(f"# TYPE {name} histogram")
+                for stage, histogram in sorted(self.histograms.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+
+            typed = set()
+            for (counter, labels), value in sorted(self.counters.items()):
+                name = f"{METRIC_PREFIX}_{counter}"
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+# Class for a hook that writes every timing event as one JSON log line.
+class JsonLogHook:
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger('weather_lookup.metrics')
+        self.level = level
+
+    def __call__(self, event):
+        self.logger.log(self.level, json.dumps(event))
+
+
+_instrumentation = Instrumentation()
+
+
+# return the process-wide instrumentation used by WeatherProgram and WeatherTransport by default.
+def get_instrumentation():
+    return _instrumentation
+
+
+# decorator that times a method of an object with an 'instrumentation' attribute as the given stage.
+def timed(stage):
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if not instrumentation.enabled:
+                return method(self, *args, **kwargs)
+            with instrumentation.timer(stage):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,339 @@
+# Weather Lookup App - Weather Program
+# Author: Vema Dondeti
+# 8/08/2024
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Moved WeatherProgram and the unit helpers out of Weather-Lookup-App.py so the service,
+#                 library API and tools can import them. Errors are kept in last_error and printed
+#                 unless the program is quiet.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 2
+# Change(s) Made: The OpenWeatherMap host can be overridden (api_base) so the program can run against a
+#                 local stub of the API.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 3
+# Change(s) Made: The geocode, weather and render stages are timed and cache hits/misses are counted
+#                 through weather_metrics (disabled unless enabled by the caller).
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 4
+# Change(s) Made: Requests carry the program's rate limiter priority lane to the transport.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Weather Program
+
+WeatherProgram looks up the current weather for one US city/state or zip code from the OpenWeatherMap
+API. It holds the interactive prompts used by Weather-Lookup-App.py, the geo and weather lookups, and
+the formatted display of the result.
+
+Weather is always requested in Kelvin and converted to the chosen unit locally (see convert_temperature).
+
+"""
+
+from datetime import datetime
+import textwrap
+from weather_cache import geo_cache_key
+from weather_metrics import get_instrumentation, timed
+from weather_rate_limit import PRIORITY_INTERACTIVE
+from weather_transport import get_default_transport
+
+# OpenWeatherMap endpoints used for the geo and weather lookups.
+GEO_BASE_URL = 'http://api.openweathermap.org/geo/1.0/'
+WEATHER_BASE_URL = 'https://api.openweathermap.org/data/2.5/weather?'
+
+# Map the user's temperature unit choice to the OpenWeatherMap 'units' parameter.
+TEMP_UNITS = {
+    'c': 'metric',
+    'f': 'imperial',
+    'k': 'standard'
+}
+
+# Temperature label for each OpenWeatherMap 'units' value.
+UNIT_LABELS = {
+    'metric': '°C',
+    'imperial': '°F',
+    'standard': 'K'
+}
+
+# Weather is always requested in this unit and converted locally.
+CANONICAL_UNIT = 'standard'
+
+
+# convert a temperature in Kelvin to the given OpenWeatherMap unit, rounded like the API's own values.
+def convert_temperature(kelvin, units):
+    if units == 'metric':
+        return round(kelvin - 273.15, 2)
+    if units == 'imperial':
+        return round(kelvin * 9 / 5 - 459.67, 2)
+    return kelvin
+
+
+# Class to manage weather data retrieval and display using OpenWeatherMap API.
+class WeatherProgram:
+
+    # Initialize WeatherProgram with API key and default values.
+    # An optional WeatherTransport can be passed in (by default one transport is shared by the whole process),
+    # an optional GeoCache so that coordinates are reused between lookups, and an optional
+    # ZipGazetteer used to resolve zip codes without calling the geo API, and an optional WeatherCache
+    # so recent weather responses are reused. With quiet=True errors are only kept in last_error, not printed.
+    # api_base (for example 'http://127.0.0.1:8001') sends the requests to another OpenWeatherMap-compatible host.
+    # instrumentation defaults to the process-wide Instrumentation from weather_metrics.
+    # priority is the rate limiter lane of the program's requests: 'interactive' or 'bulk'.
+    def __init__(self, api_key, transport=None, geo_cache=None, gazetteer=None, weather_cache=None, quiet=False,
+                 api_base=None, instrumentation=None, priority=PRIORITY_INTERACTIVE):
+        self.api_key = api_key
+        self.quiet = quiet
+        self.priority = priority
+        self.instrumentation = instrumentation if instrumentation is not None else get_instrumentation()
+        self.geo_base_url = f"{api_base.rstrip('/')}/geo/1.0/" if api_base else GEO_BASE_URL
+        self.weather_base_url = f"{api_base.rstrip('/')}/data/2.5/weather?" if api_base else WEATHER_BASE_URL
+        self.transport = transport if transport is not None else get_default_transport()
+        self.geo_cache = geo_cache
+        self.gazetteer = gazetteer
+        self.weather_cache = weather_cache
+        self.latitude = None
+        self.longitude = None
+        self.city = None
+        self.zip_code = None
+        self.state = None
+        self.temp_unit = None
+        self.last_error = None
+
+    #  Get User's choice of weather lookup method or quit option.
+    @staticmethod
+    def get_user_choice():
+        print("\nHow would you like to look up the weather today?")
+        print("1 - By City")
+        print("2 - By Zip code")
+        print("q - Quit")
+        choice = input("Enter your choice: ")
+        return choice
+
+    # get city and state for weather lookup by city
+    def set_city(self):
+
+        while True:
+            self.city = input("\nEnter city name: ").strip()
+            self.state = input("Enter state abbreviation (e.g., 'TX'): ").strip().upper()
+
+            if self.city and self.state:
+                break
+            else:
+                print("\n***Error: Both city name and state abbreviation are required. Please try again.***")
+
+    # set zip code for weather lookup by zip
+    def set_zip_code(self):
+
+        self.zip_code = self.get_zip_code()
+
+    # get a valid 5 digit zip code for the lookup
+    def get_zip_code(self):
+        while True:
+            self.zip_code = input("\nEnter a zip code (5 digits): ").strip()
+
+            if self.zip_code.isdigit():
+                if len(self.zip_code) > 5:
+                    print("\n***Error: Zip code cannot be more than 5 digits. Please try again.***")
+                else:
+                    self.zip_code = self.zip_code.zfill(5)
+                    return self.zip_code
+            else:
+                print("\n***Error: Zip code must contain only digits. Please try again.***")
+
+    # get temperature unit for API request ('metric', 'imperial', or 'standard').
+    def set_temperature_unit(self):
+        while True:
+            unit_choice = input(
+                "\nPlease enter the temperature unit you prefer:\n"
+                "(C) for Celsius\n"
+                "(F) for Fahrenheit\n"
+                "(K) for Kelvin\n"
+                "Enter your choice (C, F, or K): "
+            ).lower()
+            if unit_choice in TEMP_UNITS:
+                self.temp_unit = TEMP_UNITS[unit_choice]
+                break
+            else:
+                print("\n***Invalid choice. Please enter 'C', 'F', or 'K'.***")
+
+    # set the location and temperature unit without prompting (used by bulk mode).
+    # Returns False if the location does not have a city and state or a valid zip code.
+    def set_location(self, city=None, state=None, zip_code=None, units='metric'):
+        self.city = (city or '').strip() or None
+        self.state = (state or '').strip().upper() or None
+        self.zip_code = None
+        self.temp_unit = units
+
+        zip_code = str(zip_code or '').strip()
+        if zip_code:
+            if not zip_code.isdigit() or len(zip_code) > 5:
+                return False
+            self.zip_code = zip_code.zfill(5)
+
+        return bool((self.city and self.state) or self.zip_code)
+
+    # fetch geo coordinates based on city or zip code.
+    @timed('geocode')
+    def get_geo_coordinates(self):
+
+        base_url = self.geo_base_url
+
+        if self.city and self.state:
+            complete_url = f"{base_url}direct?q={self.city},{self.state},US&limit=1&appid={self.api_key}"
+        elif self.zip_code:
+            complete_url = f"{base_url}zip?zip={self.zip_code},US&appid={self.api_key}"
+        else:
+            self.report_error("\n***Error: Must provide either city or zip code.***", wrap=False)
+            return None
+
+        # Resolve zip codes from the offline gazetteer first; unknown zip codes fall back to the geo API
+        if self.gazetteer is not None and not (self.city and self.state):
+            coordinates = self.gazetteer.lookup(self.zip_code)
+            self.instrumentation.count('cache_lookups_total', cache='gazetteer', result='hit' if coordinates else 'miss')
+            if coordinates:
+                self.latitude, self.longitude = coordinates
+                return self.latitude, self.longitude
+
+        # Reuse cached coordinates for this city/state or zip code if available
+        cache_key = None
+        if self.geo_cache is not None:
+            if self.city and self.state:
+                cache_key = geo_cache_key(city=self.city, state=self.state)
+            else:
+                cache_key = geo_cache_key(zip_code=self.zip_code)
+
+            cached = self.geo_cache.get(cache_key)
+            self.instrumentation.count('cache_lookups_total', cache='geo', result='hit' if cached else 'miss')
+            if cached:
+                self.latitude, self.longitude = cached
+                return self.latitude, self.longitude
+
+        # Send a GET request to the API endpoint through the shared transport.
+        # Connection, timeout and HTTP errors are retried by the transport and returned as an error message.
+        # The geo API answers 404 for places it does not know, which is treated like an empty answer.
+        response_dict, error_message = self.transport.request_json(
+            complete_url, "Failed to retrieve location coordinates", not_found_ok=True, priority=self.priority
+        )
+        if error_message:
+            self.report_error(error_message)
+
+        # If the request failed, the response is empty or contains no data, return None
+        if not response_dict:
+            return None
+
+        # Extract latitude and longitude from the response.
+        # The response is a list for city lookups and a dictionary for zip code lookups.
+        # The following line ensures that 'location' is always a dictionary with the relevant location details.
+        location = response_dict[0] if isinstance(response_dict, list) else response_dict
+
+        self.latitude = location['lat']
+        self.longitude = location['lon']
+
+        # Remember the coordinates for the next lookup of this location
+        if self.geo_cache is not None:
+            self.geo_cache.put(cache_key, self.latitude, self.longitude)
+
+        return self.latitude, self.longitude
+
+    # Fetch weather data using the current latitude and longitude.
+    # Temperatures in the returned data are always in Kelvin; display_weather converts them to the chosen unit.
+    @timed('weather')
+    def get_weather(self):
+        base_url = self.weather_base_url
+
+        if self.latitude is None or self.longitude is None:
+            self.report_error(
+                "***Error: Coordinates must be set before fetching weather.***\n"
+                "***Please ensure you have entered a valid city name and state or a valid zip code.***",
+                wrap=False
+            )
+            return None
+
+        # Reuse a recent response for the same place if available
+        if self.weather_cache is not None:
+            weather_data = self.weather_cache.get(self.latitude, self.longitude)
+            self.instrumentation.count('cache_lookups_total', cache='weather',
+                                       result='miss' if weather_data is None else 'hit')
+            if weather_data is not None:
+                return weather_data
+
+        complete_url = (
+            f"{base_url}lat={self.latitude}&lon={self.longitude}"
+            f"&units={CANONICAL_UNIT}&appid={self.api_key}"
+        )
+
+        # Send a GET request to the API endpoint through the shared transport.
+        # Connection, timeout and HTTP errors are retried by the transport and returned as an error message.
+        weather_data, error_message = self.transport.request_json(complete_url, "Failed to retrieve weather data",
+                                                                  priority=self.priority)
+        if error_message:
+            self.report_error(error_message)
+
+        # Remember the response for the next lookup of this place
+        if weather_data is not None and self.weather_cache is not None:
+            self.weather_cache.put(self.latitude, self.longitude, weather_data)
+
+        # Return the parsed weather data
+        return weather_data
+
+    # remember the error message and show it to the user unless the program is quiet.
+    # Request errors are wrapped to 80 columns; the program's own ***-framed messages are printed as is.
+    def report_error(self, error_message, wrap=True):
+        self.last_error = ' '.join(error_message.replace('***', ' ').split())
+        if not self.quiet:
+            print(textwrap.fill(error_message, width=80) if wrap else error_message)
+
+    # Display the weather data in a formatted manner.
+    @timed('render')
+    def display_weather(self, weather_data):
+
+        # Determine the unit label based on the user's choice
+        unit_label = UNIT_LABELS.get(self.temp_unit, 'Unknown')
+
+        # Extract main weather details from the API response
+        main_weather = weather_data['main']
+        weather_desc = weather_data['weather'][0]['description']
+
+        # Retrieve specific weather attributes, converting temperatures from Kelvin to the user's unit
+        current_temp = convert_temperature(main_weather['temp'], self.temp_unit)
+        feels_like = convert_temperature(main_weather['feels_like'], self.temp_unit)
+        low_temp = convert_temperature(main_weather['temp_min'], self.temp_unit)
+        high_temp = convert_temperature(main_weather['temp_max'], self.temp_unit)
+        pressure = main_weather['pressure']
+        humidity = main_weather['humidity']
+
+        # Start with the city name from the weather data
+        location = f"{weather_data['name']}"
+
+        # Append state abbreviation city look up
+        if self.state:
+            location += f", {self.state}"
+        # Append zip code if weather lookup is by zip code
+        elif self.zip_code:
+            location += f", {self.zip_code}"
+
+        print("\n" + "-" * 50)  # Line at the top
+        print(
+            f"Weather for {location}"
+            f" at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+        print("" + "-" * 50)
+        print(f"{'Current Temp:':<20} {current_temp} {unit_label}")
+        print(f"{'Feels Like:':<20} {feels_like} {unit_label}")
+        print(f"{'Low Temp:':<20} {low_temp} {unit_label}")
+        print(f"{'High Temp:':<20} {high_temp} {unit_label}")
+        print(f"{'Pressure:':<20} {pressure} hPa")
+        print(f"{'Humidity:':<20} {humidity}%")
+        print(f"{'Weather Description:':<20} {weather_desc.capitalize()}")
+        print("-" * 50)  # Line at the bottom
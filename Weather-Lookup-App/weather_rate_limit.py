@@ -0,0 +1,239 @@
+# Weather Lookup App - Rate Limiter
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the shared token-bucket rate limiter with priority lanes.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Weather Rate Limiter
+
+Keeps every geocode and weather request inside the API's calls-per-minute budget, so workers never run
+into 429 (too many requests) answers. WeatherTransport takes a token from the RateLimiter before every
+request it sends, including retries.
+
+Token Bucket:
+The bucket holds up to `burst` tokens and refills at calls_per_minute / 60 tokens per second. A request
+takes one token, or waits until one is available. Sustained throughput is exactly the budget, and short
+bursts up to `burst` requests go out at once.
+
+Shared Across Processes:
+With a path, the bucket lives in a 16 byte file (tokens and last refill time, two float64 values) that
+is locked with an OS file lock around every take, so any number of processes on the machine share one
+budget. Without a path the bucket is shared by the threads of the process only.
+
+Priority Lanes:
+Requests are made in the 'interactive' lane (the interactive program and the weather service) or the
+'bulk' lane (bulk mode and the weather recorder). In a process, waiting interactive requests always go
+before waiting bulk requests. Across processes, bulk requests leave `reserve` tokens in the bucket, so an
+interactive request finds a token at once even while bulk workers use the rest of the budget.
+
+    limiter = RateLimiter(calls_per_minute=60, path='/tmp/owm_rate_limit')
+    transport = WeatherTransport(rate_limiter=limiter)
+
+"""
+
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+from weather_metrics import get_instrumentation
+
+# Priority lanes, most urgent first.
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BULK = 'bulk'
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+# The free OpenWeatherMap plan allows 60 calls per minute.
+DEFAULT_CALLS_PER_MINUTE = 60
+DEFAULT_BURST = 10
+
+# Tokens bulk requests leave for interactive requests.
+DEFAULT_RESERVE = 2
+
+# State file shared by the command line tools when a budget is given.
+DEFAULT_RATE_LIMIT_PATH = os.path.join(tempfile.gettempdir(), 'owm_rate_limit.bin')
+
+# Tokens (float64) and the time they were last refilled (float64, seconds since the epoch).
+STATE = struct.Struct('<dd')
+
+
+# Class for a token-bucket rate limiter shared by threads and, with a path, by processes.
+class RateLimiter:
+
+    # Initialize the limiter with the budget in calls per minute, the bucket size, the tokens kept for
+    # interactive requests and an optional state file shared with other processes.
+    def __init__(self, calls_per_minute=DEFAULT_CALLS_PER_MINUTE, burst=DEFAULT_BURST, reserve=DEFAULT_RESERVE,
+                 path=None, instrumentation=None):
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+        self.rate = calls_per_minute / 60
+        self.burst = max(1.0, float(burst))
+        self.reserve = min(max(0.0, float(reserve)), self.burst - 1)
+        self.path = path
+        self.instrumentation = instrumentation if instrumentation is not None else get_instrumentation()
+
+        # Counters for reporting how often requests had to wait.
+        self.acquired = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+
+        self._condition = threading.Condition()
+        self._lanes = {priority: deque() for priority in PRIORITIES}
+        self._tokens = self.burst
+        self._updated = time.time()
+
+        self._file = None
+        if path is not None:
+            self._file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b', buffering=0)
+            with self._file_lock():
+                self._file.seek(0)
+                if len(self._file.read(STATE.size)) < STATE.size:
+                    self._file.seek(0)
+                    self._file.truncate()
+                    self._file.write(STATE.pack(self.burst, time.time()))
+
+    # wait until the request may be sent. Within the process, earlier and more urgent requests go first.
+    def acquire(self, priority=PRIORITY_INTERACTIVE):
+        if priority not in self._lanes:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        ticket = object()
+        started = time.monotonic()
+        waited = False
+        with self._condition:
+            lane = self._lanes[priority]
+            lane.append(ticket)
+            try:
+                while True:
+                    if self._next_ticket() is ticket:
+                        delay = self._take(priority)
+                        if delay == 0:
+                            break
+                    else:
+                        delay = None
+
+                    # Sleep until a token is due, or until the head of the queue changes
+                    waited = True
+                    self._condition.wait(delay)
+            finally:
+                lane.remove(ticket)
+                self._condition.notify_all()
+
+            self.acquired += 1
+            if waited:
+                seconds = time.monotonic() - started
+                self.waited += 1
+                self.wait_seconds += seconds
+
+        if waited:
+            self.instrumentation.observe('rate_limit_wait', seconds, {'priority': priority})
+            self.instrumentation.count('rate_limited_total', priority=priority)
+
+    # return the first waiting request of the most urgent non-empty lane.
+    def _next_ticket(self):
+        for priority in PRIORITIES:
+            if self._lanes[priority]:
+                return self._lanes[priority][0]
+        return None
+
+    # take a token if one is available for the lane and return 0, otherwise return the seconds until one is.
+    def _take(self, priority):
+        floor = self.reserve if priority == PRIORITY_BULK else 0.0
+        with self._file_lock():
+            tokens, updated = self._read_state()
+            now = time.time()
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+            if tokens - 1 >= floor:
+                self._write_state(tokens - 1, now)
+                return 0
+            self._write_state(tokens, now)
+            return (floor + 1 - tokens) / self.rate
+
+    # empty the bucket, for example after the API answered 429, so every sharer backs off.
+    def drain(self):
+        with self._condition:
+            with self._file_lock():
+                self._write_state(0.0, time.time())
+
+    def _read_state(self):
+        if self._file is None:
+            return self._tokens, self._updated
+        self._file.seek(0)
+        return STATE.unpack(self._file.read(STATE.size))
+
+    def _write_state(self, tokens, updated):
+        if self._file is None:
+            self._tokens, self._updated = tokens, updated
+            return
+        self._file.seek(0)
+        self._file.write(STATE.pack(tokens, updated))
+
+    # return a context manager holding the OS lock on the state file (a no-op without a file).
+    def _file_lock(self):
+        return _FileLock(self._file)
+
+    # return the number of requests let through and how many had to wait, and for how long in total.
+    def stats(self):
+        return {
+            'acquired': self.acquired,
+            'waited': self.waited,
+            'wait_seconds': round(self.wait_seconds, 3)
+        }
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# Class for an exclusive OS lock on the first bytes of an open file, for the length of a with block.
+class _FileLock:
+
+    __slots__ = ('file',)
+
+    def __init__(self, file):
+        self.file = file
+
+    def __enter__(self):
+        if self.file is None:
+            return self
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, STATE.size)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.file is None:
+            return False
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, STATE.size)
+        return False
+
+
+# return a RateLimiter for the command line options, or None if no budget was given.
+# The bucket is shared through the state file unless path is empty.
+def rate_limiter_from_args(calls_per_minute, path=DEFAULT_RATE_LIMIT_PATH):
+    if not calls_per_minute:
+        return None
+    return RateLimiter(calls_per_minute, path=os.path.expanduser(path) if path else None)
@@ -0,0 +1,516 @@
+# Weather Lookup App - Weather Recorder
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the scheduled weather recorder and the columnar reading store.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 2
+# Change(s) Made: Polls fetch the weather with grouped requests instead of one request per location.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 3
+# Change(s) Made: Added --rate-limit and --rate-limit-file; the recorder's requests use the bulk lane.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Weather Recorder
+
+Polls a fixed set of locations on an interval and keeps the history. Locations are geocoded once and
+their weather is fetched with grouped requests (weather_batch.py). Each weather response is reduced to
+a small WeatherReading with the values display_weather shows (temp, feels_like, temp_min, temp_max,
+pressure, humidity, description) and appended to a ReadingStore instead of keeping the raw JSON.
+
+Reading Store Layout:
+A store is a directory with a manifest.json and a series of chunks. Each chunk is a directory with one
+NumPy .npy file per column, sorted by time:
+
+- timestamp    int64    seconds since the epoch (UTC)
+- location     uint32   index into the manifest's 'locations' list
+- temp, feels_like, temp_min, temp_max   float32   Kelvin
+- pressure     uint16   hPa
+- humidity     uint8    percent
+- description  uint16   index into the manifest's 'descriptions' list
+
+A reading takes 29 bytes. The manifest records the time range of every chunk, so a range query only
+opens the chunks that overlap it, memory-maps just the columns it needs and binary-searches the
+timestamps, so months of readings for hundreds of locations are queried without loading them. The last
+chunk is rewritten as it fills and the manifest is replaced atomically, so a crash never leaves a
+half-written chunk in the store.
+
+Recording every 10 minutes against the local stub, then querying one location in Fahrenheit:
+
+    python weather_recorder.py record locations.csv --store weather_history --interval 600
+    python weather_recorder.py query --store weather_history --location 78701 --start 2026-10-01 --units F
+
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from weather_cache import GeoCache, DEFAULT_GEO_CACHE_PATH
+from weather_lookup import WeatherLookup, WeatherResult, read_locations, normalize_units, DEFAULT_CONCURRENCY
+from weather_program import CANONICAL_UNIT, UNIT_LABELS
+from weather_rate_limit import rate_limiter_from_args, PRIORITY_BULK, DEFAULT_RATE_LIMIT_PATH
+from zip_gazetteer import load_default_gazetteer
+
+# Seconds between polls.
+DEFAULT_INTERVAL = 600
+
+# Readings per chunk of the store.
+DEFAULT_CHUNK_SIZE = 65536
+
+STORE_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+# Column name and NumPy type of every column in the store, in order.
+COLUMNS = {
+    'timestamp': np.int64,
+    'location': np.uint32,
+    'temp': np.float32,
+    'feels_like': np.float32,
+    'temp_min': np.float32,
+    'temp_max': np.float32,
+    'pressure': np.uint16,
+    'humidity': np.uint8,
+    'description': np.uint16
+}
+
+# Columns holding temperatures in Kelvin.
+TEMPERATURE_COLUMNS = ('temp', 'feels_like', 'temp_min', 'temp_max')
+
+
+# return seconds since the epoch for a datetime, an ISO 8601 string or a number; None stays None.
+def to_epoch(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+# convert a column of temperatures in Kelvin to the given OpenWeatherMap unit (see convert_temperature).
+def convert_temperature_column(kelvin, units):
+    kelvin = np.asarray(kelvin, dtype=np.float64)
+    if units == 'metric':
+        return np.round(kelvin - 273.15, 2)
+    if units == 'imperial':
+        return np.round(kelvin * 9 / 5 - 459.67, 2)
+    return kelvin
+
+
+# Class for one weather reading. Temperatures are in Kelvin, like the API's canonical responses.
+class WeatherReading:
+
+    __slots__ = ('location', 'timestamp', 'temp', 'feels_like', 'temp_min', 'temp_max', 'pressure', 'humidity',
+                 'description')
+
+    def __init__(self, location, timestamp, temp, feels_like, temp_min, temp_max, pressure, humidity, description):
+        self.location = location
+        self.timestamp = timestamp
+        self.temp = temp
+        self.feels_like = feels_like
+        self.temp_min = temp_min
+        self.temp_max = temp_max
+        self.pressure = pressure
+        self.humidity = humidity
+        self.description = description
+
+    # build a reading from a weather response in Kelvin, keeping only the fields display_weather uses.
+    @classmethod
+    def from_response(cls, location, timestamp, weather_data):
+        main_weather = weather_data['main']
+        return cls(location, int(timestamp), main_weather['temp'], main_weather['feels_like'],
+                   main_weather['temp_min'], main_weather['temp_max'], main_weather['pressure'],
+                   main_weather['humidity'], weather_data['weather'][0]['description'])
+
+    def __repr__(self):
+        return (f"WeatherReading({self.location!r}, {self.timestamp}, temp={self.temp}, "
+                f"description={self.description!r})")
+
+
+# Class for the chunked columnar store of weather readings (see the module docstring for the layout).
+class ReadingStore:
+
+    # Open the store in the given directory, creating it if needed. chunk_size only applies to a new store.
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._buffer = []
+
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as file:
+                self.manifest = json.load(file)
+            if self.manifest.get('version') != STORE_VERSION:
+                raise ValueError(f"{path} is not a version {STORE_VERSION} weather reading store")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.manifest = {'version': STORE_VERSION, 'chunk_size': int(chunk_size), 'locations': [],
+                             'descriptions': [], 'chunks': []}
+            self._write_manifest()
+
+        self.chunk_size = self.manifest['chunk_size']
+        self._location_ids = {key: index for index, key in enumerate(self.manifest['locations'])}
+        self._description_ids = {text: index for index, text in enumerate(self.manifest['descriptions'])}
+
+    @property
+    def locations(self):
+        return list(self.manifest['locations'])
+
+    # return the number of readings written to disk (buffered readings are not counted until flushed).
+    def __len__(self):
+        return sum(chunk['rows'] for chunk in self.manifest['chunks'])
+
+    # buffer readings until the next flush().
+    def append(self, readings):
+        with self._lock:
+            self._buffer.extend(readings)
+
+    # write the buffered readings to disk, filling the last chunk before starting a new one.
+    def flush(self):
+        with self._lock:
+            if not self._buffer:
+                return 0
+            readings, self._buffer = self._buffer, []
+            columns = self._encode(readings)
+
+            chunks = self.manifest['chunks']
+            removed = []
+            if chunks and chunks[-1]['rows'] < self.chunk_size:
+                # Reopen the partly filled last chunk and add the new readings to it
+                tail = chunks.pop()
+                removed.append(tail['name'])
+                tail_columns = self._load_chunk(tail, COLUMNS, mmap_mode=None)
+                columns = {name: np.concatenate([tail_columns[name], columns[name]]) for name in COLUMNS}
+
+            order = np.argsort(columns['timestamp'], kind='stable')
+            columns = {name: column[order] for name, column in columns.items()}
+
+            for start in range(0, len(order), self.chunk_size):
+                piece = {name: column[start:start + self.chunk_size] for name, column in columns.items()}
+                chunks.append(self._write_chunk(len(chunks), piece))
+
+            # The new manifest is the commit point; replaced chunks are removed afterwards
+            self._write_manifest()
+            for name in removed:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+            return len(readings)
+
+    # turn readings into NumPy columns, adding new locations and descriptions to the manifest.
+    def _encode(self, readings):
+        count = len(readings)
+        columns = {name: np.empty(count, dtype=dtype) for name, dtype in COLUMNS.items()}
+        for row, reading in enumerate(readings):
+            columns['timestamp'][row] = reading.timestamp
+            columns['location'][row] = self._intern(reading.location, self._location_ids, 'locations')
+            columns['temp'][row] = reading.temp
+            columns['feels_like'][row] = reading.feels_like
+            columns['temp_min'][row] = reading.temp_min
+            columns['temp_max'][row] = reading.temp_max
+            columns['pressure'][row] = reading.pressure
+            columns['humidity'][row] = reading.humidity
+            columns['description'][row] = self._intern(reading.description, self._description_ids, 'descriptions')
+        return columns
+
+    # return the index of a location or description, adding it to the manifest if it is new.
+    def _intern(self, value, ids, manifest_key):
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(self.manifest[manifest_key])
+            self.manifest[manifest_key].append(value)
+        return index
+
+    # write one chunk directory and return its manifest entry. The name includes the row count, so a
+    # rewritten last chunk never overwrites the copy the current manifest points to.
+    def _write_chunk(self, index, columns):
+        rows = len(columns['timestamp'])
+        name = f"chunk_{index:06d}_{rows:06d}"
+        chunk_path = os.path.join(self.path, name)
+        os.makedirs(chunk_path, exist_ok=True)
+        for column_name, column in columns.items():
+            np.save(os.path.join(chunk_path, f"{column_name}.npy"), column)
+        return {'name': name, 'rows': rows, 'start': int(columns['timestamp'][0]),
+                'end': int(columns['timestamp'][-1])}
+
+    def _write_manifest(self):
+        temp_path = os.path.join(self.path, MANIFEST_NAME + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.manifest, file)
+        os.replace(temp_path, os.path.join(self.path, MANIFEST_NAME))
+
+    # load the given columns of a chunk, memory-mapped by default.
+    def _load_chunk(self, chunk, columns, mmap_mode='r'):
+        chunk_path = os.path.join(self.path, chunk['name'])
+        return {name: np.load(os.path.join(chunk_path, f"{name}.npy"), mmap_mode=mmap_mode) for name in columns}
+
+    # yield the matching readings one chunk at a time as a dictionary of NumPy columns.
+    # start and end (inclusive) are datetimes, ISO 8601 strings or epoch seconds; locations is a list of keys.
+    # Temperatures are converted to units ('metric', 'imperial', 'standard' or C/F/K).
+    def iter_query(self, start=None, end=None, locations=None, columns=None, units=CANONICAL_UNIT):
+        start, end = to_epoch(start), to_epoch(end)
+        units = normalize_units(units, CANONICAL_UNIT)
+        if units is None:
+            raise ValueError("Unknown temperature unit.")
+        columns = list(columns or COLUMNS)
+
+        location_ids = None
+        if locations is not None:
+            location_ids = np.array([self._location_ids[key] for key in locations if key in self._location_ids],
+                                    dtype=np.uint32)
+            if not len(location_ids):
+                return
+
+        for chunk in list(self.manifest['chunks']):
+            if (start is not None and chunk['end'] < start) or (end is not None and chunk['start'] > end):
+                continue
+
+            # The timestamps are sorted, so the time range is two binary searches
+            timestamps = self._load_chunk(chunk, ['timestamp'])['timestamp']
+            first = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+            last = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='right'))
+            if first >= last:
+                continue
+
+            needed = set(columns) | ({'location'} if location_ids is not None else set())
+            data = self._load_chunk(chunk, needed)
+            selection = slice(first, last)
+            if location_ids is not None:
+                selection = first + np.flatnonzero(np.isin(data['location'][first:last], location_ids))
+                if not len(selection):
+                    continue
+
+            result = {}
+            for name in columns:
+                column = np.asarray(data[name][selection])
+                if name in TEMPERATURE_COLUMNS and units != CANONICAL_UNIT:
+                    column = convert_temperature_column(column, units)
+                result[name] = column
+            yield result
+
+    # return all matching readings as one dictionary of NumPy columns (see iter_query).
+    def query(self, start=None, end=None, locations=None, columns=None, units=CANONICAL_UNIT):
+        columns = list(columns or COLUMNS)
+        pieces = list(self.iter_query(start, end, locations, columns, units))
+        if not pieces:
+            return {name: np.empty(0, dtype=COLUMNS[name]) for name in columns}
+        return {name: np.concatenate([piece[name] for piece in pieces]) for name in columns}
+
+    # return the matching readings as WeatherReading objects, for small result sets.
+    def readings(self, start=None, end=None, locations=None):
+        data = self.query(start, end, locations)
+        location_keys = self.manifest['locations']
+        descriptions = self.manifest['descriptions']
+        return [
+            WeatherReading(location_keys[data['location'][row]], int(data['timestamp'][row]),
+                           round(float(data['temp'][row]), 2), round(float(data['feels_like'][row]), 2),
+                           round(float(data['temp_min'][row]), 2), round(float(data['temp_max'][row]), 2),
+                           int(data['pressure'][row]), int(data['humidity'][row]),
+                           descriptions[data['description'][row]])
+            for row in range(len(data['timestamp']))
+        ]
+
+    # write any buffered readings.
+    def close(self):
+        self.flush()
+
+
+# Class that polls a fixed set of locations on an interval and records the readings in a ReadingStore.
+class WeatherRecorder:
+
+    # Initialize the recorder with a WeatherLookup, the ReadingStore, the locations (dictionaries with
+    # 'city'/'state' or 'zip' and an optional 'id'), the seconds between polls and the number of locations
+    # fetched at the same time.
+    def __init__(self, lookup, store, locations, interval=DEFAULT_INTERVAL, concurrency=DEFAULT_CONCURRENCY):
+        self.lookup = lookup
+        self.store = store
+        self.locations = list(locations)
+        self.interval = interval
+        self.concurrency = max(1, int(concurrency))
+        self.polls = 0
+        self.failures = 0
+        self.last_errors = {}
+
+        # Coordinates of every location, resolved once on the first poll.
+        self._coordinates = {}
+
+    # return the key a location is stored under: its 'id', its zip code or 'City,ST'.
+    @staticmethod
+    def location_key(location):
+        if location.get('id'):
+            return str(location['id'])
+        if location.get('zip'):
+            return str(location['zip']).strip()
+        return f"{str(location.get('city', '')).strip().title()},{str(location.get('state', '')).strip().upper()}"
+
+    # return the coordinates of a location, geocoding it on first use; None if it cannot be geocoded.
+    def coordinates(self, location):
+        key = self.location_key(location)
+        coordinates = self._coordinates.get(key)
+        if coordinates is None:
+            result = self.lookup.geocode(location.get('city'), location.get('state'), location.get('zip'))
+            if result.error:
+                self.last_errors[key] = result.error
+                return None
+            coordinates = self._coordinates[key] = (result.latitude, result.longitude)
+        return coordinates
+
+    # poll every location once, store the readings and return how many were recorded.
+    # The weather is fetched with grouped requests (see WeatherLookup.fetch_weather_many), so after the
+    # first poll has learned the city IDs each poll takes one request per 20 locations.
+    def poll(self, timestamp=None):
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            coordinates = list(executor.map(self.coordinates, self.locations))
+
+        keys, results = [], []
+        for location, place in zip(self.locations, coordinates):
+            if place is not None:
+                keys.append(self.location_key(location))
+                results.append(WeatherResult(latitude=place[0], longitude=place[1]))
+        self.lookup.fetch_weather_many(results, CANONICAL_UNIT)
+
+        recorded = []
+        for key, result in zip(keys, results):
+            if result.error:
+                self.last_errors[key] = result.error
+            else:
+                self.last_errors.pop(key, None)
+                recorded.append(WeatherReading.from_response(key, timestamp, result.weather_data))
+
+        self.failures += len(self.locations) - len(recorded)
+        self.polls += 1
+        self.store.append(recorded)
+        self.store.flush()
+        return len(recorded)
+
+    # poll every `interval` seconds, measured from the start of each poll, until `polls` polls have run
+    # (forever if polls is None).
+    def run(self, polls=None):
+        next_poll = time.monotonic()
+        while polls is None or self.polls < polls:
+            recorded = self.poll()
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} recorded {recorded} of "
+                  f"{len(self.locations)} locations", file=sys.stderr)
+            if polls is not None and self.polls >= polls:
+                break
+            next_poll += self.interval
+            time.sleep(max(0.0, next_poll - time.monotonic()))
+
+
+# print the number of readings and the low, average and high temperature of every location in the range.
+def print_summary(store, start=None, end=None, locations=None, units=CANONICAL_UNIT):
+    units = normalize_units(units, CANONICAL_UNIT)
+    data = store.query(start, end, locations, columns=['timestamp', 'location', 'temp'], units=units)
+    unit_label = UNIT_LABELS.get(units, '')
+    location_keys = store.manifest['locations']
+
+    print(f"{'Location':<24} {'Readings':>9} {'First':>20} {'Last':>20} {'Low':>9} {'Avg':>9} {'High':>9}")
+    print("-" * 106)
+    for location_id in np.unique(data['location']):
+        rows = data['location'] == location_id
+        temps, timestamps = data['temp'][rows], data['timestamp'][rows]
+        first = datetime.fromtimestamp(int(timestamps.min()), timezone.utc).strftime('%Y-%m-%d %H:%M')
+        last = datetime.fromtimestamp(int(timestamps.max()), timezone.utc).strftime('%Y-%m-%d %H:%M')
+        print(f"{location_keys[location_id]:<24} {int(rows.sum()):>9} {first:>20} {last:>20} "
+              f"{temps.min():>7.2f}{unit_label:>2} {temps.mean():>7.2f}{unit_label:>2} {temps.max():>7.2f}{unit_label:>2}")
+    print("-" * 106)
+
+
+# write the matching readings as CSV rows.
+def write_readings_csv(store, output, start=None, end=None, locations=None, units=CANONICAL_UNIT):
+    location_keys = store.manifest['locations']
+    descriptions = store.manifest['descriptions']
+    writer = csv.writer(output)
+    writer.writerow(['time', 'location', 'temp', 'feels_like', 'temp_min', 'temp_max', 'pressure', 'humidity',
+                     'description'])
+    for data in store.iter_query(start, end, locations, units=units):
+        for row in range(len(data['timestamp'])):
+            writer.writerow([
+                datetime.fromtimestamp(int(data['timestamp'][row]), timezone.utc).isoformat(timespec='seconds'),
+                location_keys[data['location'][row]],
+                *(round(float(data[name][row]), 2) for name in TEMPERATURE_COLUMNS),
+                int(data['pressure'][row]), int(data['humidity'][row]), descriptions[data['description'][row]]
+            ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record the weather for a set of locations and query the history.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help="poll the locations in a CSV or JSONL file on an interval")
+    record_parser.add_argument('locations', help="CSV or JSONL file with city/state or zip columns and optional id")
+    record_parser.add_argument('--store', required=True, help="directory of the reading store")
+    record_parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+    record_parser.add_argument('--polls', type=int, help="stop after this many polls (default: run until stopped)")
+    record_parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    record_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="readings per chunk")
+    record_parser.add_argument('--api-key', default=os.environ.get('OPENWEATHERMAP_API_KEY', ''))
+    record_parser.add_argument('--api-base', help="send API requests to this host instead of OpenWeatherMap")
+    record_parser.add_argument('--geo-cache', default=DEFAULT_GEO_CACHE_PATH)
+    record_parser.add_argument('--no-geo-cache', action='store_true')
+    record_parser.add_argument('--rate-limit', type=float, metavar='CALLS_PER_MINUTE',
+                               help="keep API requests within this many calls per minute (default: no limit)")
+    record_parser.add_argument('--rate-limit-file', metavar='PATH', default=DEFAULT_RATE_LIMIT_PATH,
+                               help="file holding the rate limit shared with other processes")
+
+    query_parser = subparsers.add_parser('query', help="summarize or export the recorded readings")
+    query_parser.add_argument('--store', required=True, help="directory of the reading store")
+    query_parser.add_argument('--location', action='append', help="location key (repeat for several)")
+    query_parser.add_argument('--start', help="first time, ISO 8601 (UTC if no offset is given)")
+    query_parser.add_argument('--end', help="last time, ISO 8601 (UTC if no offset is given)")
+    query_parser.add_argument('--units', default='K', help="C, F or K")
+    query_parser.add_argument('--format', choices=['summary', 'csv'], default='summary')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        store = ReadingStore(args.store, chunk_size=args.chunk_size)
+        geo_cache = None if args.no_geo_cache else GeoCache(args.geo_cache)
+        gazetteer = load_default_gazetteer()
+        rate_limiter = rate_limiter_from_args(args.rate_limit, args.rate_limit_file)
+        # No weather cache: every poll should record a fresh response
+        lookup = WeatherLookup(args.api_key, geo_cache=geo_cache, gazetteer=gazetteer, pool_size=args.concurrency,
+                               api_base=args.api_base, rate_limiter=rate_limiter, priority=PRIORITY_BULK)
+        recorder = WeatherRecorder(lookup, store, read_locations(args.locations), interval=args.interval,
+                                   concurrency=args.concurrency)
+        try:
+            recorder.run(args.polls)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            store.close()
+            lookup.close()
+            if rate_limiter is not None:
+                rate_limiter.close()
+            if geo_cache is not None:
+                geo_cache.close()
+            if gazetteer is not None:
+                gazetteer.close()
+        for key, error in recorder.last_errors.items():
+            print(f"{key}: {error}", file=sys.stderr)
+    else:
+        store = ReadingStore(args.store)
+        if args.format == 'csv':
+            write_readings_csv(store, sys.stdout, args.start, args.end, args.location, args.units)
+        else:
+            print_summary(store, args.start, args.end, args.location, args.units)
@@ -0,0 +1,359 @@
+# Weather Lookup App - Weather Service
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the long-lived HTTP weather service.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 2
+# Change(s) Made: /metrics also reports the per-stage histograms and counters from weather_metrics.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 3
+# Change(s) Made: Added --rate-limit and --rate-limit-file; the service's requests use the interactive lane.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Weather Service
+
+Runs the weather lookup as a long-lived asyncio HTTP service instead of the interactive program. One
+WeatherLookup is shared by every request, so the geocoding cache, the weather cache and the pooled
+upstream connections stay warm between requests.
+
+Endpoints:
+- GET /weather?zip=78701&units=F            weather for a zip code
+- GET /weather?city=Austin&state=TX&units=C weather for a city and state
+- GET /metrics                              counters and per-stage latency histograms in the Prometheus
+                                            text format
+- GET /health                               'ok' when the service is running
+
+/weather answers with the WeatherResult as JSON. Bad input is a 400, an unknown place a 404 and a
+failed upstream request a 502.
+
+Running the service against the local OpenWeatherMap stub (no API key or network needed):
+
+    python owm_stub.py --port 8001
+    python weather_service.py --port 8080 --api-base http://127.0.0.1:8001
+    curl 'http://127.0.0.1:8080/weather?zip=78701&units=F'
+
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+from weather_cache import GeoCache, WeatherCache, DEFAULT_GEO_CACHE_PATH, DEFAULT_WEATHER_CACHE_TTL
+from weather_lookup import WeatherLookup, DEFAULT_CONCURRENCY
+from weather_metrics import get_instrumentation
+from weather_rate_limit import rate_limiter_from_args, DEFAULT_RATE_LIMIT_PATH
+from zip_gazetteer import load_default_gazetteer
+
+DEFAULT_SERVICE_PORT = 8080
+
+# Largest request head accepted from a client, in bytes.
+MAX_REQUEST_HEAD = 16 * 1024
+
+# Largest request body accepted (and discarded); the service only reads the query string.
+MAX_REQUEST_BODY = 16 * 1024
+
+# Seconds an idle keep-alive connection is kept open.
+KEEP_ALIVE_TIMEOUT = 15
+
+# HTTP status code for each WeatherResult error stage.
+ERROR_STATUS = {
+    'input': 400,
+    'not_found': 404,
+    'geocode': 502,
+    'weather': 502
+}
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+    502: 'Bad Gateway'
+}
+
+
+# Class to serve weather lookups over HTTP with asyncio.
+class WeatherService:
+
+    # Initialize the service with the API key, listening address, the number of lookups run at the same
+    # time, and the optional caches, gazetteer and rate limiter shared by every request.
+    def __init__(self, api_key, host='127.0.0.1', port=DEFAULT_SERVICE_PORT, concurrency=DEFAULT_CONCURRENCY,
+                 geo_cache=None, gazetteer=None, weather_cache=None, api_base=None, rate_limiter=None):
+        self.host = host
+        self.port = port
+        self.concurrency = max(1, int(concurrency))
+        self.geo_cache = geo_cache
+        self.weather_cache = weather_cache
+        self.lookup = WeatherLookup(api_key, geo_cache=geo_cache, gazetteer=gazetteer, weather_cache=weather_cache,
+                                    pool_size=self.concurrency, api_base=api_base, rate_limiter=rate_limiter)
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self.server = None
+
+        # The service always collects stage timings for /metrics.
+        self.instrumentation = get_instrumentation().enable()
+
+        # Counters reported by /metrics.
+        self.started = time.time()
+        self.requests = {}
+        self.lookup_seconds = 0.0
+        self.lookups = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    # start listening; port 0 picks a free port, available afterwards in self.port.
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    # serve requests until the task is cancelled.
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    # stop listening and release the thread pool and upstream connections.
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+        self.lookup.close()
+
+    # handle the requests on one client connection, keeping it open between requests unless asked to close.
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.send(writer, 400, {'error': 'Request head too large.'}, keep_alive=False)
+                    break
+
+                if len(head) > MAX_REQUEST_HEAD:
+                    await self.send(writer, 400, {'error': 'Request head too large.'}, keep_alive=False)
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await self.send(writer, 400, {'error': 'Malformed request line.'}, keep_alive=False)
+                    break
+
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                # Discard any request body; the service only reads the query string
+                try:
+                    length = int(headers.get('content-length', '0') or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self.send(writer, 400, {'error': 'Invalid Content-Length.'}, keep_alive=False)
+                    break
+                if length > MAX_REQUEST_BODY:
+                    await self.send(writer, 400, {'error': 'Request body too large.'}, keep_alive=False)
+                    break
+                if length:
+                    try:
+                        await asyncio.wait_for(reader.readexactly(length), KEEP_ALIVE_TIMEOUT)
+                    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                        break
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+                status, body, content_type = await self.route(method, target)
+                await self.send(writer, status, body, keep_alive=keep_alive, content_type=content_type)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    # dispatch one request and return (status, body, content type).
+    async def route(self, method, target):
+        url = urlparse(target)
+        path = url.path
+
+        if method != 'GET':
+            status, body, content_type = 405, {'error': 'Only GET is supported.'}, 'application/json'
+        elif path == '/weather':
+            status, body = await self.weather(parse_qs(url.query))
+            content_type = 'application/json'
+        elif path == '/metrics':
+            status, body, content_type = 200, self.metrics(), 'text/plain; version=0.0.4'
+        elif path == '/health':
+            status, body, content_type = 200, 'ok\n', 'text/plain'
+        else:
+            status, body, content_type = 404, {'error': f"Unknown path: {path}"}, 'application/json'
+
+        with self._lock:
+            key = (path if path in ('/weather', '/metrics', '/health') else 'other', status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+        return status, body, content_type
+
+    # look up the weather for the query string and return (status, result dictionary).
+    async def weather(self, query):
+        def first(name):
+            values = query.get(name)
+            return values[0] if values else None
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            result = await loop.run_in_executor(
+                self.executor, self.lookup.lookup,
+                first('city'), first('state'), first('zip'), first('units') or 'metric'
+            )
+        except Exception as err:
+            return 500, {'error': f"Lookup failed: {err}"}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.lookups += 1
+                self.lookup_seconds += time.perf_counter() - started
+
+        status = 200 if result.ok else ERROR_STATUS.get(result.error_stage, 500)
+        return status, result.to_dict()
+
+    # return the service, transport and cache counters in the Prometheus text format.
+    def metrics(self):
+        lines = [
+            "# TYPE weather_service_uptime_seconds gauge",
+            f"weather_service_uptime_seconds {time.time() - self.started:.3f}",
+            "# TYPE weather_service_requests_total counter"
+        ]
+        with self._lock:
+            for (path, status), count in sorted(self.requests.items()):
+                lines.append(f'weather_service_requests_total{{path="{path}",status="{status}"}} {count}')
+            lines += [
+                "# TYPE weather_service_lookups_in_flight gauge",
+                f"weather_service_lookups_in_flight {self.in_flight}",
+                "# TYPE weather_service_lookup_seconds summary",
+                f"weather_service_lookup_seconds_sum {self.lookup_seconds:.6f}",
+                f"weather_service_lookup_seconds_count {self.lookups}"
+            ]
+
+        transport = self.lookup.transport
+        lines += [
+            "# TYPE weather_upstream_requests_total counter",
+            f"weather_upstream_requests_total {transport.requests_sent}",
+            "# TYPE weather_upstream_retries_total counter",
+            f"weather_upstream_retries_total {transport.retries}",
+            "# TYPE weather_upstream_coalesced_total counter",
+            f"weather_upstream_coalesced_total {transport.coalesced}"
+        ]
+
+        for name, cache in (('geo', self.geo_cache), ('weather', self.weather_cache)):
+            if cache is None:
+                continue
+            stats = cache.stats()
+            lines += [
+                f"# TYPE weather_{name}_cache_hits_total counter",
+                f"weather_{name}_cache_hits_total {stats['hits']}",
+                f"# TYPE weather_{name}_cache_misses_total counter",
+                f"weather_{name}_cache_misses_total {stats['misses']}",
+                f"# TYPE weather_{name}_cache_entries gauge",
+                f"weather_{name}_cache_entries {stats['size']}"
+            ]
+
+        return '\n'.join(lines) + '\n' + self.instrumentation.prometheus_text()
+
+    # write one HTTP response; dictionaries are sent as JSON.
+    @staticmethod
+    async def send(writer, status, body, keep_alive=True, content_type='application/json'):
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        payload = body.encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Unknown')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+
+# run the service until interrupted.
+async def serve(service):
+    await service.start()
+    print(f"Weather service listening on http://{service.host}:{service.port}")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve weather lookups over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVICE_PORT)
+    parser.add_argument('--api-key', default=os.getenv('OPENWEATHERMAP_API_KEY', ''),
+                        help="OpenWeatherMap API key (defaults to the OPENWEATHERMAP_API_KEY environment variable)")
+    parser.add_argument('--api-base', help="send API requests to another host, such as the local stub")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="number of lookups run at the same time")
+    parser.add_argument('--geo-cache', metavar='PATH', default=DEFAULT_GEO_CACHE_PATH,
+                        help="SQLite file used to cache geo coordinates")
+    parser.add_argument('--no-geo-cache', action='store_true', help="always call the geo API")
+    parser.add_argument('--no-gazetteer', action='store_true',
+                        help="resolve zip codes with the geo API instead of the offline gazetteer")
+    parser.add_argument('--weather-cache-ttl', type=float, default=DEFAULT_WEATHER_CACHE_TTL,
+                        help="seconds a weather response is reused for nearby lookups (0 disables the cache)")
+    parser.add_argument('--rate-limit', type=float, metavar='CALLS_PER_MINUTE',
+                        help="keep API requests within this many calls per minute (default: no limit)")
+    parser.add_argument('--rate-limit-file', metavar='PATH', default=DEFAULT_RATE_LIMIT_PATH,
+                        help="file holding the rate limit shared with other processes ('' for this process only)")
+    args = parser.parse_args()
+
+    geo_cache = None if args.no_geo_cache else GeoCache(args.geo_cache)
+    gazetteer = None if args.no_gazetteer else load_default_gazetteer()
+    weather_cache = WeatherCache(ttl=args.weather_cache_ttl) if args.weather_cache_ttl > 0 else None
+    rate_limiter = rate_limiter_from_args(args.rate_limit, args.rate_limit_file)
+
+    weather_service = WeatherService(args.api_key, host=args.host, port=args.port, concurrency=args.concurrency,
+                                     geo_cache=geo_cache, gazetteer=gazetteer, weather_cache=weather_cache,
+                                     api_base=args.api_base, rate_limiter=rate_limiter)
+    try:
+        asyncio.run(serve(weather_service))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if geo_cache is not None:
+            geo_cache.close()
+        if gazetteer is not None:
+            gazetteer.close()
@@ -0,0 +1,245 @@
+# Weather Lookup App - HTTP Transport
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the shared HTTP transport for the OpenWeatherMap API.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 2
+# Change(s) Made: Added request_json, which returns the error message instead of printing it, for callers
+#                 that do not talk to a user, and not_found_ok so a 404 can mean "no data" rather than an error.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 3
+# Change(s) Made: Requests, JSON parsing, retries, coalesced calls and each error class are reported to
+#                 weather_metrics.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+#
+# Change#: 4
+# Change(s) Made: Every request, including retries, takes a token from an optional shared RateLimiter in
+#                 the caller's priority lane; a 429 answer empties the bucket.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Weather Transport
+
+Every request the weather program sends to the OpenWeatherMap API goes through one WeatherTransport:
+
+- A requests.Session with a keep-alive connection pool, so TCP/TLS connections are reused between lookups.
+- Explicit connect and read timeouts, so a hung server cannot block a lookup forever.
+- Retries with jittered exponential backoff when the API answers 429 (too many requests) or a 5xx error,
+  or the connection fails. A Retry-After header from the server is honored when present.
+- Single-flight coalescing: when several threads request the same URL at the same time, only one
+  request is sent and every caller receives its result.
+- An optional RateLimiter (weather_rate_limit.py) that every request waits on, so the API's calls-per-minute
+  budget is kept across threads and processes. Interactive requests go before bulk requests.
+- One place that turns connection, timeout, HTTP and other request errors into a message for the user.
+
+"""
+
+import random
+import threading
+import time
+import textwrap
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from weather_metrics import get_instrumentation
+from weather_rate_limit import PRIORITY_INTERACTIVE
+
+# Number of keep-alive connections kept open per host.
+DEFAULT_POOL_SIZE = 10
+
+# Seconds to wait for a connection to be established and for the server to send a response.
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+
+# Number of times a failed request is retried, and the backoff between attempts in seconds.
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 8
+
+# HTTP status codes that are worth retrying.
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+# Class to hold the result of a request that other threads may be waiting on.
+class _InFlightCall:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = (None, None)
+
+
+# Class to send pooled, timed, retried and coalesced GET requests to the OpenWeatherMap API.
+class WeatherTransport:
+
+    # Initialize the transport with the connection pool size, timeouts and retry settings, and an optional
+    # RateLimiter shared with other transports and processes.
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX, instrumentation=None,
+                 rate_limiter=None):
+        self.instrumentation = instrumentation if instrumentation is not None else get_instrumentation()
+        self.rate_limiter = rate_limiter
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # Counters for reporting how the transport is behaving.
+        self.requests_sent = 0
+        self.retries = 0
+        self.coalesced = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    # fetch the URL and return the parsed JSON response, or None if the request failed.
+    # failure_message describes what was being retrieved and is shown for unexpected request errors.
+    def get_json(self, url, failure_message="Failed to retrieve data"):
+        data, error_message = self.request_json(url, failure_message)
+        if error_message:
+            self.report_error(error_message)
+        return data
+
+    # fetch the URL and return (parsed JSON response, None), or (None, error message) if the request failed.
+    # With not_found_ok=True a 404 response returns (None, None), like an empty answer.
+    # priority is the RateLimiter lane the request waits in: 'interactive' or 'bulk'.
+    def request_json(self, url, failure_message="Failed to retrieve data", not_found_ok=False,
+                     priority=PRIORITY_INTERACTIVE):
+
+        # Join a request for the same URL that is already in flight instead of sending another one
+        with self._lock:
+            call = self._in_flight.get(url)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._in_flight[url] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            self.instrumentation.count('upstream_coalesced_total')
+            call.done.wait()
+            return call.result
+
+        try:
+            with self.instrumentation.timer('http'):
+                call.result = self._get_json_with_retries(url, failure_message, not_found_ok, priority)
+        finally:
+            with self._lock:
+                del self._in_flight[url]
+            call.done.set()
+
+        return call.result
+
+    # send the request, retrying with backoff, and turn any final error into a message for the user.
+    def _get_json_with_retries(self, url, failure_message, not_found_ok=False, priority=PRIORITY_INTERACTIVE):
+        try:
+            response = self._send_with_retries(url, priority)
+
+            if not_found_ok and response.status_code == 404:
+                return None, None
+
+            # Raise an HTTPError for bad responses
+            response.raise_for_status()
+
+            # Parse the JSON response from the API into a Python dictionary
+            with self.instrumentation.timer('parse'):
+                return response.json(), None
+
+        except requests.exceptions.ConnectionError as conn_err:
+            self.instrumentation.count('errors_total', error_class='connection')
+            return None, f"\nUnable to connect to the server: {conn_err}"
+
+        except requests.exceptions.Timeout as timeout_err:
+            self.instrumentation.count('errors_total', error_class='timeout')
+            return None, f"\nRequest timed out. Please try again later: {timeout_err}"
+
+        except requests.exceptions.HTTPError as http_err:
+            self.instrumentation.count('errors_total', error_class='http')
+            return None, f"\nAn HTTP error occurred: {http_err}"
+
+        except requests.exceptions.RequestException as req_err:
+            self.instrumentation.count('errors_total', error_class='request')
+            return None, f"\n{failure_message}: {req_err}"
+
+    # send the GET request, retrying on retryable status codes and connection errors.
+    # The last response is returned (or the last connection error raised) once the retries are used up.
+    def _send_with_retries(self, url, priority=PRIORITY_INTERACTIVE):
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(priority)
+            try:
+                with self._lock:
+                    self.requests_sent += 1
+                response = self.session.get(url, timeout=self.timeout)
+            except requests.exceptions.ConnectionError:
+                self.instrumentation.count('upstream_requests_total', status='connection_error')
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                self.instrumentation.count('upstream_requests_total', status=str(response.status_code))
+                if response.status_code == 429 and self.rate_limiter is not None:
+                    # The budget was overrun (by another client of the key); make every sharer back off
+                    self.rate_limiter.drain()
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+
+            time.sleep(self.backoff_delay(attempt, retry_after))
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            self.instrumentation.count('upstream_retries_total')
+
+    # return how long to wait before the next attempt.
+    # Uses the server's Retry-After seconds if given, otherwise exponential backoff with full jitter.
+    def backoff_delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    # show an error message to the user.
+    @staticmethod
+    def report_error(error_message):
+        print(textwrap.fill(error_message, width=80))
+
+    # close the connection pool.
+    def close(self):
+        self.session.close()
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+# return the process-wide transport shared by every WeatherProgram that is not given its own.
+def get_default_transport():
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = WeatherTransport()
+        return _default_transport
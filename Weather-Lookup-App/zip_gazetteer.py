@@ -0,0 +1,197 @@
+# Weather Lookup App - Zip Code Gazetteer
+# Author: Vema Dondeti
+# 10/17/2026
+
+
+# Change Control Log:
+# Change#: 1
+# Change(s) Made: Initial creation of the offline zip code gazetteer.
+# Date of Change: 10/17/2026
+# Author: Vema Dondeti
+
+
+"""
+
+Zip Code Gazetteer
+
+Resolves US zip codes to latitude and longitude from a local table of ZCTA (ZIP Code Tabulation Area)
+centroids instead of calling the OpenWeatherMap geo API. The table is stored in a compact binary file
+that is memory-mapped, so opening it costs almost nothing and lookups are a binary search.
+
+File Format (little-endian):
+- 16 byte header: magic b'ZCTA', format version (uint32), number of entries (uint32), reserved (uint32)
+- sorted zip codes as uint32
+- latitudes as float32, in the same order as the zip codes
+- longitudes as float32, in the same order as the zip codes
+
+Building the Table:
+The table is built from the US Census Bureau Gazetteer ZCTA file (for example 2020_Gaz_zcta_national.txt
+from https://www.census.gov/geographies/reference-files/time-series/geo/gazetteer-files.html):
+
+    python zip_gazetteer.py build 2020_Gaz_zcta_national.txt zcta_centroids.bin
+
+A CSV file with 'zip', 'lat' and 'lon' columns can be used as the source as well.
+
+"""
+
+import argparse
+import array
+import bisect
+import csv
+import mmap
+import os
+import struct
+import sys
+
+# Default location of the gazetteer table, next to this file.
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'zcta_centroids.bin')
+
+MAGIC = b'ZCTA'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIII')
+
+
+# Class to look up zip code centroids from a memory-mapped gazetteer table.
+class ZipGazetteer:
+
+    # Open and memory-map the gazetteer table at the given path.
+    def __init__(self, path=DEFAULT_GAZETTEER_PATH):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} zip code gazetteer file")
+
+        expected_size = HEADER.size + count * 12
+        if len(self._mmap) < expected_size:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated: expected {expected_size} bytes, found {len(self._mmap)}")
+
+        self.count = count
+        zips_start = HEADER.size
+        lats_start = zips_start + count * 4
+        lons_start = lats_start + count * 4
+
+        if sys.byteorder == 'little':
+            # The columns are read directly from the mapped file without copying.
+            self._view = memoryview(self._mmap)
+            self._zips = self._view[zips_start:lats_start].cast('I')
+            self._lats = self._view[lats_start:lons_start].cast('f')
+            self._lons = self._view[lons_start:lons_start + count * 4].cast('f')
+        else:
+            # Big-endian hosts load and byte-swap the columns once.
+            self._zips = self._load_column('I', zips_start, count)
+            self._lats = self._load_column('f', lats_start, count)
+            self._lons = self._load_column('f', lons_start, count)
+
+    # load one column of the table into an array in native byte order.
+    def _load_column(self, typecode, start, count):
+        column = array.array(typecode)
+        column.frombytes(self._mmap[start:start + count * 4])
+        column.byteswap()
+        return column
+
+    # return the (latitude, longitude) centroid for the zip code, or None if the zip code is unknown.
+    def lookup(self, zip_code):
+        zip_code = str(zip_code).strip()
+        if not zip_code.isdigit() or len(zip_code) > 5:
+            return None
+
+        zip_number = int(zip_code)
+        index = bisect.bisect_left(self._zips, zip_number)
+        if index < self.count and self._zips[index] == zip_number:
+            return round(self._lats[index], 5), round(self._lons[index], 5)
+        return None
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, zip_code):
+        return self.lookup(zip_code) is not None
+
+    # release the memory-mapped file.
+    def close(self):
+        if isinstance(self._zips, memoryview):
+            self._zips.release()
+            self._lats.release()
+            self._lons.release()
+            self._view.release()
+        self._mmap.close()
+
+
+# open the default gazetteer table if it has been built, otherwise return None so callers use the geo API.
+def load_default_gazetteer(path=DEFAULT_GAZETTEER_PATH):
+    if not os.path.exists(path):
+        return None
+    try:
+        return ZipGazetteer(path)
+    except (OSError, ValueError) as err:
+        print(f"\n***Warning: Unable to open the zip code gazetteer, using the geo API instead: {err}***")
+        return None
+
+
+# read (zip, lat, lon) rows from a Census Gazetteer ZCTA file (tab-separated) or a CSV with zip/lat/lon columns.
+def read_centroids(source_path):
+    with open(source_path, newline='', encoding='utf-8-sig') as file:
+        delimiter = '\t' if source_path.lower().endswith('.txt') else ','
+        reader = csv.reader(file, delimiter=delimiter)
+        header = [column.strip().lower() for column in next(reader)]
+
+        zip_column = header.index('geoid') if 'geoid' in header else header.index('zip')
+        lat_column = header.index('intptlat') if 'intptlat' in header else header.index('lat')
+        lon_column = header.index('intptlong') if 'intptlong' in header else header.index('lon')
+
+        for row in reader:
+            if not row:
+                continue
+            yield int(row[zip_column].strip()), float(row[lat_column]), float(row[lon_column])
+
+
+# build a gazetteer table from a source file and return the number of zip codes written.
+def build_gazetteer(source_path, output_path=DEFAULT_GAZETTEER_PATH):
+    centroids = {}
+    for zip_number, latitude, longitude in read_centroids(source_path):
+        centroids[zip_number] = (latitude, longitude)
+
+    zips = array.array('I', sorted(centroids))
+    lats = array.array('f', (centroids[zip_number][0] for zip_number in zips))
+    lons = array.array('f', (centroids[zip_number][1] for zip_number in zips))
+
+    if sys.byteorder != 'little':
+        for column in (zips, lats, lons):
+            column.byteswap()
+
+    with open(output_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(zips), 0))
+        file.write(zips.tobytes())
+        file.write(lats.tobytes())
+        file.write(lons.tobytes())
+
+    return len(zips)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the offline zip code gazetteer.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="build the table from a Census Gazetteer or CSV file")
+    build_parser.add_argument('source')
+    build_parser.add_argument('output', nargs='?', default=DEFAULT_GAZETTEER_PATH)
+
+    lookup_parser = subparsers.add_parser('lookup', help="print the centroid of one or more zip codes")
+    lookup_parser.add_argument('zip_codes', nargs='+')
+    lookup_parser.add_argument('--table', default=DEFAULT_GAZETTEER_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        count = build_gazetteer(args.source, args.output)
+        print(f"Wrote {count} zip codes to {args.output}")
+    else:
+        gazetteer = ZipGazetteer(args.table)
+        for zip_code in args.zip_codes:
+            print(f"{zip_code:<10} {gazetteer.lookup(zip_code)}")
+        gazetteer.close()